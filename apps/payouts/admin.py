@@ -4,9 +4,83 @@ Admin configuration for the payouts' app.
 
 from __future__ import annotations
 
+import uuid
+from typing import Any
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.utils.html import format_html
+
+from apps.payouts.batches import recount_batches
+from apps.payouts.list_cache import invalidate
+from apps.payouts.models import (
+    ExecutionProfile,
+    FxRate,
+    Payout,
+    PayoutAttempt,
+    PayoutBatch,
+    WebhookDelivery,
+    WebhookSubscription,
+)
+from apps.payouts.search import search_payouts
+
+
+class PayoutAttemptInline(admin.TabularInline):
+    """Read-only list of a payout's provider submissions."""
+
+    model = PayoutAttempt
+    extra = 0
+    can_delete = False
+    fields = (
+        "number",
+        "status",
+        "idempotency_key",
+        "provider_reference",
+        "error",
+        "created_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request: HttpRequest, obj: Any = None) -> bool:
+        return False
+
+
+class PayoutAdminForm(forms.ModelForm):
+    """Payout change form that rejects edits to a payout changed since it was opened."""
+
+    loaded_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    class Meta:
+        model = Payout
+        fields = "__all__"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.fields["loaded_version"].initial = self.instance.version
 
-from apps.payouts.models import Payout
+    def clean(self) -> dict[str, Any]:
+        super().clean()
+        cleaned_data = self.cleaned_data
+        if self.instance._state.adding:
+            return cleaned_data
+        # The admin validates and saves in one transaction, so this lock
+        # holds until save_model has written the next version.
+        stored = (
+            Payout.objects.select_for_update()
+            .filter(pk=self.instance.pk)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if stored != cleaned_data.get("loaded_version"):
+            raise forms.ValidationError(
+                "This payout was changed after you opened it. "
+                "Reload the page and apply your edit again."
+            )
+        return cleaned_data
 
 
 @admin.register(Payout)
@@ -17,9 +91,181 @@ class PayoutAdmin(admin.ModelAdmin):
         "id",
         "amount",
         "currency",
+        "amount_base",
+        "tenant",
         "status",
         "created_at",
         "updated_at",
     )
-    list_filter = ("status", "currency", "created_at")
-    search_fields = ("id", "recipient_details")
+    list_filter = ("status", "currency", "tenant", "created_at")
+    search_fields = ("id", "description", "recipient_details__bank_name")
+    search_help_text = "Payout id, or a fragment of the description or bank name."
+    # amount_base is converted from amount and currency on save.
+    readonly_fields = ("amount_base", "batch", "version")
+    form = PayoutAdminForm
+    inlines = [PayoutAttemptInline]
+
+    def get_search_results(
+            self,
+            request: HttpRequest,
+            queryset: QuerySet[Payout],
+            search_term: str,
+    ) -> tuple[QuerySet[Payout], bool]:
+        """Look up an exact id, otherwise use the indexed fragment search."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        try:
+            return queryset.filter(id=uuid.UUID(search_term)), False
+        except ValueError:
+            pass
+        if len(search_term) < settings.PAYOUTS_SEARCH_MIN_LENGTH:
+            return queryset.none(), False
+        return search_payouts(queryset, search_term), False
+
+    # Admin edits are rare, so they invalidate every cached list page and
+    # recount the affected batches instead of tracking transitions.
+    def save_model(self, request: HttpRequest, obj: Payout, form: Any, change: bool) -> None:
+        if change:
+            # Invalidate If-Match headers taken before the edit. The form
+            # checked the stored version under a row lock, so it is current.
+            obj.version = form.cleaned_data["loaded_version"] + 1
+        super().save_model(request, obj, form, change)
+        invalidate()
+        recount_batches([obj.batch_id])
+
+    def delete_model(self, request: HttpRequest, obj: Payout) -> None:
+        super().delete_model(request, obj)
+        invalidate()
+        recount_batches([obj.batch_id])
+
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet[Payout]) -> None:
+        batch_ids = list(queryset.order_by().values_list("batch_id", flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        invalidate()
+        recount_batches(batch_ids)
+
+
+@admin.register(PayoutBatch)
+class PayoutBatchAdmin(admin.ModelAdmin):
+    """Payout batches with their progress counters."""
+
+    list_display = (
+        "id",
+        "tenant",
+        "reference",
+        "total",
+        "pending_count",
+        "processing_count",
+        "completed_count",
+        "failed_count",
+        "cancelled_count",
+        "created_at",
+    )
+    list_filter = ("tenant", "created_at")
+    search_fields = ("=id", "reference")
+    readonly_fields = (
+        "total",
+        "pending_count",
+        "processing_count",
+        "completed_count",
+        "failed_count",
+        "cancelled_count",
+    )
+    actions = ["recount"]
+
+    @admin.action(description="Recount progress from payouts")
+    def recount(self, request: HttpRequest, queryset: QuerySet[PayoutBatch]) -> None:
+        recount_batches(queryset.values_list("id", flat=True))
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    """Admin interface for FX rates used to compute ``amount_base``."""
+
+    list_display = ("currency", "rate_to_base", "updated_at")
+
+
+@admin.register(ExecutionProfile)
+class ExecutionProfileAdmin(admin.ModelAdmin):
+    """Read-only browser for stored request and task profiles, slowest first."""
+
+    list_display = (
+        "name",
+        "kind",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "sql_count",
+        "sql_ms",
+        "created_at",
+    )
+    list_filter = ("kind", "name", "created_at")
+    search_fields = ("name", "path")
+    ordering = ("-duration_ms",)
+    date_hierarchy = "created_at"
+    fields = (
+        "name",
+        "kind",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "sql_count",
+        "sql_ms",
+        "created_at",
+        "formatted_queries",
+        "formatted_stats",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: Any = None) -> bool:
+        return False
+
+    @admin.display(description="SQL queries")
+    def formatted_queries(self, obj: ExecutionProfile) -> str:
+        lines = [f"[{q['alias']}] {q['ms']:.2f} ms  {q['sql']}" for q in obj.queries]
+        return format_html("<pre>{}</pre>", "\n".join(lines))
+
+    @admin.display(description="Profile (cumulative)")
+    def formatted_stats(self, obj: ExecutionProfile) -> str:
+        return format_html("<pre>{}</pre>", obj.stats)
+
+
+@admin.register(WebhookSubscription)
+class WebhookSubscriptionAdmin(admin.ModelAdmin):
+    """Admin interface for tenants' webhook endpoints."""
+
+    list_display = ("tenant", "url", "statuses", "is_active", "created_at")
+    list_filter = ("is_active", "tenant")
+    search_fields = ("tenant", "url")
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    """Read-only view of the webhook delivery queue."""
+
+    list_display = (
+        "event_id",
+        "subscription",
+        "payout_id",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "delivered_at",
+        "failed_at",
+        "last_error",
+    )
+    list_filter = ("status", "delivered_at", "failed_at")
+    search_fields = ("=event_id", "=payout_id")
+    list_select_related = ("subscription",)
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: Any = None) -> bool:
+        return False
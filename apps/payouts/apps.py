@@ -13,3 +13,11 @@ class PayoutsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.payouts"
     verbose_name = "Payouts"
+
+    def ready(self) -> None:
+        """Register the slow-query and profiling hooks if they are enabled."""
+        from apps.payouts.profiling import install_profiling
+        from apps.payouts.slow_queries import install_slow_query_log
+
+        install_slow_query_log()
+        install_profiling()
@@ -0,0 +1,110 @@
+"""
+Async read-only views for the payouts application.
+
+DRF viewsets are synchronous, so under ASGI every request to
+``PayoutViewSet`` is handed to a worker thread. These views serve the
+list and retrieve read paths natively on the event loop using Django's
+async ORM, while reusing ``PayoutFilter`` and ``PayoutSerializer`` so the
+request parameters and response shape match the sync endpoints.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from django.http import HttpRequest, JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.payouts.filters import PayoutFilter
+from apps.payouts.models import Payout
+from apps.payouts.serializers import PayoutSerializer
+from config.db_router import allow_replica
+
+_PAGE_QUERY_PARAM = "page"
+
+
+def _page_size() -> int:
+    """Return the page size configured for DRF pagination."""
+    page_size: int | None = api_settings.PAGE_SIZE
+    return page_size or 10
+
+
+def _json(data: Any, status: int = 200) -> JsonResponse:
+    """Render ``data`` with DRF's encoder (Decimal, UUID, datetime aware)."""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def _page_link(request: HttpRequest, page_number: int) -> str:
+    """Build an absolute URL pointing at ``page_number`` of the current query."""
+    url = request.build_absolute_uri()
+    if page_number == 1:
+        return remove_query_param(url, _PAGE_QUERY_PARAM)
+    return replace_query_param(url, _PAGE_QUERY_PARAM, page_number)
+
+
+async def payout_list(request: HttpRequest) -> JsonResponse:
+    """
+    List payouts with filtering and page-number pagination.
+
+    The response body uses the same envelope as ``PayoutPagination``; the
+    count is always exact here.
+    """
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, 405)
+
+    filterset = PayoutFilter(request.GET, queryset=Payout.objects.all())
+    if not filterset.is_valid():
+        return _json(filterset.errors, 400)
+    queryset = filterset.qs
+
+    try:
+        page_number = int(request.GET.get(_PAGE_QUERY_PARAM, 1))
+    except ValueError:
+        page_number = 0
+    if page_number < 1:
+        return _json({"detail": "Invalid page."}, 404)
+
+    page_size = _page_size()
+    with allow_replica():
+        count = await queryset.acount()
+        num_pages = max(1, -(-count // page_size))
+        if page_number > num_pages:
+            return _json({"detail": "Invalid page."}, 404)
+
+        offset = (page_number - 1) * page_size
+        payouts = [
+            payout async for payout in queryset[offset:offset + page_size]
+        ]
+
+    return _json(
+        {
+            "count": count,
+            "next": (
+                _page_link(request, page_number + 1)
+                if page_number < num_pages
+                else None
+            ),
+            "previous": (
+                _page_link(request, page_number - 1) if page_number > 1 else None
+            ),
+            "results": PayoutSerializer(payouts, many=True).data,
+            "count_estimated": False,
+        }
+    )
+
+
+async def payout_detail(request: HttpRequest, pk: uuid.UUID) -> JsonResponse:
+    """Retrieve a single payout by primary key."""
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, 405)
+
+    try:
+        with allow_replica():
+            payout = await Payout.objects.aget(pk=pk)
+    except Payout.DoesNotExist:
+        return _json({"detail": "No Payout matches the given query."}, 404)
+
+    return _json(PayoutSerializer(payout).data)
@@ -0,0 +1,89 @@
+"""
+Progress counters of payout batches.
+
+Every status transition of a payout that belongs to a ``PayoutBatch``
+moves one unit from the old status counter to the new one with an
+``UPDATE ... SET x = x - n, y = y + n`` in the same transaction, so the
+counters always add up to ``total`` and a batch's progress is read from
+its own row instead of aggregating over ``Payout``.
+
+Bulk transitions are coalesced into one update per batch. Batches are
+always updated in id order, after the payout rows, so concurrent
+transitions cannot deadlock on them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.payouts.models import Payout, PayoutBatch, StatusChoices
+
+COUNTER_FIELDS: dict[str, str] = {
+    StatusChoices.PENDING: "pending_count",
+    StatusChoices.PROCESSING: "processing_count",
+    StatusChoices.COMPLETED: "completed_count",
+    StatusChoices.FAILED: "failed_count",
+    StatusChoices.CANCELLED: "cancelled_count",
+}
+
+
+def record_batch_transitions(
+        from_status: str,
+        to_status: str,
+        counts: Mapping[Any, int],
+) -> None:
+    """Move ``counts[batch_id]`` payouts of each batch from one status counter to another."""
+    if from_status == to_status:
+        return
+    source = COUNTER_FIELDS[from_status]
+    target = COUNTER_FIELDS[to_status]
+    now = timezone.now()
+    for batch_id in sorted(batch_id for batch_id in counts if batch_id is not None):
+        count = counts[batch_id]
+        PayoutBatch.objects.filter(id=batch_id).update(
+            **{source: F(source) - count, target: F(target) + count},
+            updated_at=now,
+        )
+
+
+def record_batch_transition(batch_id: Any, from_status: str, to_status: str) -> None:
+    """Count one payout's transition against its batch, if it has one."""
+    if batch_id is not None:
+        record_batch_transitions(from_status, to_status, {batch_id: 1})
+
+
+def record_batch_removal(batch_id: Any, status: str) -> None:
+    """Drop a deleted payout from its batch's counters, if it has one."""
+    if batch_id is None:
+        return
+    field = COUNTER_FIELDS[status]
+    PayoutBatch.objects.filter(id=batch_id).update(
+        total=F("total") - 1,
+        **{field: F(field) - 1},
+        updated_at=timezone.now(),
+    )
+
+
+def recount_batches(batch_ids: Iterable[Any]) -> None:
+    """
+    Recompute the counters of the given batches from their payouts.
+
+    For edits that bypass the transition paths, such as admin changes and
+    deletes; this is the only place that aggregates over ``Payout``.
+    """
+    for batch_id in sorted({batch_id for batch_id in batch_ids if batch_id is not None}):
+        by_status = dict(
+            Payout.objects.filter(batch_id=batch_id)
+            .order_by()
+            .values_list("status")
+            .annotate(count=Count("*"))
+        )
+        PayoutBatch.objects.filter(id=batch_id).update(
+            total=sum(by_status.values()),
+            updated_at=timezone.now(),
+            **{field: by_status.get(status, 0) for status, field in COUNTER_FIELDS.items()},
+        )
@@ -0,0 +1,283 @@
+"""
+Discrete-event capacity model of ``process_payout_task``.
+
+Answers questions such as "how many workers for 200 payouts/s at 800 ms
+provider p99 and 3% failures?" without running a fleet. Each simulated
+attempt follows the real task: a short claim transaction, the external
+call (log-normal latency fitted to a p50/p99 pair), then either the
+completing transaction or the reset-to-PENDING transaction followed by a
+Celery autoretry. Retry countdowns, ``max_retries`` and the final
+``on_failure`` transaction use the task's own retry configuration.
+
+Workers pull from one FIFO queue; a retry re-enters that queue when its
+countdown expires. The model ignores broker latency, prefetching and
+database contention beyond the fixed per-transaction cost.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from apps.payouts.tasks import process_payout_task
+
+# z-score of the 99th percentile of the standard normal distribution.
+_Z99 = 2.3263478740408408
+
+_ARRIVE, _READY, _DONE = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class TaskModel:
+    """Timing, failure and retry behaviour of one payout's processing."""
+
+    latency_p50: float = 5.0
+    latency_p99: float = 5.0
+    failure_rate: float = 0.1
+    transaction_seconds: float = 0.005
+    max_retries: int = 3
+    retry_backoff: int = 1
+    retry_backoff_max: int = 60
+    retry_jitter: bool = False
+
+    @classmethod
+    def from_task(cls, **overrides: Any) -> TaskModel:
+        """Build a model with ``process_payout_task``'s retry configuration."""
+        task = process_payout_task
+        model = cls(
+            max_retries=task.max_retries,
+            retry_backoff=int(max(1.0, float(task.retry_backoff))),
+            retry_backoff_max=int(task.retry_backoff_max),
+            # Celery's autoretry applies full jitter unless the task disables it.
+            retry_jitter=bool(getattr(task, "retry_jitter", True)),
+        )
+        return replace(model, **overrides)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one external call latency in seconds."""
+        sigma = max(0.0, math.log(self.latency_p99 / self.latency_p50) / _Z99)
+        if sigma == 0:
+            return self.latency_p50
+        return rng.lognormvariate(math.log(self.latency_p50), sigma)
+
+    def retry_countdown(self, retries: int, rng: random.Random) -> float:
+        """Countdown before retry ``retries + 1``, as Celery's autoretry computes it."""
+        countdown = min(self.retry_backoff_max, self.retry_backoff * 2**retries)
+        if self.retry_jitter:
+            countdown = rng.randrange(countdown + 1)
+        return max(0, countdown)
+
+    def mean_attempt_seconds(self) -> float:
+        """Expected worker time of one attempt."""
+        sigma = max(0.0, math.log(self.latency_p99 / self.latency_p50) / _Z99)
+        return self.latency_p50 * math.exp(sigma**2 / 2) + 2 * self.transaction_seconds
+
+    def expected_attempts(self) -> float:
+        """Expected attempts per payout, including retries."""
+        return sum(self.failure_rate**k for k in range(self.max_retries + 1))
+
+
+@dataclass
+class SimulationResult:
+    """Throughput, queueing and latency figures of one simulation run."""
+
+    workers: int
+    arrival_rate: float
+    duration: float
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    unfinished: int = 0
+    attempts: int = 0
+    elapsed: float = 0.0
+    busy_seconds: float = 0.0
+    queue_depth_mean: float = 0.0
+    queue_depth_max: int = 0
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Payouts finished (completed or failed) per second."""
+        return (self.completed + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Share of worker time spent on attempts."""
+        capacity = self.workers * self.elapsed
+        return self.busy_seconds / capacity if capacity else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Nearest-rank percentile of submit-to-final-status latency, in seconds."""
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "workers": self.workers,
+            "arrival_rate": self.arrival_rate,
+            "duration": self.duration,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "unfinished": self.unfinished,
+            "attempts": self.attempts,
+            "throughput": round(self.throughput, 3),
+            "utilization": round(self.utilization, 4),
+            "queue_depth_mean": round(self.queue_depth_mean, 2),
+            "queue_depth_max": self.queue_depth_max,
+            "latency_seconds": {
+                f"p{p}": round(self.latency_percentile(p), 4) for p in (50, 95, 99)
+            },
+        }
+
+
+def simulate(
+        model: TaskModel,
+        workers: int,
+        arrival_rate: float,
+        duration: float,
+        arrival: str = "poisson",
+        seed: int = 0,
+        drain_limit: float | None = None,
+) -> SimulationResult:
+    """
+    Simulate ``duration`` seconds of arrivals at ``arrival_rate`` payouts/s.
+
+    ``arrival`` is ``"poisson"`` (exponential gaps) or ``"constant"``. After
+    the last arrival the queue drains for up to ``drain_limit`` seconds
+    (default ``duration``); payouts still queued then count as unfinished.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if arrival not in ("poisson", "constant"):
+        raise ValueError(f"Unknown arrival pattern: {arrival}")
+
+    rng = random.Random(seed)
+    result = SimulationResult(workers=workers, arrival_rate=arrival_rate, duration=duration)
+    horizon = duration + (duration if drain_limit is None else drain_limit)
+
+    events: list[tuple[float, int, int, int, int, bool]] = []
+    sequence = 0
+
+    def schedule(
+            at: float,
+            kind: int,
+            payout: int,
+            retries: int,
+            failed: bool = False,
+    ) -> None:
+        nonlocal sequence
+        sequence += 1
+        heapq.heappush(events, (at, sequence, kind, payout, retries, failed))
+
+    def next_arrival(previous: float, index: int) -> float:
+        if arrival == "poisson":
+            return previous + rng.expovariate(arrival_rate)
+        return (index + 1) / arrival_rate
+
+    submitted_at: list[float] = []
+    queue: deque[tuple[int, int]] = deque()
+    idle = workers
+    now = depth_area = 0.0
+    if arrival_rate > 0:
+        schedule(next_arrival(0.0, 0), _ARRIVE, 0, 0)
+
+    while events and events[0][0] <= horizon:
+        at, _, kind, payout, retries, failed = heapq.heappop(events)
+        depth_area += len(queue) * (at - now)
+        now = at
+
+        if kind == _ARRIVE:
+            submitted_at.append(now)
+            queue.append((payout, 0))
+            at = next_arrival(now, payout + 1)
+            if at <= duration:
+                schedule(at, _ARRIVE, payout + 1, 0)
+        elif kind == _READY:
+            queue.append((payout, retries))
+        else:
+            idle += 1
+            if not failed:
+                result.completed += 1
+                result.latencies.append(now - submitted_at[payout])
+            elif retries < model.max_retries:
+                countdown = model.retry_countdown(retries, rng)
+                schedule(now + countdown, _READY, payout, retries + 1)
+            else:
+                result.failed += 1
+                result.latencies.append(now - submitted_at[payout])
+
+        while idle and queue:
+            payout, retries = queue.popleft()
+            idle -= 1
+            result.attempts += 1
+            failed = rng.random() < model.failure_rate
+            # Claim, external call, then complete or reset to PENDING.
+            service = model.sample_latency(rng) + 2 * model.transaction_seconds
+            if failed and retries >= model.max_retries:
+                service += model.transaction_seconds  # on_failure marks FAILED
+            result.busy_seconds += service
+            schedule(now + service, _DONE, payout, retries, failed)
+
+        result.queue_depth_max = max(result.queue_depth_max, len(queue))
+
+    # Attempts still running at the end only count up to the last event.
+    result.busy_seconds -= sum(at - now for at, _, kind, *_ in events if kind == _DONE)
+    result.submitted = len(submitted_at)
+    result.unfinished = result.submitted - result.completed - result.failed
+    result.elapsed = now
+    result.queue_depth_mean = depth_area / now if now else 0.0
+    return result
+
+
+def find_min_workers(
+        model: TaskModel,
+        arrival_rate: float,
+        duration: float,
+        target_p99: float,
+        max_workers: int = 10_000,
+        **kwargs: Any,
+) -> tuple[int, SimulationResult]:
+    """
+    Return the smallest worker count whose p99 latency meets ``target_p99``.
+
+    Starts from the offered load (arrival rate times expected worker time
+    per payout), doubles until the target is met, then bisects. Raises
+    ``ValueError`` if even ``max_workers`` workers miss the target, e.g.
+    because it is below the latency of the external call itself.
+    """
+
+    def meets(workers: int) -> SimulationResult | None:
+        result = simulate(model, workers, arrival_rate, duration, **kwargs)
+        ok = not result.unfinished and result.latency_percentile(99) <= target_p99
+        return result if ok else None
+
+    offered = arrival_rate * model.mean_attempt_seconds() * model.expected_attempts()
+    low = max(1, math.ceil(offered))
+    if low > max_workers:
+        raise ValueError(f"The offered load needs more than {max_workers} workers.")
+    high = low
+    best = meets(high)
+    while best is None:
+        if high >= max_workers:
+            raise ValueError(
+                f"A p99 of {target_p99}s is not reachable with up to {max_workers} workers."
+            )
+        low, high = high + 1, min(high * 2, max_workers)
+        best = meets(high)
+    while low < high:
+        middle = (low + high) // 2
+        result = meets(middle)
+        if result is None:
+            low = middle + 1
+        else:
+            high, best = middle, result
+    return high, best
@@ -1,15 +1,20 @@
 """
 Filter configuration for the payouts list endpoint.
 
-Provides filtering by status, currency, creation date range, and amount
-range using django-filter.
+Provides filtering by status, currency, tenant, batch, creation and update date ranges, amount range,
+base-currency amount range and free-text search using django-filter.
 """
 
 from __future__ import annotations
 
+from typing import Any
+
 import django_filters
+from django.conf import settings
+from django.db.models import QuerySet
 
 from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.search import search_payouts
 
 
 class PayoutFilter(django_filters.FilterSet):
@@ -17,6 +22,8 @@ class PayoutFilter(django_filters.FilterSet):
 
     status = django_filters.ChoiceFilter(choices=StatusChoices.choices)
     currency = django_filters.CharFilter(lookup_expr="iexact")
+    tenant = django_filters.CharFilter()
+    batch = django_filters.UUIDFilter(field_name="batch_id")
     created_after = django_filters.DateTimeFilter(
         field_name="created_at",
         lookup_expr="gte",
@@ -25,6 +32,14 @@ class PayoutFilter(django_filters.FilterSet):
         field_name="created_at",
         lookup_expr="lte",
     )
+    updated_after = django_filters.DateTimeFilter(
+        field_name="updated_at",
+        lookup_expr="gte",
+    )
+    updated_before = django_filters.DateTimeFilter(
+        field_name="updated_at",
+        lookup_expr="lte",
+    )
     min_amount = django_filters.NumberFilter(
         field_name="amount",
         lookup_expr="gte",
@@ -33,6 +48,18 @@ class PayoutFilter(django_filters.FilterSet):
         field_name="amount",
         lookup_expr="lte",
     )
+    min_amount_base = django_filters.NumberFilter(
+        field_name="amount_base",
+        lookup_expr="gte",
+    )
+    max_amount_base = django_filters.NumberFilter(
+        field_name="amount_base",
+        lookup_expr="lte",
+    )
+    search = django_filters.CharFilter(
+        method="filter_search",
+        min_length=settings.PAYOUTS_SEARCH_MIN_LENGTH,
+    )
 
     class Meta:
         """Metadata for payout filtering."""
@@ -40,3 +67,11 @@ class PayoutFilter(django_filters.FilterSet):
         model = Payout
         fields = ["status", "currency"]
 
+    def filter_search(
+            self,
+            queryset: QuerySet[Payout],
+            name: str,
+            value: Any,
+    ) -> QuerySet[Payout]:
+        """Match description or bank name fragments, best matches first."""
+        return search_payouts(queryset, value)
@@ -0,0 +1,235 @@
+"""
+Payment provider calls with idempotency keys and resumable attempts.
+
+Every submission of a payout is checkpointed as a ``PayoutAttempt`` row
+before the provider is called. The row carries the idempotency key sent
+with the request, and the provider's reference once it answers. When a
+submission fails without a definite answer (timeout, dropped connection,
+worker killed mid-call), the attempt stays ``SUBMITTED``. The next run of
+``process_payout_task`` then asks the provider about that key first. It
+submits again, under a new key, only if the provider declined the earlier
+attempt or never received it.
+
+``SimulatedGateway`` stands in for the provider's API. A submission takes
+five seconds and fails 10% of the time. In the lower half of that band the
+provider accepts the payout but the response is lost; in the upper half
+it declines. Its record of idempotency keys is kept in Redis, like the
+real provider's, so a retry on another worker or after a restart sees
+it; an in-process store with the same semantics backs tests
+(``PAYOUTS_SIMULATED_GATEWAY_BACKEND``).
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from apps.payouts.models import AttemptStatusChoices, Payout, PayoutAttempt
+
+SIMULATED_LATENCY = 5
+SIMULATED_FAILURE_RATE = 0.1
+
+_PAYMENT_PREFIX = "payouts:simulated-provider"
+# How long the simulated provider remembers an idempotency key.
+_PAYMENT_TTL = 30 * 24 * 3600
+
+
+class GatewayError(Exception):
+    """A submission or lookup did not succeed."""
+
+
+class GatewayTimeout(GatewayError):
+    """No answer from the provider; the payout may or may not have been made."""
+
+
+class GatewayDeclined(GatewayError):
+    """The provider rejected the payout; it was not made."""
+
+
+@dataclass(frozen=True)
+class ProviderPayment:
+    """The provider's record of one idempotency key."""
+
+    reference: str
+    succeeded: bool
+
+
+class InMemoryPaymentStore:
+    """Process-local record of the simulated provider's payments."""
+
+    def __init__(self) -> None:
+        self._payments: dict[str, ProviderPayment] = {}
+        self._mutex = threading.Lock()
+
+    def get(self, idempotency_key: str) -> ProviderPayment | None:
+        """Return the payment recorded for ``idempotency_key``, if any."""
+        with self._mutex:
+            return self._payments.get(idempotency_key)
+
+    def add(self, idempotency_key: str, payment: ProviderPayment) -> ProviderPayment:
+        """Record ``payment`` unless the key has one already; return the recorded one."""
+        with self._mutex:
+            return self._payments.setdefault(idempotency_key, payment)
+
+    def clear(self) -> None:
+        """Forget every recorded payment."""
+        with self._mutex:
+            self._payments.clear()
+
+
+class RedisPaymentStore:
+    """
+    Record of the simulated provider's payments shared by every worker.
+
+    Unlike the caches and locks, errors are raised as ``GatewayTimeout``:
+    answering "never received" for a payment that was made would pay the
+    payout out again.
+    """
+
+    def __init__(self, url: str) -> None:
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, idempotency_key: str) -> ProviderPayment | None:
+        """Return the payment recorded for ``idempotency_key``, if any."""
+        try:
+            value = self._client.get(f"{_PAYMENT_PREFIX}:{idempotency_key}")
+        except redis.RedisError as exc:
+            raise GatewayTimeout(f"Simulated provider unavailable: {exc}") from exc
+        return ProviderPayment(**json.loads(value)) if value is not None else None
+
+    def add(self, idempotency_key: str, payment: ProviderPayment) -> ProviderPayment:
+        """Record ``payment`` unless the key has one already; return the recorded one."""
+        key = f"{_PAYMENT_PREFIX}:{idempotency_key}"
+        try:
+            added = self._client.set(key, json.dumps(asdict(payment)), nx=True, ex=_PAYMENT_TTL)
+        except redis.RedisError as exc:
+            raise GatewayTimeout(f"Simulated provider unavailable: {exc}") from exc
+        if added:
+            return payment
+        recorded = self.get(idempotency_key)
+        return recorded if recorded is not None else payment
+
+    def clear(self) -> None:
+        """Forget every recorded payment."""
+        keys = list(self._client.scan_iter(f"{_PAYMENT_PREFIX}:*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+PaymentStore = InMemoryPaymentStore | RedisPaymentStore
+
+
+@lru_cache(maxsize=1)
+def get_payment_store() -> PaymentStore:
+    """Return the process-wide payment store selected by settings."""
+    if settings.PAYOUTS_SIMULATED_GATEWAY_BACKEND == "memory":
+        return InMemoryPaymentStore()
+    return RedisPaymentStore(settings.PAYOUTS_SIMULATED_GATEWAY_URL)
+
+
+class SimulatedGateway:
+    """Stand-in for the payment provider's API."""
+
+    def submit(self, idempotency_key: str, amount: Decimal, currency: str) -> str:
+        """
+        Pay out ``amount`` and return the provider reference.
+
+        Repeating a key replays the original outcome instead of paying again.
+        """
+        store = get_payment_store()
+        payment = store.get(idempotency_key)
+        if payment is None:
+            time.sleep(SIMULATED_LATENCY)
+            roll = random.random()
+            payment = store.add(
+                idempotency_key,
+                ProviderPayment(
+                    reference=f"sim_{uuid.uuid4().hex}",
+                    succeeded=not SIMULATED_FAILURE_RATE / 2 <= roll < SIMULATED_FAILURE_RATE,
+                ),
+            )
+            if roll < SIMULATED_FAILURE_RATE / 2:
+                raise GatewayTimeout("Simulated timeout after the provider accepted the payout")
+        if not payment.succeeded:
+            raise GatewayDeclined("Simulated processing failure")
+        return payment.reference
+
+    def lookup(self, idempotency_key: str) -> ProviderPayment | None:
+        """Return the outcome recorded for ``idempotency_key``, or None if never received."""
+        return get_payment_store().get(idempotency_key)
+
+    def reset(self) -> None:
+        """Forget every recorded payment."""
+        get_payment_store().clear()
+
+
+gateway = SimulatedGateway()
+
+
+def _finish(
+        attempt: PayoutAttempt,
+        status: str,
+        reference: str = "",
+        error: str = "",
+) -> None:
+    attempt.status = status
+    attempt.provider_reference = reference or attempt.provider_reference
+    attempt.error = error[:1000]
+    attempt.finished_at = timezone.now()
+    attempt.save(update_fields=["status", "provider_reference", "error", "finished_at"])
+
+
+def submit_payout(payout: Payout) -> PayoutAttempt:
+    """
+    Pay ``payout`` out through the provider, resuming its previous attempt.
+
+    Returns the succeeded attempt. Raises ``GatewayDeclined`` if the new
+    attempt was declined and ``GatewayTimeout`` if its outcome is unknown;
+    either way the next call picks up from the recorded attempt.
+    """
+    # Always the primary: a replica lagging behind would hide the last
+    # attempt and the payout would be submitted again under a new key.
+    previous = payout.attempts.using(DEFAULT_DB_ALIAS).order_by("-number").first()
+    if previous is not None and previous.status == AttemptStatusChoices.SUCCEEDED:
+        # Paid out, but the worker stopped before marking the payout COMPLETED.
+        return previous
+    if previous is not None and previous.status == AttemptStatusChoices.SUBMITTED:
+        payment = gateway.lookup(previous.idempotency_key)
+        if payment is not None and payment.succeeded:
+            _finish(previous, AttemptStatusChoices.SUCCEEDED, reference=payment.reference)
+            return previous
+        _finish(
+            previous,
+            AttemptStatusChoices.FAILED,
+            reference=payment.reference if payment is not None else "",
+            error=previous.error or "Not received by the provider",
+        )
+
+    number = previous.number + 1 if previous is not None else 1
+    attempt = PayoutAttempt.objects.create(
+        payout=payout,
+        number=number,
+        idempotency_key=f"{payout.id}:{number}",
+    )
+    try:
+        reference = gateway.submit(attempt.idempotency_key, payout.amount, payout.currency)
+    except GatewayDeclined as exc:
+        _finish(attempt, AttemptStatusChoices.FAILED, error=str(exc))
+        raise
+    except GatewayError as exc:
+        attempt.error = str(exc)[:1000]
+        attempt.save(update_fields=["error"])
+        raise
+    _finish(attempt, AttemptStatusChoices.SUCCEEDED, reference=reference)
+    return attempt
@@ -0,0 +1,189 @@
+"""
+Pipeline health figures for on-call alerting.
+
+A snapshot holds, for the PENDING and PROCESSING stages, the number of
+payouts waiting and the age of the oldest one, plus the rate of completed
+payouts per minute over the last ``PAYOUTS_PIPELINE_HEALTH_WINDOW``
+seconds. Payouts scheduled for the future are not backlog until they fall
+due; a due scheduled payout ages from ``scheduled_for``.
+
+Both queries are answered from partial indexes on ``Payout`` that hold
+every column they read (``payout_backlog_idx``, ``payout_completed_idx``)
+and go to a replica when one is configured (see ``config.db_router``).
+
+The ``sample_pipeline_health`` task computes a snapshot every
+``PAYOUTS_PIPELINE_HEALTH_INTERVAL`` seconds and stores it for
+``PAYOUTS_PIPELINE_HEALTH_TTL`` seconds, so a scrape is a single cache
+read. When no fresh snapshot is stored (beat stopped, workers backed up)
+the endpoint samples inline; ``sample_age_seconds`` tells the two apart.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+import redis
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.payouts.models import Payout, StatusChoices
+from config.db_router import allow_replica
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_KEY = "payouts:pipeline-health"
+BACKLOG_STATUSES = (StatusChoices.PENDING, StatusChoices.PROCESSING)
+
+
+class InMemorySnapshotStore:
+    """Process-local snapshot store with expiry."""
+
+    def __init__(self) -> None:
+        self._entry: tuple[str, float] | None = None
+        self._mutex = threading.Lock()
+
+    def get(self) -> str | None:
+        """Return the stored snapshot if present and unexpired."""
+        with self._mutex:
+            if self._entry is None or self._entry[1] <= time.monotonic():
+                return None
+            return self._entry[0]
+
+    def set(self, value: str, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+        with self._mutex:
+            self._entry = (value, time.monotonic() + ttl)
+
+    def clear(self) -> None:
+        """Drop the stored snapshot."""
+        with self._mutex:
+            self._entry = None
+
+
+class RedisSnapshotStore:
+    """Snapshot shared by every web process through Redis."""
+
+    def __init__(self, url: str) -> None:
+        self._client = redis.Redis.from_url(url)
+
+    def get(self) -> str | None:
+        """Return the stored snapshot, or None on miss or error."""
+        try:
+            value = self._client.get(_SNAPSHOT_KEY)
+        except Exception:
+            logger.warning("Pipeline health store unavailable", exc_info=True)
+            return None
+        # bytes unless the client was built with decode_responses=True.
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, value: str, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+        try:
+            self._client.set(_SNAPSHOT_KEY, value, px=int(ttl * 1000))
+        except Exception:
+            logger.warning("Failed to store pipeline health snapshot", exc_info=True)
+
+    def clear(self) -> None:
+        """Drop the stored snapshot."""
+        self._client.delete(_SNAPSHOT_KEY)
+
+
+SnapshotStore = InMemorySnapshotStore | RedisSnapshotStore
+
+
+@lru_cache(maxsize=1)
+def get_snapshot_store() -> SnapshotStore:
+    """Return the process-wide snapshot store selected by settings."""
+    if settings.PAYOUTS_PIPELINE_HEALTH_BACKEND == "memory":
+        return InMemorySnapshotStore()
+    return RedisSnapshotStore(settings.PAYOUTS_PIPELINE_HEALTH_URL)
+
+
+def compute_snapshot(now: datetime | None = None) -> dict[str, Any]:
+    """Run the sampling queries, on a replica if configured, and return a fresh snapshot."""
+    now = now or timezone.now()
+    rows = (
+        Payout.objects.filter(status__in=BACKLOG_STATUSES)
+        .filter(Q(scheduled_for__isnull=True) | Q(scheduled_for__lte=now))
+        .order_by()
+        .values("status")
+        .annotate(
+            count=Count("*"),
+            oldest=Min(Coalesce("scheduled_for", "created_at")),
+        )
+    )
+    backlog = {status: {"count": 0, "oldest_age_seconds": 0.0} for status in BACKLOG_STATUSES}
+    window = settings.PAYOUTS_PIPELINE_HEALTH_WINDOW
+    with allow_replica():
+        for row in rows:
+            backlog[row["status"]] = {
+                "count": row["count"],
+                "oldest_age_seconds": max((now - row["oldest"]).total_seconds(), 0.0),
+            }
+        completed = Payout.objects.filter(
+            status=StatusChoices.COMPLETED,
+            updated_at__gte=now - timedelta(seconds=window),
+        ).count()
+    return {
+        "sampled_at": now.isoformat(),
+        "backlog": backlog,
+        "completed_per_minute": round(completed * 60 / window, 3),
+    }
+
+
+def sample() -> dict[str, Any]:
+    """Compute a snapshot and store it for the health endpoint."""
+    snapshot = compute_snapshot()
+    get_snapshot_store().set(json.dumps(snapshot), settings.PAYOUTS_PIPELINE_HEALTH_TTL)
+    return snapshot
+
+
+def current_snapshot() -> dict[str, Any]:
+    """
+    Return the stored snapshot, sampling inline if none is fresh.
+
+    Adds ``sample_age_seconds``, the time since the figures were computed.
+    """
+    stored = get_snapshot_store().get()
+    snapshot = json.loads(stored) if stored is not None else sample()
+    sampled_at = datetime.fromisoformat(snapshot["sampled_at"])
+    age = max((timezone.now() - sampled_at).total_seconds(), 0.0)
+    return {**snapshot, "sample_age_seconds": round(age, 3)}
+
+
+def render_prometheus(snapshot: dict[str, Any]) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines = [
+        "# HELP payouts_backlog Due payouts waiting in a pipeline stage.",
+        "# TYPE payouts_backlog gauge",
+    ]
+    backlog = snapshot["backlog"]
+    lines += [
+        f'payouts_backlog{{status="{status}"}} {stage["count"]}'
+        for status, stage in backlog.items()
+    ]
+    lines += [
+        "# HELP payouts_backlog_oldest_age_seconds Age of the oldest due payout in a pipeline stage.",
+        "# TYPE payouts_backlog_oldest_age_seconds gauge",
+    ]
+    lines += [
+        f'payouts_backlog_oldest_age_seconds{{status="{status}"}} {stage["oldest_age_seconds"]}'
+        for status, stage in backlog.items()
+    ]
+    lines += [
+        "# HELP payouts_completed_per_minute Payouts completed per minute, averaged over the sampling window.",
+        "# TYPE payouts_completed_per_minute gauge",
+        f"payouts_completed_per_minute {snapshot['completed_per_minute']}",
+        "# HELP payouts_health_sample_age_seconds Seconds since these figures were sampled.",
+        "# TYPE payouts_health_sample_age_seconds gauge",
+        f"payouts_health_sample_age_seconds {snapshot['sample_age_seconds']}",
+    ]
+    return "\n".join(lines) + "\n"
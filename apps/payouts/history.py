@@ -0,0 +1,73 @@
+"""
+Writer for the payout status history.
+
+Every status transition is appended to ``PayoutStatusEvent`` inside the
+transaction that makes it, so an event exists exactly when its transition
+committed and the ``history`` endpoint shows it straight away; nothing is
+held in process memory where a crash could lose it.
+
+A single transition costs one extra ``INSERT`` in a transaction that is
+already open. Buffering events in memory and writing them in bulk would
+save that statement, but buffered events are delayed on the ``history``
+endpoint and lost if the process dies before a flush, so the history is
+written synchronously instead. Set-based transitions are recorded with
+one ``INSERT ... SELECT`` over the moved rows, so recording them does not
+load the payouts.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.db import connections, router
+from django.db.models import CharField, DateTimeField, QuerySet, Value
+from django.utils import timezone
+
+from apps.payouts.models import Payout, PayoutStatusEvent
+
+_COLUMNS = ("payout_id", "from_status", "to_status", "source", "occurred_at")
+
+
+def record_status_change(
+        payout_id: Any,
+        from_status: str,
+        to_status: str,
+        source: str,
+) -> None:
+    """Record one transition; call inside the transaction that makes it."""
+    PayoutStatusEvent.objects.create(
+        payout_id=payout_id,
+        from_status=from_status,
+        to_status=to_status,
+        source=source,
+        occurred_at=timezone.now(),
+    )
+
+
+def record_status_changes(
+        payouts: QuerySet[Payout],
+        from_status: str,
+        to_status: str,
+        source: str,
+) -> int:
+    """
+    Record the same transition for every payout in ``payouts`` in one statement.
+
+    Call inside the transaction that makes the transitions. Returns the
+    number of events written.
+    """
+    alias = router.db_for_write(PayoutStatusEvent)
+    connection = connections[alias]
+    rows = payouts.order_by().values_list(
+        "id",
+        Value(from_status, output_field=CharField()),
+        Value(to_status, output_field=CharField()),
+        Value(source, output_field=CharField()),
+        Value(timezone.now(), output_field=DateTimeField()),
+    )
+    select, params = rows.query.get_compiler(using=alias).as_sql()
+    table = connection.ops.quote_name(PayoutStatusEvent._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in _COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({columns}) {select}", params)
+        return cursor.rowcount
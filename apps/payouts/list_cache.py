@@ -0,0 +1,223 @@
+"""
+Response cache for the payouts list endpoint.
+
+Dashboards poll the same few ``status``/``currency`` list queries many
+times a minute. Each list page is cached under a key derived from the
+normalized ``PayoutFilter`` values, the page parameters and the current
+generation of every ``(status, currency)`` bucket the query can return
+rows from.
+
+Every write to a payout through ``PayoutService``, the API, the admin or
+the Celery tasks bumps the generation of the buckets the payout left and
+entered, once the writing transaction commits. Pages cached under an
+older generation are never read again, so a cached page never outlives a
+relevant change; ``PAYOUTS_LIST_CACHE_TTL`` only bounds memory use and
+the window in which a failed bump could leave a page stale.
+
+Redis backs the cache in deployed environments; an in-process LRU with
+the same semantics backs tests and single-process development. Cache
+errors fail open: the request is served from the database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.transaction import on_commit
+
+from apps.payouts.models import CurrencyChoices, StatusChoices
+
+logger = logging.getLogger(__name__)
+
+_GENERATION_PREFIX = "payouts:list-gen"
+_PAGE_PREFIX = "payouts:list-page"
+# Query parameters that select a page rather than filter rows.
+_PAGE_PARAMS = ("page", "page_size", "ordering")
+
+
+class InMemoryListCache:
+    """Process-local page cache with LRU eviction and per-entry expiry."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._generations: dict[str, int] = {}
+        self._pages: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._mutex = threading.Lock()
+
+    def generations(self, keys: list[str]) -> list[int] | None:
+        """Return the current generation of each key (0 if never bumped)."""
+        with self._mutex:
+            return [self._generations.get(key, 0) for key in keys]
+
+    def bump(self, keys: list[str]) -> None:
+        """Increment the generation of each key."""
+        with self._mutex:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get(self, key: str) -> str | None:
+        """Return the cached page for ``key`` if present and unexpired."""
+        with self._mutex:
+            entry = self._pages.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            self._pages.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Cache ``value`` under ``key`` for ``ttl`` seconds."""
+        with self._mutex:
+            self._pages[key] = (value, time.monotonic() + ttl)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached page and generation."""
+        with self._mutex:
+            self._pages.clear()
+            self._generations.clear()
+
+
+class RedisListCache:
+    """Page cache and generation counters stored in Redis."""
+
+    def __init__(self, url: str) -> None:
+        self._client = redis.Redis.from_url(url)
+
+    def generations(self, keys: list[str]) -> list[int] | None:
+        """Return the current generation of each key, or None if Redis is down."""
+        try:
+            values = self._client.mget(keys)
+        except Exception:
+            logger.warning("List cache unavailable, bypassing", exc_info=True)
+            return None
+        return [int(value or 0) for value in values]
+
+    def bump(self, keys: list[str]) -> None:
+        """Increment the generation of each key in one round trip."""
+        try:
+            pipeline = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.incr(key)
+            pipeline.execute()
+        except Exception:
+            logger.warning("Failed to bump list cache generations %s", keys, exc_info=True)
+
+    def get(self, key: str) -> str | None:
+        """Return the cached page for ``key``, or None on miss or error."""
+        try:
+            value = self._client.get(key)
+        except Exception:
+            logger.warning("List cache read failed for %s", key, exc_info=True)
+            return None
+        # bytes unless the client was built with decode_responses=True.
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Cache ``value`` under ``key`` for ``ttl`` seconds."""
+        try:
+            self._client.set(key, value, px=int(ttl * 1000))
+        except Exception:
+            logger.warning("List cache write failed for %s", key, exc_info=True)
+
+    def clear(self) -> None:
+        """Drop every cached page and generation."""
+        for pattern in (f"{_PAGE_PREFIX}:*", f"{_GENERATION_PREFIX}:*"):
+            keys = list(self._client.scan_iter(pattern))
+            if keys:
+                self._client.delete(*keys)
+
+
+ListCache = InMemoryListCache | RedisListCache
+
+
+@lru_cache(maxsize=1)
+def get_list_cache() -> ListCache:
+    """Return the process-wide list cache selected by settings."""
+    if settings.PAYOUTS_LIST_CACHE_BACKEND == "memory":
+        return InMemoryListCache(settings.PAYOUTS_LIST_CACHE_MAX_ENTRIES)
+    return RedisListCache(settings.PAYOUTS_LIST_CACHE_URL)
+
+
+def generation_keys(
+        statuses: Iterable[str] | None = None,
+        currencies: Iterable[str] | None = None,
+) -> list[str]:
+    """Return the generation keys of every ``(status, currency)`` bucket given."""
+    return [
+        f"{_GENERATION_PREFIX}:{status}:{currency}"
+        for status in sorted(set(statuses or StatusChoices.values))
+        for currency in sorted(set(currencies or CurrencyChoices.values))
+    ]
+
+
+def invalidate(
+        statuses: Iterable[str] | None = None,
+        currencies: Iterable[str] | None = None,
+) -> None:
+    """
+    Invalidate cached pages covering the given buckets once the transaction commits.
+
+    ``None`` stands for every status or every currency, for writes whose
+    rows are not known individually (bulk updates, backfills).
+    """
+    if not settings.PAYOUTS_LIST_CACHE_ENABLED:
+        return
+    keys = generation_keys(statuses, currencies)
+    on_commit(lambda: get_list_cache().bump(keys))
+
+
+def page_key(filter_data: dict[str, Any], query_params: Any) -> str | None:
+    """
+    Return the cache key of a list page, or None when it must not be cached.
+
+    ``filter_data`` is the cleaned data of a valid ``PayoutFilter``. The key
+    covers the active filters, the page parameters and the generations of
+    the buckets matching the ``status`` and ``currency`` filters.
+    """
+    if not settings.PAYOUTS_LIST_CACHE_ENABLED:
+        return None
+    status = filter_data.get("status")
+    currency = (filter_data.get("currency") or "").upper()
+    keys = generation_keys(
+        [status] if status else None,
+        [currency] if currency in CurrencyChoices.values else None,
+    )
+    generations = get_list_cache().generations(keys)
+    if generations is None:
+        return None
+    params = sorted(
+        (name, str(value))
+        for name, value in filter_data.items()
+        if value not in (None, "", [])
+    )
+    params += [(name, query_params.get(name, "")) for name in _PAGE_PARAMS]
+    digest = hashlib.sha1(repr((params, generations)).encode()).hexdigest()
+    return f"{_PAGE_PREFIX}:{digest}"
+
+
+def get_page(key: str) -> Any | None:
+    """Return the cached response data for ``key``, if any."""
+    cached = get_list_cache().get(key)
+    return json.loads(cached) if cached is not None else None
+
+
+def set_page(key: str, data: Any) -> None:
+    """Cache list response ``data`` under ``key``."""
+    get_list_cache().set(
+        key,
+        json.dumps(data, cls=DjangoJSONEncoder),
+        settings.PAYOUTS_LIST_CACHE_TTL,
+    )
@@ -0,0 +1,131 @@
+"""
+Short-lived deduplication locks for payout task dispatch.
+
+Client replays, admin re-queues and retries can publish the same payout id
+several times. A lock keyed by payout id is taken before a message is
+published and again when a worker starts on it, so duplicates are dropped
+before they open a database connection or wait on a row lock.
+
+Redis (``SET NX PX``) is used in deployed environments; an in-process
+implementation with the same semantics backs tests and single-process
+development. Lock errors fail open: deduplication is an optimization and
+``process_payout_task`` remains safe against duplicates on its own.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "payouts:lock"
+
+# Delete the key only if it still holds the caller's token.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class InMemoryDispatchLock:
+    """Process-local lock store with per-key expiry."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._mutex = threading.Lock()
+
+    def acquire(self, key: str, ttl: float) -> str | None:
+        """Take ``key`` for ``ttl`` seconds; return a token or None if held."""
+        now = time.monotonic()
+        with self._mutex:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._entries[key] = (token, now + ttl)
+            return token
+
+    def release(self, key: str, token: str | None = None) -> None:
+        """Release ``key``; with a token, only if the caller still owns it."""
+        with self._mutex:
+            entry = self._entries.get(key)
+            if entry is not None and (token is None or entry[0] == token):
+                del self._entries[key]
+
+
+class RedisDispatchLock:
+    """Lock store backed by Redis ``SET NX PX`` with owner-checked release."""
+
+    def __init__(self, url: str) -> None:
+        self._client = redis.Redis.from_url(url)
+        self._release = self._client.register_script(_RELEASE_SCRIPT)
+
+    def acquire(self, key: str, ttl: float) -> str | None:
+        """Take ``key`` for ``ttl`` seconds; return a token or None if held."""
+        token = uuid.uuid4().hex
+        try:
+            acquired = self._client.set(key, token, nx=True, px=int(ttl * 1000))
+        except Exception:
+            logger.warning("Dedup lock unavailable for %s, proceeding", key, exc_info=True)
+            return token
+        return token if acquired else None
+
+    def release(self, key: str, token: str | None = None) -> None:
+        """Release ``key``; with a token, only if the caller still owns it."""
+        try:
+            if token is None:
+                self._client.delete(key)
+            else:
+                self._release(keys=[key], args=[token])
+        except Exception:
+            logger.warning("Failed to release dedup lock %s", key, exc_info=True)
+
+
+DispatchLock = InMemoryDispatchLock | RedisDispatchLock
+
+
+@lru_cache(maxsize=1)
+def get_dispatch_lock() -> DispatchLock:
+    """Return the process-wide lock store selected by settings."""
+    if settings.PAYOUTS_DEDUP_LOCK_BACKEND == "memory":
+        return InMemoryDispatchLock()
+    return RedisDispatchLock(settings.PAYOUTS_DEDUP_LOCK_URL)
+
+
+def enqueue_lock_key(payout_id: str) -> str:
+    """Key held from publishing a payout message until a worker picks it up."""
+    return f"{_KEY_PREFIX}:enqueue:{payout_id}"
+
+
+def run_lock_key(payout_id: str) -> str:
+    """Key held while a worker is processing a payout."""
+    return f"{_KEY_PREFIX}:run:{payout_id}"
+
+
+def fair_dispatch_queued_key() -> str:
+    """Key held from publishing ``dispatch_fair_payouts`` until it starts."""
+    return f"{_KEY_PREFIX}:fair-dispatch:queued"
+
+
+def fair_dispatch_run_key() -> str:
+    """Key held while ``dispatch_fair_payouts`` runs, so only one runs at a time."""
+    return f"{_KEY_PREFIX}:fair-dispatch:run"
+
+
+def slow_query_explain_key(fingerprint: str) -> str:
+    """Key held after capturing a plan, limiting ``EXPLAIN`` per fingerprint."""
+    return f"{_KEY_PREFIX}:slow-query-explain:{fingerprint}"
+
+
+def webhook_delivery_queued_key() -> str:
+    """Key held from publishing ``deliver_webhooks`` until it starts."""
+    return f"{_KEY_PREFIX}:webhooks:queued"
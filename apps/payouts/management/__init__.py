@@ -0,0 +1,3 @@
+"""
+Management commands package for the payouts' app.
+"""
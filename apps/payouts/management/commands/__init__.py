@@ -0,0 +1,3 @@
+"""
+Django management commands for the payouts' app.
+"""
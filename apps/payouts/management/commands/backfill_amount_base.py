@@ -0,0 +1,31 @@
+"""
+Backfill ``Payout.amount_base`` from the FX rate table.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.payouts.fx import backfill_amount_base, fx_rates
+
+
+class Command(BaseCommand):
+    help = "Fill Payout.amount_base in chunks using the current FX rates."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--chunk-size", type=int, default=5_000)
+        parser.add_argument(
+            "--recompute",
+            action="store_true",
+            help="Recompute every row, not only rows with an empty amount_base.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fx_rates.clear()
+        updated = backfill_amount_base(
+            chunk_size=options["chunk_size"],
+            recompute=options["recompute"],
+        )
+        self.stdout.write(f"Updated amount_base on {updated} payouts.")
@@ -0,0 +1,78 @@
+"""
+Reconcile a provider statement file against payouts.
+
+Runs in-process over the whole id space by default. With ``--shards N``
+the id space is split into N ranges; ``--enqueue`` dispatches one
+``reconcile_statement_task`` per range to Celery workers instead of
+running them here. Each range writes its own report file.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payouts.reconciliation import (
+    ReconciliationError,
+    reconcile,
+    split_id_range,
+)
+from apps.payouts.tasks import reconcile_statement_task
+
+
+class Command(BaseCommand):
+    help = "Reconcile a sorted provider statement CSV against payouts."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("statement", type=Path, help="Statement CSV sorted by payout_id.")
+        parser.add_argument(
+            "--report",
+            type=Path,
+            default=None,
+            help="Mismatch report path (default: <statement>.mismatches.csv).",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            help="Split the id space into this many independent ranges.",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Dispatch one Celery task per shard instead of running in-process.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        statement: Path = options["statement"]
+        if not statement.is_file():
+            raise CommandError(f"Statement file not found: {statement}")
+        report: Path = options["report"] or statement.with_suffix(".mismatches.csv")
+        ranges = split_id_range(options["shards"])
+
+        for index, (start_id, end_id) in enumerate(ranges):
+            shard_report = (
+                report
+                if len(ranges) == 1
+                else report.with_name(f"{report.stem}.{index}{report.suffix}")
+            )
+            if options["enqueue"]:
+                reconcile_statement_task.delay(
+                    str(statement),
+                    str(shard_report),
+                    str(start_id),
+                    str(end_id),
+                )
+                self.stdout.write(f"Enqueued shard {index} -> {shard_report}")
+                continue
+
+            try:
+                result = reconcile(statement, shard_report, start_id, end_id)
+            except ReconciliationError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                f"Shard {index} -> {shard_report}: {json.dumps(result.as_dict())}"
+            )
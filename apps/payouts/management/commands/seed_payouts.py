@@ -0,0 +1,305 @@
+"""
+Generate large volumes of realistic synthetic payouts for load testing.
+
+Rows are produced in fixed-size chunks, by several worker processes with
+``--workers``, and never held in memory all at once. On PostgreSQL each chunk
+is streamed with ``COPY ... FROM STDIN``; other backends use chunked
+``executemany`` inserts. The output is fully determined by ``--seed``,
+``--chunk-size`` and ``--end``.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from functools import lru_cache, partial
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils.dateparse import parse_datetime
+
+from apps.payouts.list_cache import invalidate
+from apps.payouts.models import CurrencyChoices, FxRate, Payout, StatusChoices
+from apps.payouts.pagination import invalidate_counts
+
+STATUS_WEIGHTS = {
+    StatusChoices.COMPLETED: 78,
+    StatusChoices.PENDING: 8,
+    StatusChoices.PROCESSING: 2,
+    StatusChoices.FAILED: 7,
+    StatusChoices.CANCELLED: 5,
+}
+CURRENCY_WEIGHTS = {
+    CurrencyChoices.USD: 50,
+    CurrencyChoices.EUR: 25,
+    CurrencyChoices.GBP: 15,
+    CurrencyChoices.RUB: 10,
+}
+BANK_NAMES = [
+    "Deutsche Bank",
+    "Barclays",
+    "JPMorgan Chase",
+    "BNP Paribas",
+    "Santander",
+    "ING",
+    "HSBC",
+    "Sberbank",
+]
+
+# Columns generated per row; every other concrete field gets its default.
+GENERATED_COLUMNS = [
+    "id",
+    "amount",
+    "amount_base",
+    "currency",
+    "recipient_details",
+    "status",
+    "description",
+    "created_at",
+    "updated_at",
+]
+
+# PostgreSQL COPY text-format NULL marker; rows are generated pre-rendered.
+NULL = "\\N"
+
+_STATUSES = [str(status) for status in STATUS_WEIGHTS]
+_STATUS_WEIGHTS = list(STATUS_WEIGHTS.values())
+_CURRENCIES = [str(currency) for currency in CURRENCY_WEIGHTS]
+_CURRENCY_WEIGHTS = list(CURRENCY_WEIGHTS.values())
+_UUID4_MASK = ~((0xF000 << 64) | (0xC000 << 48)) & ((1 << 128) - 1)
+_UUID4_BITS = (0x4000 << 64) | (0x8000 << 48)
+
+
+def generate_chunk(
+        seed: int,
+        index: int,
+        size: int,
+        end_ts: float,
+        span: float,
+        rates: dict[str, float],
+) -> list[list[str]]:
+    """
+    Generate chunk ``index`` as rows of text values in ``GENERATED_COLUMNS`` order.
+
+    Each chunk has its own RNG derived from ``(seed, index)``, so chunks
+    can be generated in any process and in any order with identical
+    output. Values are rendered directly in COPY text format (``NULL`` for
+    nulls) because formatting dominates the cost per row.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    statuses = rng.choices(_STATUSES, _STATUS_WEIGHTS, k=size)
+    currencies = rng.choices(_CURRENCIES, _CURRENCY_WEIGHTS, k=size)
+    banks = rng.choices(BANK_NAMES, k=size)
+    getrandbits = rng.getrandbits
+    uniform = rng.random
+    lognormvariate = rng.lognormvariate
+    first = index * size
+
+    rows = []
+    for i in range(size):
+        currency = currencies[i]
+        cents = int(min(max(lognormvariate(5.0, 1.2), 1.0), 1e6) * 100)
+        rate = rates.get(currency)
+        if rate is None:
+            amount_base = NULL
+        else:
+            base_cents = round(cents * rate)
+            amount_base = f"{base_cents // 100}.{base_cents % 100:02d}"
+        # Random 128 bits with the UUID version 4 / RFC 4122 variant bits set.
+        h = f"{getrandbits(128) & _UUID4_MASK | _UUID4_BITS:032x}"
+        created_us = int((end_ts - uniform() * span) * 1_000_000)
+        rows.append(
+            [
+                f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}",
+                f"{cents // 100}.{cents % 100:02d}",
+                amount_base,
+                currency,
+                f'{{"account_number":"{getrandbits(40):013d}",'
+                f'"bank_name":"{banks[i]}"}}',
+                statuses[i],
+                f"Seeded payout #{first + i}",
+                _format_timestamp(created_us),
+                _format_timestamp(created_us + int(uniform() * 60_000_000)),
+            ]
+        )
+    return rows
+
+
+@lru_cache(maxsize=4096)
+def _format_day(day: int) -> str:
+    """Return the ISO date for ``day`` days after the Unix epoch."""
+    return datetime.fromtimestamp(day * 86_400, dt_timezone.utc).date().isoformat()
+
+
+def _format_timestamp(epoch_us: int) -> str:
+    """Render a UTC epoch in microseconds as ISO 8601, cheaper than datetime."""
+    seconds, micros = divmod(epoch_us, 1_000_000)
+    day, second_of_day = divmod(seconds, 86_400)
+    hours, rest = divmod(second_of_day, 3_600)
+    minutes, secs = divmod(rest, 60)
+    return f"{_format_day(day)}T{hours:02d}:{minutes:02d}:{secs:02d}.{micros:06d}+00:00"
+
+
+def _copy_value(value: Any) -> str:
+    """Render a default value in PostgreSQL COPY text format."""
+    if value is None:
+        return NULL
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Command(BaseCommand):
+    help = "Load deterministic synthetic payouts for load testing."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes generating chunks in parallel (output is identical).",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread created_at uniformly over this many days before --end.",
+        )
+        parser.add_argument(
+            "--end",
+            default="2025-01-01T00:00:00Z",
+            help="Latest created_at (ISO 8601). Part of the deterministic output.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        end = parse_datetime(options["end"])
+        if end is None:
+            raise CommandError(f"Invalid --end timestamp: {options['end']}")
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=dt_timezone.utc)
+
+        rates = dict(FxRate.objects.values_list("currency", "rate_to_base"))
+        rates[settings.PAYOUTS_BASE_CURRENCY] = Decimal(1)
+
+        alias = router.db_for_write(Payout)
+        connection = connections[alias]
+        defaults = self._default_columns()
+        columns = GENERATED_COLUMNS + list(defaults)
+        use_copy = connection.vendor == "postgresql"
+
+        rows_total = options["rows"]
+        chunk_size = options["chunk_size"]
+        chunk_count = -(-rows_total // chunk_size)
+        make_chunk = partial(
+            generate_chunk,
+            options["seed"],
+            size=chunk_size,
+            end_ts=end.timestamp(),
+            span=options["days"] * 86_400,
+            rates={currency: float(rate) for currency, rate in rates.items()},
+        )
+
+        started = time.perf_counter()
+        loaded = 0
+        with ExitStack() as stack:
+            if options["workers"] > 1:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=options["workers"]))
+                chunks = pool.map(make_chunk, range(chunk_count))
+            else:
+                chunks = map(make_chunk, range(chunk_count))
+            for rows in chunks:
+                rows = rows[: rows_total - loaded]
+                with transaction.atomic(using=alias), connection.cursor() as cursor:
+                    if use_copy:
+                        self._copy_chunk(cursor, columns, rows, list(defaults.values()))
+                    else:
+                        self._insert_chunk(connection, cursor, columns, rows, defaults)
+                loaded += len(rows)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{loaded} rows ({loaded / elapsed:,.0f} rows/s)")
+
+        # The rows bypassed the ORM, so nothing invalidated the list caches.
+        invalidate()
+        invalidate_counts()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {loaded} payouts in {elapsed:.1f}s "
+                f"({loaded / max(elapsed, 1e-9):,.0f} rows/s)"
+            )
+        )
+
+    @staticmethod
+    def _default_columns() -> dict[str, Any]:
+        """Return ``{column: default}`` for concrete fields not generated here."""
+        return {
+            field.column: field.get_default()
+            for field in Payout._meta.concrete_fields
+            if field.column not in GENERATED_COLUMNS
+        }
+
+    @staticmethod
+    def _copy_chunk(
+            cursor: Any,
+            columns: list[str],
+            rows: list[list[str]],
+            defaults: list[Any],
+    ) -> None:
+        """Stream one chunk with ``COPY FROM STDIN`` (psycopg 3)."""
+        default_text = "".join("\t" + _copy_value(value) for value in defaults)
+        payload = "".join("\t".join(row) + default_text + "\n" for row in rows)
+        sql = f"COPY {Payout._meta.db_table} ({', '.join(columns)}) FROM STDIN"
+        with cursor.cursor.copy(sql) as copy:
+            copy.write(payload)
+
+    @staticmethod
+    def _insert_chunk(
+            connection: Any,
+            cursor: Any,
+            columns: list[str],
+            rows: list[list[str]],
+            defaults: dict[str, Any],
+    ) -> None:
+        """Insert one chunk with ``executemany`` for non-PostgreSQL backends."""
+        by_column = {field.column: field for field in Payout._meta.concrete_fields}
+        fields = [by_column[column] for column in GENERATED_COLUMNS]
+        default_fields = [by_column[column] for column in defaults]
+        default_params = [
+            field.get_db_prep_save(value, connection)
+            for field, value in zip(default_fields, defaults.values())
+        ]
+        params = [
+            [
+                field.get_db_prep_save(_from_text(field, value), connection)
+                for field, value in zip(fields, row)
+            ]
+            + default_params
+            for row in rows
+        ]
+        placeholders = ", ".join(["%s"] * len(columns))
+        cursor.executemany(
+            f"INSERT INTO {Payout._meta.db_table} ({', '.join(columns)}) "
+            f"VALUES ({placeholders})",
+            params,
+        )
+
+
+def _from_text(field: Any, value: str) -> Any:
+    """Convert a generated text value back to the field's Python type."""
+    if value == NULL:
+        return None
+    if field.get_internal_type() == "JSONField":
+        return json.loads(value)
+    return field.to_python(value)
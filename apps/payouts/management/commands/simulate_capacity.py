@@ -0,0 +1,122 @@
+"""
+Estimate payout processing capacity with the discrete-event model.
+
+Either simulates a fixed ``--workers`` count, or with ``--target-p99-ms``
+searches for the smallest worker count that keeps the p99 latency from
+submission to final status under the target. Timing defaults match the
+current ``process_payout_task`` (5 s simulated call, 10% failures).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payouts.capacity import (
+    SimulationResult,
+    TaskModel,
+    find_min_workers,
+    simulate,
+)
+
+
+class Command(BaseCommand):
+    help = "Simulate process_payout_task throughput, queueing and latency."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--rate", type=float, required=True, help="Payouts per second.")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--target-p99-ms",
+            type=float,
+            default=None,
+            help="Find the fewest workers meeting this end-to-end p99 latency.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=10_000,
+            help="Give up the --target-p99-ms search above this many workers.",
+        )
+        parser.add_argument("--duration", type=float, default=60.0, help="Simulated seconds.")
+        parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+        parser.add_argument("--latency-p50-ms", type=float, default=5000.0)
+        parser.add_argument("--latency-p99-ms", type=float, default=None)
+        parser.add_argument("--failure-rate", type=float, default=0.1)
+        parser.add_argument(
+            "--transaction-ms",
+            type=float,
+            default=5.0,
+            help="Cost of each claim/complete/reset transaction.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if (options["workers"] is None) == (options["target_p99_ms"] is None):
+            raise CommandError("Pass exactly one of --workers or --target-p99-ms.")
+        p50 = options["latency_p50_ms"] / 1000
+        p99 = (options["latency_p99_ms"] or options["latency_p50_ms"]) / 1000
+        if p99 < p50:
+            raise CommandError("--latency-p99-ms must not be below --latency-p50-ms.")
+
+        model = TaskModel.from_task(
+            latency_p50=p50,
+            latency_p99=p99,
+            failure_rate=options["failure_rate"],
+            transaction_seconds=options["transaction_ms"] / 1000,
+        )
+        run_options = {"arrival": options["arrival"], "seed": options["seed"]}
+        if options["workers"] is not None:
+            result = simulate(
+                model,
+                options["workers"],
+                options["rate"],
+                options["duration"],
+                **run_options,
+            )
+        else:
+            try:
+                _, result = find_min_workers(
+                    model,
+                    options["rate"],
+                    options["duration"],
+                    target_p99=options["target_p99_ms"] / 1000,
+                    max_workers=options["max_workers"],
+                    **run_options,
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result.as_dict()))
+        else:
+            self._write_summary(result)
+
+    def _write_summary(self, result: SimulationResult) -> None:
+        summary = result.as_dict()
+        latency = summary["latency_seconds"]
+        self.stdout.write(
+            f"workers={summary['workers']} rate={summary['arrival_rate']}/s "
+            f"duration={summary['duration']}s"
+        )
+        self.stdout.write(
+            f"  throughput {summary['throughput']}/s, utilization "
+            f"{summary['utilization']:.1%}, attempts {summary['attempts']}"
+        )
+        self.stdout.write(
+            f"  completed {summary['completed']}, failed {summary['failed']}, "
+            f"unfinished {summary['unfinished']}"
+        )
+        self.stdout.write(
+            f"  queue depth mean {summary['queue_depth_mean']}, "
+            f"max {summary['queue_depth_max']}"
+        )
+        self.stdout.write(
+            f"  latency p50 {latency['p50'] * 1000:.0f} ms, "
+            f"p95 {latency['p95'] * 1000:.0f} ms, p99 {latency['p99'] * 1000:.0f} ms"
+        )
+        if summary["unfinished"]:
+            self.stdout.write(self.style.WARNING("  Queue did not drain: under-provisioned."))
@@ -0,0 +1,57 @@
+"""
+Show the top offenders from the slow-query log.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.payouts.models import SlowQuery
+from apps.payouts.serializers import SlowQuerySerializer
+from apps.payouts.slow_queries import ORDERINGS, top_slow_queries
+
+
+class Command(BaseCommand):
+    help = "List the slowest payout queries aggregated by fingerprint."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--order", choices=list(ORDERINGS), default="total")
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Print the captured EXPLAIN plan under each query.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of text.")
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete the collected slow-query log instead of listing it.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["reset"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(f"Deleted {deleted} slow query fingerprints.")
+            return
+
+        queries = top_slow_queries(limit=options["limit"], order=options["order"])
+        if options["json"]:
+            data = SlowQuerySerializer(queries, many=True).data
+            self.stdout.write(json.dumps(data, indent=2))
+            return
+
+        for query in queries:
+            self.stdout.write(
+                f"{query.total_ms:>10.0f} ms total  {query.calls:>6} calls  "
+                f"{query.total_ms / query.calls:>8.1f} ms mean  {query.max_ms:>8.1f} ms max  "
+                f"{query.fingerprint}  {query.source}"
+            )
+            self.stdout.write(f"    {query.sql}")
+            self.stdout.write(f"    params {query.params_shape}")
+            if options["plans"] and query.plan:
+                for line in query.plan.splitlines():
+                    self.stdout.write(f"    | {line}")
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0002_payout_cancelled_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payout",
+            name="scheduled_for",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                fields=["status", "scheduled_for"],
+                name="payouts_pay_status_fa149e_idx",
+            ),
+        ),
+    ]
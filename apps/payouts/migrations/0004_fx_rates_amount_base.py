@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0003_payout_scheduled_for"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FxRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "currency",
+                    models.CharField(
+                        choices=[
+                            ("USD", "US Dollar"),
+                            ("EUR", "Euro"),
+                            ("GBP", "British Pound"),
+                            ("RUB", "Russian Ruble"),
+                        ],
+                        max_length=3,
+                        unique=True,
+                    ),
+                ),
+                ("rate_to_base", models.DecimalField(decimal_places=8, max_digits=18)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "payouts_fxrate",
+                "ordering": ["currency"],
+            },
+        ),
+        migrations.AddField(
+            model_name="payout",
+            name="amount_base",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=16, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                fields=["amount_base"], name="payouts_pay_amount__a026ab_idx"
+            ),
+        ),
+    ]
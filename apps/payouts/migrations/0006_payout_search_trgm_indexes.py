@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:11
+#
+# The trigram indexes only exist on PostgreSQL and are built CONCURRENTLY so
+# the migration does not block writes on a large payouts table. They are
+# kept out of the model state: SQLite rebuilds tables from that state and
+# cannot create GIN indexes.
+
+from django.db import migrations
+
+INDEXES = {
+    "payout_description_trgm": "UPPER(description)",
+    "payout_bank_name_trgm": "UPPER((recipient_details ->> 'bank_name'))",
+}
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, expression in INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON payouts_payout USING gin ({expression} gin_trgm_ops)"
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("payouts", "0005_payout_status_event"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
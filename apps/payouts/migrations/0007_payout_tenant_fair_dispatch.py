@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0006_payout_search_trgm_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payout",
+            name="dispatched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="payout",
+            name="tenant",
+            field=models.CharField(default="default", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                condition=models.Q(
+                    ("dispatched_at__isnull", True), ("status", "PENDING")
+                ),
+                fields=["tenant", "created_at"],
+                name="payout_tenant_queue_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                condition=models.Q(
+                    ("dispatched_at__isnull", False),
+                    ("status__in", ["PENDING", "PROCESSING"]),
+                ),
+                fields=["tenant", "dispatched_at"],
+                name="payout_tenant_inflight_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0007_payout_tenant_fair_dispatch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("REQUEST", "API request"), ("TASK", "Celery task")],
+                        max_length=10,
+                    ),
+                ),
+                ("name", models.CharField(max_length=200)),
+                ("method", models.CharField(blank=True, max_length=10)),
+                ("path", models.TextField(blank=True)),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("duration_ms", models.FloatField()),
+                ("sql_count", models.PositiveIntegerField()),
+                ("sql_ms", models.FloatField()),
+                ("queries", models.JSONField(default=list)),
+                ("stats", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "payouts_executionprofile",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["-duration_ms"], name="payouts_exe_duratio_3ffa48_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="payouts_exe_created_eb9a88_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0008_execution_profile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=32, unique=True)),
+                ("sql", models.TextField()),
+                ("source", models.CharField(max_length=200)),
+                ("params_shape", models.CharField(blank=True, max_length=200)),
+                ("calls", models.PositiveIntegerField()),
+                ("total_ms", models.FloatField()),
+                ("max_ms", models.FloatField()),
+                ("plan", models.TextField(blank=True)),
+                ("plan_captured_at", models.DateTimeField(blank=True, null=True)),
+                ("first_seen", models.DateTimeField()),
+                ("last_seen", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+                "db_table": "payouts_slowquery",
+                "ordering": ["-total_ms"],
+            },
+        ),
+    ]
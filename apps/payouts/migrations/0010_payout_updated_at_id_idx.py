@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0009_slow_query"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                fields=["updated_at", "id"], name="payout_updated_at_id_idx"
+            ),
+        ),
+    ]
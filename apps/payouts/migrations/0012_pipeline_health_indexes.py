@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0011_webhooks"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                condition=models.Q(("status__in", ["PENDING", "PROCESSING"])),
+                fields=["status", "created_at", "scheduled_for"],
+                name="payout_backlog_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                condition=models.Q(("status", "COMPLETED")),
+                fields=["status", "updated_at"],
+                name="payout_completed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0012_pipeline_health_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PayoutAttempt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveSmallIntegerField()),
+                ("idempotency_key", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("SUBMITTED", "Submitted, outcome unknown"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="SUBMITTED",
+                        max_length=20,
+                    ),
+                ),
+                ("provider_reference", models.CharField(blank=True, max_length=100)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "payout",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attempts",
+                        to="payouts.payout",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "payouts_payoutattempt",
+                "ordering": ["payout", "number"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="payoutattempt",
+            constraint=models.UniqueConstraint(
+                fields=("payout", "number"), name="payout_attempt_number_uniq"
+            ),
+        ),
+    ]
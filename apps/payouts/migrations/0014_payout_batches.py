@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0013_payout_attempts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PayoutBatch",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("tenant", models.CharField(default="default", max_length=64)),
+                ("reference", models.CharField(blank=True, max_length=100)),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("pending_count", models.IntegerField(default=0)),
+                ("processing_count", models.IntegerField(default=0)),
+                ("completed_count", models.IntegerField(default=0)),
+                ("failed_count", models.IntegerField(default=0)),
+                ("cancelled_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "payouts_payoutbatch",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="payout",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="payouts",
+                to="payouts.payoutbatch",
+            ),
+        ),
+    ]
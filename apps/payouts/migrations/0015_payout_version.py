@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payouts", "0014_payout_batches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payout",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
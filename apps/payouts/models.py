@@ -5,8 +5,12 @@ Database models for the payouts application.
 from __future__ import annotations
 
 import uuid
+from typing import Any
 
 from django.db import models
+from django.db.models import Q
+
+DEFAULT_TENANT = "default"
 
 
 class CurrencyChoices(models.TextChoices):
@@ -25,6 +29,64 @@ class StatusChoices(models.TextChoices):
     PROCESSING = "PROCESSING", "Processing"
     COMPLETED = "COMPLETED", "Completed"
     FAILED = "FAILED", "Failed"
+    CANCELLED = "CANCELLED", "Cancelled"
+
+
+class StatusEventSource(models.TextChoices):
+    """Code paths that record payout status transitions."""
+
+    TASK = "TASK", "Processing task"
+    TASK_FAILURE = "TASK_FAILURE", "Task failure handler"
+    SERVICE = "SERVICE", "Service layer"
+
+
+class ProfileKind(models.TextChoices):
+    """What a stored profile was captured around."""
+
+    REQUEST = "REQUEST", "API request"
+    TASK = "TASK", "Celery task"
+
+
+class AttemptStatusChoices(models.TextChoices):
+    """Outcome of one submission of a payout to the payment provider."""
+
+    SUBMITTED = "SUBMITTED", "Submitted, outcome unknown"
+    SUCCEEDED = "SUCCEEDED", "Succeeded"
+    FAILED = "FAILED", "Failed"
+
+
+def default_webhook_statuses() -> list[str]:
+    """Statuses a new webhook subscription is notified about."""
+    return [StatusChoices.COMPLETED, StatusChoices.FAILED]
+
+
+class PayoutBatch(models.Model):
+    """
+    A set of payouts submitted together, such as one payroll run.
+
+    Holds a counter per payout status so progress is read from one row.
+    The counters move with every status transition through
+    ``apps.payouts.batches``, in the transaction that makes it.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.CharField(max_length=64, default=DEFAULT_TENANT)
+    reference = models.CharField(max_length=100, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    processing_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "payouts_payoutbatch"
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"Batch {self.reference or self.id} ({self.completed_count}/{self.total})"
 
 
 class Payout(models.Model):
@@ -33,6 +95,10 @@ class Payout(models.Model):
 
     Uses a UUID primary key, stores the payout amount and currency, tracks
     lifecycle status, and keeps flexible recipient details in a JSON field.
+    ``amount_base`` holds the amount converted to ``PAYOUTS_BASE_CURRENCY``
+    so cross-currency range filters can use an index. Payouts with a future
+    ``scheduled_for`` stay PENDING until the periodic dispatcher enqueues
+    them once they fall due.
     """
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -42,23 +108,329 @@ class Payout(models.Model):
         choices=CurrencyChoices.choices,
         default=CurrencyChoices.USD,
     )
+    amount_base = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        blank=True,
+        null=True,
+    )
     recipient_details = models.JSONField()
+    batch = models.ForeignKey(
+        PayoutBatch,
+        on_delete=models.PROTECT,
+        related_name="payouts",
+        blank=True,
+        null=True,
+    )
+    # Merchant the payout belongs to; the fair dispatcher interleaves tenants.
+    tenant = models.CharField(max_length=64, default=DEFAULT_TENANT)
     status = models.CharField(
         max_length=20,
         choices=StatusChoices.choices,
         default=StatusChoices.PENDING,
     )
     description = models.TextField(blank=True, null=True)
+    scheduled_for = models.DateTimeField(blank=True, null=True)
+    # Set when the fair dispatcher publishes the payout's processing task.
+    dispatched_at = models.DateTimeField(blank=True, null=True)
+    # Bumped by every edit of the fields above; sent as the ETag for If-Match.
+    version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Amount and currency as last loaded or saved; see ``save``.
+    _loaded_amount: tuple[Any, Any] | None = None
+
     class Meta:
         db_table = "payouts_payout"
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["status", "scheduled_for"]),
+            models.Index(fields=["amount_base"]),
+            # Keyset order of the change feed (apps.payouts.changes).
+            models.Index(fields=["updated_at", "id"], name="payout_updated_at_id_idx"),
+            # Per-tenant queues and in-flight sets for the fair dispatcher.
+            models.Index(
+                fields=["tenant", "created_at"],
+                condition=Q(status="PENDING", dispatched_at__isnull=True),
+                name="payout_tenant_queue_idx",
+            ),
+            models.Index(
+                fields=["tenant", "dispatched_at"],
+                condition=Q(
+                    status__in=["PENDING", "PROCESSING"],
+                    dispatched_at__isnull=False,
+                ),
+                name="payout_tenant_inflight_idx",
+            ),
+            # Backlog depth and age, and completed throughput, read index-only
+            # by the pipeline health sampler (apps.payouts.health).
+            models.Index(
+                fields=["status", "created_at", "scheduled_for"],
+                condition=Q(status__in=["PENDING", "PROCESSING"]),
+                name="payout_backlog_idx",
+            ),
+            models.Index(
+                fields=["status", "updated_at"],
+                condition=Q(status="COMPLETED"),
+                name="payout_completed_idx",
+            ),
+            # The trigram indexes behind ``search=`` exist on PostgreSQL only
+            # and are managed by migration 0006, outside the model state.
         ]
 
     def __str__(self) -> str:
         return f"Payout {self.id} - {self.amount} {self.currency} ({self.status})"
+
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> Payout:
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_amount = (
+            instance.__dict__.get("amount"),
+            instance.__dict__.get("currency"),
+        )
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Save, converting ``amount`` to ``amount_base`` if it needs it.
+
+        That is a new payout without ``amount_base``, or a saved one whose
+        amount or currency changed. Saves limited to other ``update_fields``
+        never convert.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"amount", "currency"} & set(update_fields):
+            if self._state.adding:
+                convert = self.amount_base is None
+            else:
+                convert = self._loaded_amount != (self.amount, self.currency)
+            if convert:
+                from apps.payouts.fx import to_base_amount
+
+                self.amount_base = to_base_amount(self.amount, self.currency)
+                self._loaded_amount = (self.amount, self.currency)
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "amount_base"}
+        super().save(*args, **kwargs)
+
+
+class PayoutAttempt(models.Model):
+    """
+    One submission of a payout to the payment provider.
+
+    The row is written before the provider is called and carries the
+    idempotency key sent with the request, so a retry can ask the provider
+    what happened to an attempt whose response was lost instead of paying
+    out again (see ``apps.payouts.gateway``).
+    """
+
+    payout = models.ForeignKey(
+        Payout,
+        on_delete=models.CASCADE,
+        related_name="attempts",
+    )
+    number = models.PositiveSmallIntegerField()
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    status = models.CharField(
+        max_length=20,
+        choices=AttemptStatusChoices.choices,
+        default=AttemptStatusChoices.SUBMITTED,
+    )
+    provider_reference = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = "payouts_payoutattempt"
+        ordering = ["payout", "number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["payout", "number"],
+                name="payout_attempt_number_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Payout {self.payout_id} attempt {self.number} ({self.status})"
+
+
+class FxRate(models.Model):
+    """Conversion rate from a currency to the configured base currency."""
+
+    currency = models.CharField(
+        max_length=3,
+        choices=CurrencyChoices.choices,
+        unique=True,
+    )
+    rate_to_base = models.DecimalField(max_digits=18, decimal_places=8)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "payouts_fxrate"
+        ordering = ["currency"]
+
+    def __str__(self) -> str:
+        return f"FX {self.currency} = {self.rate_to_base}"
+
+
+class PayoutStatusEvent(models.Model):
+    """
+    Append-only record of a single payout status transition.
+
+    Rows reference the payout by id without a foreign key so the history
+    outlives hard deletes and inserts never take a lock on ``Payout``.
+    Events are written by ``apps.payouts.history`` in the transaction that
+    makes the transition.
+    """
+
+    payout_id = models.UUIDField()
+    from_status = models.CharField(max_length=20, choices=StatusChoices.choices)
+    to_status = models.CharField(max_length=20, choices=StatusChoices.choices)
+    source = models.CharField(max_length=20, choices=StatusEventSource.choices)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "payouts_payoutstatusevent"
+        ordering = ["occurred_at", "id"]
+        indexes = [
+            models.Index(fields=["payout_id", "occurred_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Payout {self.payout_id}: {self.from_status} -> {self.to_status}"
+
+
+class ExecutionProfile(models.Model):
+    """
+    cProfile output and SQL queries captured for one request or task run.
+
+    Written by ``apps.payouts.profiling`` for requests carrying the
+    profiling token header and for a sampled fraction of traffic.
+    """
+
+    kind = models.CharField(max_length=10, choices=ProfileKind.choices)
+    name = models.CharField(max_length=200)
+    method = models.CharField(max_length=10, blank=True)
+    path = models.TextField(blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    duration_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    queries = models.JSONField(default=list)
+    stats = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "payouts_executionprofile"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-duration_ms"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.duration_ms:.0f} ms)"
+
+
+class SlowQuery(models.Model):
+    """
+    Aggregate of slow executions of one normalized SQL statement.
+
+    Maintained by ``apps.payouts.slow_queries``: one row per fingerprint,
+    with the most recent calling view or task, parameter shape and
+    ``EXPLAIN`` plan.
+    """
+
+    fingerprint = models.CharField(max_length=32, unique=True)
+    sql = models.TextField()
+    source = models.CharField(max_length=200)
+    params_shape = models.CharField(max_length=200, blank=True)
+    calls = models.PositiveIntegerField()
+    total_ms = models.FloatField()
+    max_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    plan_captured_at = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        db_table = "payouts_slowquery"
+        ordering = ["-total_ms"]
+        verbose_name_plural = "slow queries"
+
+    def __str__(self) -> str:
+        return f"{self.fingerprint} ({self.calls} x, {self.total_ms:.0f} ms)"
+
+
+class WebhookSubscription(models.Model):
+    """
+    An endpoint notified when a tenant's payouts reach a subscribed status.
+
+    Payloads are signed with ``secret`` (see ``apps.payouts.webhooks``).
+    """
+
+    tenant = models.CharField(max_length=64, default=DEFAULT_TENANT)
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=128)
+    statuses = models.JSONField(default=default_webhook_statuses)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "payouts_webhooksubscription"
+        ordering = ["tenant", "id"]
+        indexes = [
+            models.Index(
+                fields=["tenant"],
+                condition=Q(is_active=True),
+                name="webhook_sub_active_tenant_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant} -> {self.url}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    One queued webhook event for one subscription.
+
+    Rows are written in the transaction that changes the payout status and
+    sent in batches per subscription by the ``deliver_webhooks`` task.
+    ``next_attempt_at`` doubles as the claim lease while a batch is in flight.
+    """
+
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+    )
+    event_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    payout_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=StatusChoices.choices)
+    payload = models.JSONField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "payouts_webhookdelivery"
+        ordering = ["created_at", "id"]
+        verbose_name_plural = "webhook deliveries"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(delivered_at__isnull=True, failed_at__isnull=True),
+                name="webhook_delivery_due_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.status} for payout {self.payout_id} -> {self.subscription_id}"
@@ -0,0 +1,190 @@
+"""
+Pagination for the payouts list endpoint.
+
+Keeps DRF's page-number envelope but avoids running an exact ``COUNT(*)``
+on large tables: unfiltered lists use the planner's row estimate, and
+filtered lists reuse a short-lived cached count keyed by the normalized
+``PayoutFilter`` parameters. The estimate itself is cached for the same
+time, so most requests run neither query. ``invalidate_counts`` drops
+both after writes that bypass the ORM, such as ``seed_payouts``. The response reports whether ``count`` is
+exact via ``count_estimated``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+_COUNT_CACHE_PREFIX = "payouts:list-count"
+_ROWS_CACHE_PREFIX = "payouts:table-rows"
+# Part of every count and estimate key; replaced to drop them all at once.
+_COUNT_VERSION_KEY = "payouts:list-count-version"
+
+
+def estimate_table_rows(queryset: QuerySet[Any]) -> int | None:
+    """
+    Return the planner's row estimate for the queryset's table.
+
+    Only PostgreSQL keeps a cheap estimate (``pg_class.reltuples``); other
+    backends, and tables that have never been analyzed, return ``None``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def _count_version() -> int:
+    version: int = cache.get_or_set(_COUNT_VERSION_KEY, 0, None) or 0
+    return version
+
+
+def invalidate_counts() -> None:
+    """Drop every cached list count and row estimate."""
+    cache.set(_COUNT_VERSION_KEY, time.time_ns(), None)
+
+
+class _PrecountedPaginator(DjangoPaginator):
+    """Django paginator that uses a count computed by the caller."""
+
+    def __init__(self, object_list: Any, per_page: int, count: int) -> None:
+        super().__init__(object_list, per_page)
+        self._precomputed_count = count
+
+    @cached_property
+    def count(self) -> int:
+        return self._precomputed_count
+
+
+class PayoutPagination(PageNumberPagination):
+    """Page-number pagination with estimated and cached counts."""
+
+    def paginate_queryset(
+            self,
+            queryset: QuerySet[Any],
+            request: Request,
+            view: Any = None,
+    ) -> list[Any] | None:
+        """Paginate ``queryset`` using the cheapest acceptable count."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        count, self.count_estimated = self.get_count(queryset, request, view)
+        paginator = _PrecountedPaginator(queryset, page_size, count)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number,
+                message=str(exc),
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_count(
+            self,
+            queryset: QuerySet[Any],
+            request: Request,
+            view: Any = None,
+    ) -> tuple[int, bool]:
+        """
+        Return ``(count, estimated)`` for the filtered ``queryset``.
+
+        Exact counts are used while the table is below
+        ``PAYOUTS_COUNT_ESTIMATE_THRESHOLD`` rows or when no estimate is
+        available.
+        """
+        table_rows = self._table_rows(queryset)
+        if table_rows is None or table_rows < settings.PAYOUTS_COUNT_ESTIMATE_THRESHOLD:
+            return queryset.count(), False
+
+        filter_params = self._normalized_filter_params(request, view)
+        if not filter_params:
+            return table_rows, True
+
+        digest = hashlib.sha1(repr(filter_params).encode()).hexdigest()
+        cache_key = f"{_COUNT_CACHE_PREFIX}:{_count_version()}:{digest}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        count = queryset.count()
+        cache.set(cache_key, count, settings.PAYOUTS_COUNT_CACHE_TTL)
+        return count, False
+
+    def get_paginated_response(self, data: Any) -> Response:
+        response = super().get_paginated_response(data)
+        response.data["count_estimated"] = self.count_estimated
+        return response
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        paginated = super().get_paginated_response_schema(schema)
+        paginated["properties"]["count_estimated"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return paginated
+
+    @staticmethod
+    def _table_rows(queryset: QuerySet[Any]) -> int | None:
+        """Return ``estimate_table_rows(queryset)``, cached like the counts."""
+        table = queryset.model._meta.db_table
+        cache_key = f"{_ROWS_CACHE_PREFIX}:{_count_version()}:{queryset.db}:{table}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached if cached >= 0 else None
+        table_rows = estimate_table_rows(queryset)
+        # -1 stands for "no estimate", which the cache cannot store as None.
+        cache.set(
+            cache_key,
+            -1 if table_rows is None else table_rows,
+            settings.PAYOUTS_COUNT_CACHE_TTL,
+        )
+        return table_rows
+
+    @staticmethod
+    def _normalized_filter_params(
+            request: Request,
+            view: Any,
+    ) -> tuple[tuple[str, str], ...]:
+        """Return the active filter values in a stable, canonical form."""
+        filterset_class = getattr(view, "filterset_class", None)
+        if filterset_class is None:
+            return ()
+        filterset = filterset_class(request.query_params, queryset=view.queryset)
+        if not filterset.is_valid():
+            return ()
+        return tuple(
+            sorted(
+                (name, str(value))
+                for name, value in filterset.form.cleaned_data.items()
+                if value not in (None, "", [])
+            )
+        )
@@ -0,0 +1,214 @@
+"""
+Opt-in profiling of payout API requests and processing tasks.
+
+With ``PAYOUTS_PROFILING_ENABLED`` set, ``ProfilingMiddleware`` (listed in
+``MIDDLEWARE``) covers API requests and ``install_profiling`` (called from
+``PayoutsConfig.ready``) connects to the Celery signals of
+``process_payout_task``. A request is profiled when it carries
+``X-Profile-Token`` matching ``PAYOUTS_PROFILING_TOKEN``, and any request
+or task is profiled with probability ``PAYOUTS_PROFILING_SAMPLE_RATE``. Profiled runs execute under cProfile
+with every SQL query and its timing recorded, and are stored as
+``ExecutionProfile`` rows browsable in the admin.
+
+When profiling is disabled the middleware removes itself at startup and
+nothing is connected, so the hot paths run exactly as without this module.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import logging
+import pstats
+import random
+import time
+from contextlib import ExitStack
+from typing import Any, Callable
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from apps.payouts.models import ExecutionProfile, ProfileKind
+from apps.payouts.slow_queries import request_source
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+
+# Bounds on what is stored per profile.
+_MAX_QUERIES = 500
+_MAX_SQL_LENGTH = 2_000
+
+_task_profiles: dict[str, Profile] = {}
+
+
+class Profile:
+    """cProfile plus SQL query capture around one request or task run."""
+
+    def __init__(self, kind: str, name: str, method: str = "", path: str = "") -> None:
+        self.kind = kind
+        self.name = name
+        self.method = method
+        self.path = path
+        self.status_code: int | None = None
+        self.queries: list[dict[str, Any]] = []
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self._profiler = cProfile.Profile()
+        self._stack = ExitStack()
+        self._started = 0.0
+        self._duration = 0.0
+
+    def _record_query(
+            self,
+            execute: Callable[..., Any],
+            sql: str,
+            params: Any,
+            many: bool,
+            context: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_seconds += elapsed
+            if len(self.queries) < _MAX_QUERIES:
+                self.queries.append(
+                    {
+                        "alias": context["connection"].alias,
+                        "sql": sql[:_MAX_SQL_LENGTH],
+                        "many": many,
+                        "ms": round(elapsed * 1000, 3),
+                    }
+                )
+
+    def start(self) -> None:
+        """Start profiling and recording queries on every database alias."""
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record_query))
+        self._started = time.perf_counter()
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        """Stop profiling and query recording."""
+        self._profiler.disable()
+        self._duration = time.perf_counter() - self._started
+        self._stack.close()
+
+    def save(self) -> ExecutionProfile | None:
+        """Store the profile; errors are logged, never raised into the caller."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            settings.PAYOUTS_PROFILING_TOP_FUNCTIONS
+        )
+        try:
+            return ExecutionProfile.objects.create(
+                kind=self.kind,
+                name=self.name[:200],
+                method=self.method,
+                path=self.path,
+                status_code=self.status_code,
+                duration_ms=self._duration * 1000,
+                sql_count=self.sql_count,
+                sql_ms=self.sql_seconds * 1000,
+                queries=self.queries,
+                stats=stream.getvalue(),
+            )
+        except Exception:
+            logger.exception("Failed to store profile for %s", self.name)
+            return None
+
+
+def _sampled() -> bool:
+    rate = settings.PAYOUTS_PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def should_profile_request(request: Any) -> bool:
+    """Return True for requests with a valid profiling token or when sampled."""
+    token = settings.PAYOUTS_PROFILING_TOKEN
+    supplied = request.headers.get(PROFILE_HEADER)
+    if token and supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+        return True
+    return _sampled()
+
+
+class ProfilingMiddleware:
+    """Profile selected requests; unused unless profiling is enabled."""
+
+    def __init__(self, get_response: Callable[[Any], Any]) -> None:
+        if not settings.PAYOUTS_PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: Any) -> Any:
+        if not should_profile_request(request):
+            return self.get_response(request)
+        profile = Profile(
+            ProfileKind.REQUEST,
+            request.path,
+            method=request.method,
+            path=request.get_full_path(),
+        )
+        profile.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        profile.name = request_source(request)
+        profile.status_code = response.status_code
+        profile.save()
+        return response
+
+
+def _start_task_profile(task_id: str | None = None, task: Any = None, **kwargs: Any) -> None:
+    if task_id is None or not _sampled():
+        return
+    profile = Profile(ProfileKind.TASK, task.name)
+    _task_profiles[task_id] = profile
+    profile.start()
+
+
+def _finish_task_profile(
+        task_id: str | None = None,
+        state: str | None = None,
+        **kwargs: Any,
+) -> None:
+    profile = _task_profiles.pop(task_id, None) if task_id else None
+    if profile is None:
+        return
+    profile.stop()
+    profile.name = f"{profile.name} [{state}]"
+    profile.save()
+
+
+def install_profiling() -> None:
+    """Connect the task hooks when profiling is enabled."""
+    if not settings.PAYOUTS_PROFILING_ENABLED:
+        return
+    from apps.payouts.tasks import process_payout_task
+
+    task_prerun.connect(
+        _start_task_profile,
+        sender=process_payout_task,
+        dispatch_uid="payouts-profiling-start",
+    )
+    task_postrun.connect(
+        _finish_task_profile,
+        sender=process_payout_task,
+        dispatch_uid="payouts-profiling-finish",
+    )
+
+
+def uninstall_profiling() -> None:
+    """Disconnect the task hooks added by ``install_profiling``."""
+    from apps.payouts.tasks import process_payout_task
+
+    task_prerun.disconnect(sender=process_payout_task, dispatch_uid="payouts-profiling-start")
+    task_postrun.disconnect(sender=process_payout_task, dispatch_uid="payouts-profiling-finish")
@@ -0,0 +1,321 @@
+"""
+Streaming reconciliation of provider statements against payouts.
+
+A provider statement is a CSV file with one ``payout_id,amount,currency``
+line per settled payout, sorted by ``payout_id`` (an optional header line
+is skipped). Reconciliation is a merge join between that file and the
+``Payout`` table walked in ``id`` order:
+
+* the statement is memory-mapped and cut into blocks of whole lines, and
+  each block is parsed column-wise: ``csv`` splits it in one pass and the
+  id, amount and currency columns are each converted with a single
+  ``map`` (plain Python rather than numpy, which is not a dependency and
+  has no UUID or Decimal dtype);
+* payouts are fetched with keyset pagination in sorted ``id`` chunks;
+* mismatches are written to a CSV report as they are found.
+
+Peak memory is therefore bounded by the chunk sizes, not by the size of
+the file or the table. Because both sides are sorted, the work can be
+split into disjoint ``id`` ranges (see ``split_id_range``) and each range
+reconciled by a separate process; a range seeks straight to its first
+line with a binary search over the mapped file.
+"""
+
+from __future__ import annotations
+
+import csv
+from bisect import bisect_left
+import mmap
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any
+
+from apps.payouts.models import Payout, StatusChoices
+
+MIN_ID = uuid.UUID(int=0)
+MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+
+DEFAULT_LINE_CHUNK = 50_000
+DEFAULT_PAYOUT_CHUNK = 5_000
+
+# Typical statement line length, used to size the blocks cut from the file.
+_LINE_BYTES = 64
+
+REPORT_HEADER = [
+    "payout_id",
+    "kind",
+    "statement_amount",
+    "statement_currency",
+    "payout_amount",
+    "payout_currency",
+    "payout_status",
+]
+
+
+class ReconciliationError(Exception):
+    """Raised when a statement file cannot be reconciled."""
+
+
+class MismatchKind:
+    """Kinds of discrepancy recorded in the report."""
+
+    MISSING_PAYOUT = "missing_payout"
+    MISSING_STATEMENT = "missing_statement"
+    AMOUNT = "amount_mismatch"
+    CURRENCY = "currency_mismatch"
+    STATUS = "status_mismatch"
+
+
+@dataclass
+class ReconciliationResult:
+    """Summary of a reconciliation run over one id range."""
+
+    statement_lines: int = 0
+    payouts_scanned: int = 0
+    matched: int = 0
+    mismatches: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "statement_lines": self.statement_lines,
+            "payouts_scanned": self.payouts_scanned,
+            "matched": self.matched,
+            "mismatches": dict(self.mismatches),
+        }
+
+
+StatementLine = tuple[uuid.UUID, Decimal, str]
+PayoutRow = tuple[uuid.UUID, Decimal, str, str]
+
+
+def split_id_range(shards: int) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    """
+    Split the UUID space into ``shards`` contiguous ``[start, end)`` ranges.
+
+    The last range ends at ``MAX_ID``, which the readers below treat as an
+    inclusive bound, so together the ranges cover every id exactly once.
+    """
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    step = (MAX_ID.int + 1) // shards
+    bounds = [uuid.UUID(int=step * i) for i in range(shards)] + [MAX_ID]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_block(block: bytes, path: Path) -> list[StatementLine]:
+    """
+    Parse a block of whole statement lines column-wise into typed tuples.
+
+    The block is decoded and split by ``csv`` in one pass, transposed into
+    id, amount and currency columns, and each column is converted with a
+    single ``map`` rather than field by field per line.
+    """
+    try:
+        text = block.decode()
+    except UnicodeDecodeError as exc:
+        raise ReconciliationError(f"Malformed line in {path}: {exc}") from exc
+    rows = list(csv.reader(line for line in text.splitlines() if line.strip()))
+    if not rows:
+        return []
+    short = next((row for row in rows if len(row) < 3), None)
+    if short is not None:
+        raise ReconciliationError(
+            f"Malformed line in {path}: {','.join(short)!r}"
+        )
+    ids, amounts, currencies = list(zip(*rows))[:3]
+    try:
+        return list(
+            zip(
+                map(uuid.UUID, map(str.strip, ids)),
+                map(Decimal, map(str.strip, amounts)),
+                map(str.upper, map(str.strip, currencies)),
+            )
+        )
+    except (ValueError, InvalidOperation) as exc:
+        raise ReconciliationError(f"Malformed line in {path}: {exc}") from exc
+
+
+def _line_id(line: bytes) -> uuid.UUID | None:
+    """Return the payout id of a raw line, or None for a header or blank line."""
+    try:
+        return uuid.UUID(line.split(b",", 1)[0].strip().decode())
+    except ValueError:
+        return None
+
+
+def _next_line_start(mm: mmap.mmap, offset: int) -> int:
+    """Return the offset of the first line starting at or after ``offset``."""
+    if offset == 0:
+        return 0
+    newline = mm.find(b"\n", offset - 1)
+    return len(mm) if newline == -1 else newline + 1
+
+
+def _seek(mm: mmap.mmap, start_id: uuid.UUID) -> int:
+    """Binary search the sorted file for the first line with id >= ``start_id``."""
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line_start = _next_line_start(mm, mid)
+        if line_start >= len(mm):
+            hi = mid
+            continue
+        line_id = _line_id(mm[line_start:line_start + 64])
+        # A header at offset 0 sorts before every id.
+        if (line_id is None and line_start == 0) or (
+                line_id is not None and line_id < start_id
+        ):
+            lo = mid + 1
+        else:
+            hi = mid
+    return _next_line_start(mm, lo)
+
+
+def iter_statement(
+        path: Path,
+        start_id: uuid.UUID = MIN_ID,
+        end_id: uuid.UUID = MAX_ID,
+        chunk_lines: int = DEFAULT_LINE_CHUNK,
+) -> Iterator[StatementLine]:
+    """
+    Yield statement lines with ``start_id <= id < end_id`` in file order.
+
+    An ``end_id`` of ``MAX_ID`` is inclusive. ``chunk_lines`` sizes the
+    blocks parsed at a time and is approximate: a block is cut at the first
+    line boundary after ``chunk_lines`` typical lines' worth of bytes.
+
+    Raises ``ReconciliationError`` if the file is not sorted by id.
+    """
+    if path.stat().st_size == 0:
+        return
+    with path.open("rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        offset = _seek(mm, start_id) if start_id != MIN_ID else 0
+        if offset == 0 and _line_id(mm[:64]) is None:
+            offset = _next_line_start(mm, 1)  # skip header line
+        previous: uuid.UUID | None = None
+        while offset < len(mm):
+            # Cut a block of roughly ``chunk_lines`` lines at a line boundary.
+            newline = mm.find(b"\n", offset + chunk_lines * _LINE_BYTES)
+            stop = len(mm) if newline == -1 else newline
+            lines = _parse_block(mm[offset:stop], path)
+            offset = stop + 1
+            if not lines:
+                continue
+            ids = [line[0] for line in lines]
+            checked = ids if previous is None else [previous, *ids]
+            unsorted = next(
+                (after for before, after in zip(checked, checked[1:])
+                 if after < before),
+                None,
+            )
+            if unsorted is not None:
+                raise ReconciliationError(
+                    f"{path} is not sorted by payout_id near {unsorted}"
+                )
+            previous = ids[-1]
+            if end_id != MAX_ID and ids[-1] >= end_id:
+                yield from lines[:bisect_left(ids, end_id)]
+                return
+            yield from lines
+
+
+def iter_payouts(
+        start_id: uuid.UUID = MIN_ID,
+        end_id: uuid.UUID = MAX_ID,
+        chunk_size: int = DEFAULT_PAYOUT_CHUNK,
+) -> Iterator[PayoutRow]:
+    """
+    Yield payouts with ``start_id <= id < end_id`` in id order, by keyset chunks.
+
+    An ``end_id`` of ``MAX_ID`` is inclusive.
+    """
+    queryset = Payout.objects.filter(id__gte=start_id).order_by("id")
+    if end_id != MAX_ID:
+        queryset = queryset.filter(id__lt=end_id)
+    last: uuid.UUID | None = None
+    while True:
+        page = queryset if last is None else queryset.filter(id__gt=last)
+        rows = list(
+            page.values_list("id", "amount", "currency", "status")[:chunk_size]
+        )
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][0]
+
+
+def reconcile(
+        statement_path: Path,
+        report_path: Path,
+        start_id: uuid.UUID = MIN_ID,
+        end_id: uuid.UUID = MAX_ID,
+        chunk_lines: int = DEFAULT_LINE_CHUNK,
+        payout_chunk: int = DEFAULT_PAYOUT_CHUNK,
+) -> ReconciliationResult:
+    """
+    Merge-join the statement with payouts in ``[start_id, end_id)``.
+
+    An ``end_id`` of ``MAX_ID`` is inclusive.
+    """
+    result = ReconciliationResult()
+    statement = iter_statement(statement_path, start_id, end_id, chunk_lines)
+    payouts = iter_payouts(start_id, end_id, payout_chunk)
+
+    with report_path.open("w", newline="") as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(REPORT_HEADER)
+
+        def record(
+                kind: str,
+                payout_id: uuid.UUID,
+                line: StatementLine | None,
+                payout: PayoutRow | None,
+        ) -> None:
+            result.mismatches[kind] += 1
+            writer.writerow(
+                [
+                    payout_id,
+                    kind,
+                    line[1] if line else "",
+                    line[2] if line else "",
+                    payout[1] if payout else "",
+                    payout[2] if payout else "",
+                    payout[3] if payout else "",
+                ]
+            )
+
+        line = next(statement, None)
+        payout = next(payouts, None)
+        while line is not None or payout is not None:
+            if payout is None or (line is not None and line[0] < payout[0]):
+                assert line is not None
+                result.statement_lines += 1
+                record(MismatchKind.MISSING_PAYOUT, line[0], line, None)
+                line = next(statement, None)
+            elif line is None or payout[0] < line[0]:
+                result.payouts_scanned += 1
+                if payout[3] == StatusChoices.COMPLETED:
+                    record(MismatchKind.MISSING_STATEMENT, payout[0], None, payout)
+                payout = next(payouts, None)
+            else:
+                result.statement_lines += 1
+                result.payouts_scanned += 1
+                if payout[3] != StatusChoices.COMPLETED:
+                    record(MismatchKind.STATUS, line[0], line, payout)
+                elif line[2] != payout[2]:
+                    record(MismatchKind.CURRENCY, line[0], line, payout)
+                elif line[1] != payout[1]:
+                    record(MismatchKind.AMOUNT, line[0], line, payout)
+                else:
+                    result.matched += 1
+                line = next(statement, None)
+                payout = next(payouts, None)
+
+    return result
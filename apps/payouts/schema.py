@@ -0,0 +1,195 @@
+"""
+OpenAPI annotations for the payouts API.
+
+Kept out of ``views.py`` so that serving requests never imports
+``drf_spectacular``; this module is imported by the project's schema
+generator (``config.openapi_generator``) right before the schema is built.
+"""
+
+from __future__ import annotations
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
+
+from apps.payouts.serializers import (
+    PayoutBatchCreateSerializer,
+    PayoutBatchSerializer,
+    PayoutChangeFeedSerializer,
+    PayoutChangesQuerySerializer,
+    PayoutStatusEventSerializer,
+    PayoutStatusLookupSerializer,
+    PipelineHealthSerializer,
+    SlowQueryReportQuerySerializer,
+    SlowQuerySerializer,
+)
+from apps.payouts.views import (
+    PayoutBatchViewSet,
+    PayoutViewSet,
+    PipelineHealthView,
+    SlowQueryReportView,
+)
+
+extend_schema(
+    summary="Bulk status change",
+    description=(
+        "Move many PENDING payouts to CANCELLED or FAILED in one request, "
+        "selected by id list or by list-endpoint filter parameters. Payouts "
+        "that are no longer PENDING are skipped."
+    ),
+    examples=[
+        OpenApiExample(
+            "Cancel by filter",
+            value={
+                "status": "CANCELLED",
+                "filter": {"currency": "EUR", "created_before": "2025-03-01T00:00:00Z"},
+            },
+        )
+    ],
+)(PayoutViewSet.bulk_status)
+
+extend_schema(
+    summary="Payout status history",
+    description=(
+        "Return the recorded status transitions of a payout, oldest first. "
+        "Each transition is recorded in the transaction that makes it, so it "
+        "appears as soon as that transition commits."
+    ),
+    responses=PayoutStatusEventSerializer(many=True),
+)(PayoutViewSet.history)
+
+extend_schema(
+    summary="Multi-id status lookup",
+    description=(
+        "Return the status and `updated_at` of up to "
+        "`PAYOUTS_STATUS_LOOKUP_MAX_IDS` payouts, keyed by id. Unknown ids are "
+        "left out. With `If-Modified-Since`, only payouts updated after that "
+        "time are returned; `Last-Modified` carries the latest `updated_at` "
+        "in the response."
+    ),
+    parameters=[
+        OpenApiParameter(
+            "If-Modified-Since",
+            str,
+            OpenApiParameter.HEADER,
+            description="HTTP date; leave out payouts not updated since.",
+        ),
+    ],
+    request=PayoutStatusLookupSerializer,
+    responses=OpenApiTypes.OBJECT,
+    examples=[
+        OpenApiExample(
+            "Statuses",
+            value={
+                "3f1c2a9e-8a51-4f0e-9d3b-2c7a6c1e5b10": {
+                    "status": "COMPLETED",
+                    "updated_at": "2025-03-01T12:00:00.123456Z",
+                },
+            },
+            response_only=True,
+        )
+    ],
+)(PayoutViewSet.statuses)
+
+extend_schema(
+    summary="Payout change feed",
+    description=(
+        "Return payouts modified after ``cursor`` (or since ``updated_since``), "
+        "ordered by ``(updated_at, id)``. Keep the returned ``next_cursor`` and "
+        "pass it on the next call; changes are never skipped or repeated. "
+        "Changes become visible after a short settle delay."
+    ),
+    parameters=[PayoutChangesQuerySerializer],
+    responses=PayoutChangeFeedSerializer,
+)(PayoutViewSet.changes)
+
+_IF_MATCH = OpenApiParameter(
+    "If-Match",
+    str,
+    OpenApiParameter.HEADER,
+    description=(
+        "ETag of the payout as last read. The update is rejected with 409 if "
+        "the payout has been edited since."
+    ),
+)
+
+extend_schema(tags=["Payouts"])(
+    extend_schema_view(
+        list=extend_schema(
+            summary="List payouts",
+            description="Retrieve a paginated list of payouts with optional filtering.",
+        ),
+        create=extend_schema(
+            summary="Create payout",
+            description="Create a new payout and enqueue it for asynchronous processing.",
+            examples=[
+                OpenApiExample(
+                    "Create payout example",
+                    value={
+                        "amount": "250.00",
+                        "currency": "EUR",
+                        "recipient_details": {
+                            "account_number": "DE89370400440532013000",
+                            "bank_name": "Deutsche Bank",
+                        },
+                        "description": "Contractor payment - March 2025",
+                    },
+                )
+            ],
+        ),
+        update=extend_schema(
+            summary="Replace payout",
+            parameters=[_IF_MATCH],
+        ),
+        partial_update=extend_schema(
+            summary="Update payout",
+            parameters=[_IF_MATCH],
+        ),
+    )(PayoutViewSet)
+)
+
+extend_schema(tags=["Batches"])(
+    extend_schema_view(
+        create=extend_schema(
+            summary="Submit a payout batch",
+            description=(
+                "Create a batch and all its payouts in one request, for example a "
+                "payroll run, and dispatch them. Every payout takes the batch tenant."
+            ),
+            request=PayoutBatchCreateSerializer,
+            responses={201: PayoutBatchSerializer},
+        ),
+        retrieve=extend_schema(
+            summary="Batch progress",
+            description=(
+                "Return the batch's payout counts per status. They are kept up to "
+                "date on every transition, so this reads a single row."
+            ),
+        ),
+    )(PayoutBatchViewSet)
+)
+
+extend_schema(
+    tags=["Diagnostics"],
+    summary="Slow-query report",
+    parameters=[SlowQueryReportQuerySerializer],
+    responses=SlowQuerySerializer(many=True),
+)(SlowQueryReportView.get)
+
+extend_schema(
+    tags=["Diagnostics"],
+    summary="Pipeline health",
+    description=(
+        "PENDING/PROCESSING backlog, age of the oldest due payout in each and "
+        "completed payouts per minute, sampled every few seconds. Prometheus "
+        "text by default; JSON with `?format=json`."
+    ),
+    responses={
+        (200, "text/plain"): OpenApiTypes.STR,
+        (200, "application/json"): PipelineHealthSerializer,
+    },
+)(PipelineHealthView.get)
@@ -0,0 +1,41 @@
+"""
+Fragment search over payout descriptions and recipient bank names.
+
+On PostgreSQL the ``icontains`` filters below compile to
+``UPPER(...) LIKE UPPER('%term%')``, which is served by the trigram GIN
+indexes on exactly those ``UPPER`` expressions (migration 0006), and
+matches are ranked by trigram word similarity. Other backends (SQLite in
+tests and local runs) use the same filters as a plain scan, newest first.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Greatest
+
+from apps.payouts.models import Payout
+
+
+def bank_name() -> KeyTextTransform:
+    """``recipient_details ->> 'bank_name'``, the indexed search expression."""
+    return KeyTextTransform("bank_name", "recipient_details")
+
+
+def search_payouts(queryset: QuerySet[Payout], term: str) -> QuerySet[Payout]:
+    """Filter ``queryset`` to payouts matching ``term`` and order by relevance."""
+    term = term.strip()
+    queryset = queryset.alias(search_bank_name=bank_name()).filter(
+        Q(description__icontains=term) | Q(search_bank_name__icontains=term)
+    )
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.order_by("-created_at")
+    rank: Any = Greatest(
+        TrigramWordSimilarity(term, "description"),
+        TrigramWordSimilarity(term, "search_bank_name"),
+    )
+    return queryset.alias(search_rank=rank).order_by("-search_rank", "-created_at")
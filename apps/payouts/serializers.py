@@ -10,9 +10,20 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Any
 
+from django.conf import settings
 from rest_framework import serializers
 
-from apps.payouts.models import Payout
+from apps.payouts.changes import FeedPosition, InvalidCursor, decode_cursor
+from apps.payouts.filters import PayoutFilter
+from apps.payouts.models import (
+    DEFAULT_TENANT,
+    Payout,
+    PayoutBatch,
+    PayoutStatusEvent,
+    SlowQuery,
+    StatusChoices,
+)
+from apps.payouts.slow_queries import ORDERINGS
 
 _MAX_PAYOUT_AMOUNT = Decimal("999999999.99")
 
@@ -66,13 +77,26 @@ class PayoutSerializer(serializers.ModelSerializer):
             "id",
             "amount",
             "currency",
+            "amount_base",
             "recipient_details",
+            "tenant",
+            "batch",
             "status",
             "description",
+            "scheduled_for",
+            "version",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "amount_base",
+            "batch",
+            "status",
+            "version",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "status", "created_at", "updated_at"]
 
     def validate_amount(self, value: Decimal) -> Decimal:
         """Validate amount for create operations."""
@@ -87,6 +111,51 @@ class PayoutSerializer(serializers.ModelSerializer):
         return validated
 
 
+class PayoutBatchSerializer(serializers.ModelSerializer):
+    """Progress of a payout batch, read from its counters."""
+
+    class Meta:
+        """Serializer metadata for PayoutBatch."""
+
+        model = PayoutBatch
+        fields = [
+            "id",
+            "tenant",
+            "reference",
+            "total",
+            "pending_count",
+            "processing_count",
+            "completed_count",
+            "failed_count",
+            "cancelled_count",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class PayoutBatchCreateSerializer(serializers.Serializer):
+    """
+    Validate a batch submission.
+
+    Each item uses the payout create fields; every payout takes the
+    batch's ``tenant``.
+    """
+
+    tenant = serializers.CharField(max_length=64, default=DEFAULT_TENANT)
+    reference = serializers.CharField(max_length=100, required=False, default="")
+    payouts = PayoutSerializer(many=True, allow_empty=False)
+
+    def validate_payouts(self, value: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Enforce the configured maximum batch size."""
+        max_size = settings.PAYOUTS_BATCH_MAX_SIZE
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f"At most {max_size} payouts can be submitted per batch."
+            )
+        return value
+
+
 class PayoutUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating editable payout fields."""
 
@@ -94,7 +163,13 @@ class PayoutUpdateSerializer(serializers.ModelSerializer):
         """Serializer metadata for partial Payout updates."""
 
         model = Payout
-        fields = ["amount", "currency", "recipient_details", "description"]
+        fields = [
+            "amount",
+            "currency",
+            "recipient_details",
+            "description",
+            "scheduled_for",
+        ]
 
     def validate_amount(self, value: Decimal | None) -> Decimal | None:
         """Validate amount for update operations, allowing omission."""
@@ -105,3 +180,186 @@ class PayoutUpdateSerializer(serializers.ModelSerializer):
     ) -> dict[str, Any] | None:
         """Validate recipient_details for update operations, allowing omission."""
         return _validate_recipient_details_common(value, allow_none=True)
+
+
+class PayoutChangesQuerySerializer(serializers.Serializer):
+    """
+    Validate the query parameters of the change feed.
+
+    ``cursor`` continues after the last delivered change; ``updated_since``
+    starts a new feed at a timestamp. The two are mutually exclusive.
+    """
+
+    cursor = serializers.CharField(required=False)
+    updated_since = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.PAYOUTS_CHANGE_FEED_MAX_PAGE_SIZE,
+        default=settings.PAYOUTS_CHANGE_FEED_PAGE_SIZE,
+    )
+
+    def validate_cursor(self, value: str) -> FeedPosition:
+        """Decode the opaque cursor into a feed position."""
+        try:
+            return decode_cursor(value)
+        except InvalidCursor as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Resolve ``cursor`` or ``updated_since`` into ``position``."""
+        if "cursor" in attrs and "updated_since" in attrs:
+            raise serializers.ValidationError(
+                "Provide at most one of 'cursor' or 'updated_since'."
+            )
+        if "updated_since" in attrs:
+            attrs["position"] = FeedPosition(attrs.pop("updated_since"))
+        else:
+            attrs["position"] = attrs.pop("cursor", None)
+        return attrs
+
+
+class PayoutChangeFeedSerializer(serializers.Serializer):
+    """One page of the change feed."""
+
+    results = PayoutSerializer(many=True)
+    next_cursor = serializers.CharField(
+        allow_null=True,
+        help_text="Pass as ``cursor`` to fetch the changes after this page.",
+    )
+    has_more = serializers.BooleanField()
+
+
+class PayoutStatusEventSerializer(serializers.ModelSerializer):
+    """Read-only representation of a payout status transition."""
+
+    class Meta:
+        """Serializer metadata for status history entries."""
+
+        model = PayoutStatusEvent
+        fields = ["from_status", "to_status", "source", "occurred_at"]
+        read_only_fields = fields
+
+
+class PayoutBulkStatusSerializer(serializers.Serializer):
+    """
+    Validate a bulk status change request.
+
+    Targets are given either as an explicit list of ``ids`` or as a
+    ``filter`` object using the same parameters as the list endpoint.
+    """
+
+    BULK_TARGET_STATUSES = [StatusChoices.CANCELLED, StatusChoices.FAILED]
+
+    status = serializers.ChoiceField(
+        choices=[(value, StatusChoices(value).label) for value in BULK_TARGET_STATUSES],
+    )
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+
+    def validate_ids(self, value: list[Any]) -> list[Any]:
+        """Enforce the configured maximum number of ids per request."""
+        max_ids = settings.PAYOUTS_BULK_MAX_IDS
+        if len(value) > max_ids:
+            raise serializers.ValidationError(
+                f"At most {max_ids} ids can be changed per request."
+            )
+        return value
+
+    def validate_filter(self, value: dict[str, Any]) -> PayoutFilter:
+        """Turn the filter object into a bound, valid PayoutFilter."""
+        filterset = PayoutFilter(data=value, queryset=Payout.objects.all())
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        active = [
+            name
+            for name, cleaned in filterset.form.cleaned_data.items()
+            if cleaned not in (None, "")
+        ]
+        if not active:
+            raise serializers.ValidationError(
+                "filter must contain at least one criterion."
+            )
+        return filterset
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Require exactly one of ``ids`` or ``filter``."""
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Provide exactly one of 'ids' or 'filter'."
+            )
+        return attrs
+
+
+class PayoutStatusLookupSerializer(serializers.Serializer):
+    """Validate a multi-id status lookup."""
+
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_ids(self, value: list[Any]) -> list[Any]:
+        """Enforce the configured maximum number of ids per lookup."""
+        max_ids = settings.PAYOUTS_STATUS_LOOKUP_MAX_IDS
+        if len(value) > max_ids:
+            raise serializers.ValidationError(
+                f"At most {max_ids} ids can be looked up per request."
+            )
+        return value
+
+
+class PayoutStatusSerializer(serializers.Serializer):
+    """Status of one payout in a multi-id lookup, read from ``values()`` rows."""
+
+    status = serializers.ChoiceField(choices=StatusChoices.choices)
+    updated_at = serializers.DateTimeField()
+
+
+class SlowQuerySerializer(serializers.ModelSerializer):
+    """Read-only representation of an aggregated slow query."""
+
+    mean_ms = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """Serializer metadata for slow-query log entries."""
+
+        model = SlowQuery
+        fields = [
+            "fingerprint",
+            "sql",
+            "source",
+            "params_shape",
+            "calls",
+            "total_ms",
+            "mean_ms",
+            "max_ms",
+            "plan",
+            "plan_captured_at",
+            "first_seen",
+            "last_seen",
+        ]
+        read_only_fields = fields
+
+
+class SlowQueryReportQuerySerializer(serializers.Serializer):
+    """Validate the query parameters of the slow-query report."""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    order = serializers.ChoiceField(choices=list(ORDERINGS), default="total")
+
+
+class PipelineStageSerializer(serializers.Serializer):
+    """Backlog of one pipeline stage."""
+
+    count = serializers.IntegerField()
+    oldest_age_seconds = serializers.FloatField()
+
+
+class PipelineHealthSerializer(serializers.Serializer):
+    """Pipeline health snapshot (``apps.payouts.health``)."""
+
+    sampled_at = serializers.DateTimeField()
+    sample_age_seconds = serializers.FloatField()
+    backlog = serializers.DictField(child=PipelineStageSerializer())
+    completed_per_minute = serializers.FloatField()
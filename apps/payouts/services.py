@@ -7,12 +7,32 @@ views and tasks remain thin orchestration layers.
 
 from __future__ import annotations
 
+from collections.abc import Collection, Sequence
 from typing import Any
+from uuid import UUID
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, F, QuerySet
+from django.utils import timezone
 
-from apps.payouts.models import Payout, StatusChoices
-from apps.payouts.tasks import process_payout_task
+from apps.payouts.batches import record_batch_transition, record_batch_transitions
+from apps.payouts.fx import base_amount_expression, to_base_amount
+from apps.payouts.history import record_status_change, record_status_changes
+from apps.payouts.list_cache import invalidate
+from apps.payouts.models import (
+    CurrencyChoices,
+    Payout,
+    PayoutBatch,
+    StatusChoices,
+    StatusEventSource,
+)
+from apps.payouts.tasks import (
+    enqueue_payout,
+    is_scheduled_in_future,
+    request_fair_dispatch,
+)
+from apps.payouts.webhooks import queue_bulk_status_webhooks, queue_status_webhooks
 
 
 class PayoutService:
@@ -21,15 +41,82 @@ class PayoutService:
     @staticmethod
     @transaction.atomic
     def create_payout(validated_data: dict[str, Any]) -> Payout:
-        """Create a payout and dispatch the Celery processing task."""
-        payout = Payout.objects.create(**validated_data)
+        """
+        Create a payout and dispatch the Celery processing task.
 
-        transaction.on_commit(
-            lambda: process_payout_task.delay(str(payout.id)),
+        Payouts scheduled for the future are left for the periodic
+        ``dispatch_scheduled_payouts`` task instead of being enqueued now.
+        """
+        payout = Payout.objects.create(
+            **validated_data,
+            amount_base=to_base_amount(
+                validated_data["amount"],
+                validated_data.get("currency", CurrencyChoices.USD),
+            ),
         )
-
+        invalidate([payout.status], [payout.currency])
+        PayoutService.enqueue_if_due(payout)
         return payout
 
+    @staticmethod
+    def enqueue_if_due(payout: Payout) -> None:
+        """
+        Enqueue processing on commit unless the payout is scheduled later.
+
+        Publishing goes through ``enqueue_payout`` so repeated calls for the
+        same payout collapse into a single queued message. With
+        ``PAYOUTS_FAIR_DISPATCH`` the fair dispatcher is woken up instead and
+        publishes the payout when its tenant has a free slot.
+        """
+        if is_scheduled_in_future(payout):
+            return
+        if settings.PAYOUTS_FAIR_DISPATCH:
+            transaction.on_commit(request_fair_dispatch)
+            return
+        transaction.on_commit(lambda: enqueue_payout(str(payout.id)))
+
+    @staticmethod
+    def update_pending(
+            payout_id: UUID,
+            changes: dict[str, Any],
+            versions: Collection[int] | None = None,
+    ) -> bool:
+        """
+        Apply ``changes`` to a PENDING payout with one conditional UPDATE.
+
+        The row is neither read nor locked first. The ``status`` condition
+        makes the UPDATE miss a payout the worker has already claimed, and
+        with ``versions`` (from ``If-Match``) one that another edit changed.
+        The same statement bumps ``version`` and recomputes ``amount_base``.
+        Returns whether the payout was updated.
+
+        Moving ``scheduled_for`` to the past or clearing it makes the payout
+        due immediately; the task ignores duplicate or premature messages.
+        """
+        filters: dict[str, Any] = {"id": payout_id, "status": StatusChoices.PENDING}
+        if versions is not None:
+            filters["version__in"] = versions
+        values = dict(changes)
+        if {"amount", "currency"} & changes.keys():
+            values["amount_base"] = base_amount_expression(
+                changes.get("amount"),
+                changes.get("currency"),
+            )
+        updated = Payout.objects.filter(**filters).update(
+            **values,
+            version=F("version") + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            return False
+        # The payout's previous currency is not known without a read.
+        invalidate([StatusChoices.PENDING])
+        if "scheduled_for" in changes:
+            PayoutService.enqueue_if_due(
+                Payout(id=payout_id, scheduled_for=changes["scheduled_for"]),
+            )
+        return True
+
     @staticmethod
     def can_update(payout: Payout) -> bool:
         """Return True if the payout can be updated via the API."""
@@ -39,7 +126,134 @@ class PayoutService:
     @transaction.atomic
     def update_status(payout: Payout, new_status: str) -> Payout:
         """Atomically update payout status (used from Celery task)."""
+        previous = payout.status
         payout.status = new_status
         payout.save(update_fields=["status", "updated_at"])
+        invalidate([previous, new_status], [payout.currency])
+        if previous != new_status:
+            record_status_change(
+                payout.id,
+                previous,
+                new_status,
+                StatusEventSource.SERVICE,
+            )
+            record_batch_transition(payout.batch_id, previous, new_status)
+            queue_status_webhooks(payout.id, new_status)
         return payout
 
+    @staticmethod
+    def bulk_update_status(
+            new_status: str,
+            ids: Sequence[UUID] | None = None,
+            queryset: QuerySet[Payout] | None = None,
+    ) -> tuple[int, int]:
+        """
+        Move every still-PENDING payout in ``ids`` or ``queryset`` to ``new_status``.
+
+        Runs chunked ``UPDATE`` statements, each in its own short
+        transaction, so rows already claimed by a worker are left untouched.
+        Each chunk's history events, batch counters, webhook deliveries and
+        list cache invalidation are written in the same transaction (see
+        ``_transition_pending``). Returns ``(affected, skipped)``.
+        """
+        chunk_size = settings.PAYOUTS_BULK_UPDATE_CHUNK_SIZE
+        affected = 0
+
+        if ids is not None:
+            unique_ids = list(dict.fromkeys(ids))
+            for start in range(0, len(unique_ids), chunk_size):
+                affected += PayoutService._transition_pending(
+                    unique_ids[start:start + chunk_size],
+                    new_status,
+                )
+            return affected, len(unique_ids) - affected
+
+        assert queryset is not None
+        matched = queryset.count()
+        pending = queryset.filter(status=StatusChoices.PENDING).order_by()
+        while True:
+            updated = PayoutService._transition_pending(
+                pending.values("id")[:chunk_size],
+                new_status,
+            )
+            if not updated:
+                break
+            affected += updated
+        return affected, max(matched - affected, 0)
+
+    @staticmethod
+    @transaction.atomic
+    def _transition_pending(ids: Any, new_status: str) -> int:
+        """
+        Move the still-PENDING payouts among ``ids`` to ``new_status``.
+
+        The PENDING rows are locked and their ids read first, so the
+        ``UPDATE``, the history ``INSERT ... SELECT``, the per-batch counts
+        and the webhook deliveries all cover exactly the rows this call
+        moved. Cached list pages are invalidated when the chunk commits.
+        """
+        moved_ids = list(
+            Payout.objects.select_for_update()
+            .filter(id__in=ids, status=StatusChoices.PENDING)
+            .values_list("id", flat=True)
+        )
+        if not moved_ids:
+            return 0
+        moved = Payout.objects.filter(id__in=moved_ids).order_by()
+        moved.update(status=new_status, updated_at=timezone.now())
+        record_status_changes(
+            moved,
+            StatusChoices.PENDING,
+            new_status,
+            StatusEventSource.SERVICE,
+        )
+        record_batch_transitions(
+            StatusChoices.PENDING,
+            new_status,
+            dict(
+                moved.filter(batch__isnull=False)
+                .values_list("batch_id")
+                .annotate(count=Count("*"))
+            ),
+        )
+        queue_bulk_status_webhooks(moved, new_status)
+        invalidate([StatusChoices.PENDING, new_status])
+        return len(moved_ids)
+
+    @staticmethod
+    @transaction.atomic
+    def create_batch(
+            payouts_data: Sequence[dict[str, Any]],
+            tenant: str,
+            reference: str = "",
+    ) -> PayoutBatch:
+        """
+        Create a batch and its payouts in bulk, then dispatch them.
+
+        All payouts take the batch's tenant. The counters start with every
+        payout PENDING.
+        """
+        batch = PayoutBatch.objects.create(
+            tenant=tenant,
+            reference=reference,
+            total=len(payouts_data),
+            pending_count=len(payouts_data),
+        )
+        payouts = Payout.objects.bulk_create(
+            [
+                Payout(
+                    **{**data, "tenant": tenant},
+                    batch=batch,
+                    amount_base=to_base_amount(
+                        data["amount"],
+                        data.get("currency", CurrencyChoices.USD),
+                    ),
+                )
+                for data in payouts_data
+            ],
+            batch_size=settings.PAYOUTS_BULK_UPDATE_CHUNK_SIZE,
+        )
+        invalidate([StatusChoices.PENDING], {payout.currency for payout in payouts})
+        for payout in payouts:
+            PayoutService.enqueue_if_due(payout)
+        return batch
@@ -0,0 +1,432 @@
+"""
+Slow-query log for API requests and payouts Celery tasks.
+
+Off unless ``PAYOUTS_SLOW_QUERY_LOG_ENABLED`` is set. Requests are covered
+by ``SlowQueryMiddleware`` (listed in ``MIDDLEWARE``), tasks by the Celery
+signals ``install_slow_query_log`` connects from ``PayoutsConfig.ready``.
+While one of them runs, a ``connection.execute_wrapper`` on every
+database alias times each statement; statements taking at least
+``PAYOUTS_SLOW_QUERY_MS`` are kept as samples with their normalized SQL,
+the shape of their parameters (types, never values), the duration and
+the calling view action or task.
+
+Once the request or task is finished its samples are handed to a
+background thread, so the response is not held up. There the first
+sample of a fingerprint in every ``PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL``
+seconds is explained (``EXPLAIN`` without ``ANALYZE``) and recorded, so
+parameter values never leave the process. The remaining samples carry no
+values and are published to the ``capture_slow_queries`` task, which
+folds them into their ``SlowQuery`` rows. ``top_slow_queries`` reads the worst
+offenders back for the ``slow_queries`` management command and the
+diagnostics endpoint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from collections.abc import Awaitable
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.payouts.locks import get_dispatch_lock, slow_query_explain_key
+from apps.payouts.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# Orderings accepted by ``top_slow_queries``.
+ORDERINGS = {
+    "total": "-total_ms",
+    "mean": "-mean_ms",
+    "max": "-max_ms",
+    "calls": "-calls",
+}
+
+# Bound on samples kept per request or task run.
+_MAX_SAMPLES = 100
+# Bound on request or task runs waiting for the recorder thread.
+_MAX_PENDING = 1000
+# Statements EXPLAIN accepts; anything else (savepoints, COPY, DDL) is not explained.
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_TASK_PREFIX = "apps.payouts."
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_active_scope: ContextVar[QueryScope | None] = ContextVar(
+    "payouts_slow_query_scope",
+    default=None,
+)
+_task_scopes: dict[str, tuple[QueryScope, Any]] = {}
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce ``sql`` to a canonical form shared by every call of one statement.
+
+    Literals and placeholders become ``?`` and value lists of any length
+    collapse to ``(?+)``, so ``LIMIT 10`` and ``LIMIT 20`` or ``IN`` lists
+    of different sizes share a fingerprint.
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?+)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    """Return the aggregation key of a normalized statement."""
+    return hashlib.sha256(normalized_sql.encode()).hexdigest()[:32]
+
+
+def params_shape(params: Any, many: bool = False) -> str:
+    """Describe ``params`` by type only, e.g. ``(UUID, str, int)``."""
+    if many:
+        if not isinstance(params, (list, tuple)):
+            return "executemany"
+        first = params_shape(params[0]) if params else "()"
+        return f"{len(params)} x {first}"[:200]
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        parts = [f"{key}: {type(value).__name__}" for key, value in params.items()]
+        return f"{{{', '.join(parts)}}}"[:200]
+    return f"({', '.join(type(value).__name__ for value in params)})"[:200]
+
+
+class QueryScope:
+    """Times the statements run during one request or task on every alias."""
+
+    def __init__(self, source: Callable[[], str]) -> None:
+        self.source = source
+        self.samples: list[dict[str, Any]] = []
+        self._threshold = settings.PAYOUTS_SLOW_QUERY_MS / 1000
+        self._stack = ExitStack()
+
+    def _time_query(
+            self,
+            execute: Callable[..., Any],
+            sql: str,
+            params: Any,
+            many: bool,
+            context: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self._threshold and len(self.samples) < _MAX_SAMPLES:
+                self._add_sample(sql, params, many, context["connection"].alias, elapsed)
+
+    def _add_sample(
+            self,
+            sql: str,
+            params: Any,
+            many: bool,
+            alias: str,
+            elapsed: float,
+    ) -> None:
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        sample: dict[str, Any] = {
+            "fingerprint": key,
+            "sql": normalized,
+            "params_shape": params_shape(params, many),
+            "source": self.source()[:200],
+            "alias": alias,
+            "duration_ms": elapsed * 1000,
+            "explain": None,
+        }
+        explainable = not many and normalized.upper().startswith(_EXPLAINABLE)
+        if explainable and get_dispatch_lock().acquire(
+            slow_query_explain_key(key),
+            settings.PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL,
+        ):
+            # Kept in this process only; see ``stop``.
+            sample["explain"] = {"sql": sql, "params": params}
+        self.samples.append(sample)
+
+    def start(self) -> None:
+        """Start timing statements on every database alias."""
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._time_query))
+
+    def stop(self) -> None:
+        """Stop timing and hand the samples to the recorder thread."""
+        self._stack.close()
+        if self.samples:
+            recorder.submit(self.samples)
+
+
+class SampleRecorder:
+    """
+    Record slow-query samples on a background thread, off the request path.
+
+    Samples due a plan are explained and recorded by the thread itself,
+    since their parameter values must not be published; the rest are
+    handed to ``capture_slow_queries``. When ``_MAX_PENDING`` runs are
+    already waiting, new samples are dropped. Failures are logged, never
+    raised. After a fork, the child process starts its own thread.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[list[dict[str, Any]]] = queue.Queue(_MAX_PENDING)
+        self._thread: threading.Thread | None = None
+        self._mutex = threading.Lock()
+
+    def submit(self, samples: list[dict[str, Any]]) -> None:
+        """Queue ``samples`` for recording."""
+        self._ensure_running()
+        try:
+            self._queue.put_nowait(samples)
+        except queue.Full:
+            logger.warning("Dropped %s slow query samples, recorder is behind", len(samples))
+
+    def join(self) -> None:
+        """Block until every queued sample has been recorded."""
+        self._queue.join()
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._mutex:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is not None:
+                    # Forked: the queued samples are the parent's to record.
+                    self._queue = queue.Queue(_MAX_PENDING)
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="slow-query-recorder",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            samples = self._queue.get()
+            try:
+                self._record(samples)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    @staticmethod
+    def _record(samples: list[dict[str, Any]]) -> None:
+        explained = [sample for sample in samples if sample["explain"]]
+        deferred = [sample for sample in samples if not sample["explain"]]
+        if explained:
+            try:
+                record_samples(explained)
+            except Exception:
+                logger.warning(
+                    "Failed to record %s slow query samples",
+                    len(explained),
+                    exc_info=True,
+                )
+        if not deferred:
+            return
+        from apps.payouts.tasks import capture_slow_queries
+
+        try:
+            capture_slow_queries.delay(deferred)
+        except Exception:
+            logger.warning(
+                "Failed to publish %s slow query samples",
+                len(deferred),
+                exc_info=True,
+            )
+
+
+recorder = SampleRecorder()
+
+
+def explain(alias: str, sql: str, params: Any) -> str:
+    """Return the plan of ``sql`` on ``alias`` without executing it."""
+    connection = connections[alias]
+    if connection.vendor == "postgresql":
+        prefix = connection.ops.explain_query_prefix(analyze=False)
+    else:
+        prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        # The plan text is the last column on both PostgreSQL and SQLite.
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def record_samples(samples: list[dict[str, Any]]) -> int:
+    """Capture due plans and fold ``samples`` into ``SlowQuery``; return the count."""
+    for sample in samples:
+        plan = ""
+        if sample.get("explain"):
+            try:
+                plan = explain(
+                    sample["alias"],
+                    sample["explain"]["sql"],
+                    sample["explain"]["params"],
+                )
+            except Exception:
+                logger.warning(
+                    "EXPLAIN failed for slow query %s",
+                    sample["fingerprint"],
+                    exc_info=True,
+                )
+        _aggregate(sample, plan)
+    return len(samples)
+
+
+def _aggregate(sample: dict[str, Any], plan: str) -> None:
+    """Add one sample to the row for its fingerprint, creating it if needed."""
+    now = timezone.now()
+    duration = sample["duration_ms"]
+    changes: dict[str, Any] = {
+        "calls": F("calls") + 1,
+        "total_ms": F("total_ms") + duration,
+        "max_ms": Greatest("max_ms", Value(duration, output_field=FloatField())),
+        "source": sample["source"],
+        "params_shape": sample["params_shape"],
+        "last_seen": now,
+    }
+    if plan:
+        changes.update(plan=plan, plan_captured_at=now)
+    rows = SlowQuery.objects.filter(fingerprint=sample["fingerprint"])
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            SlowQuery.objects.create(
+                fingerprint=sample["fingerprint"],
+                sql=sample["sql"],
+                source=sample["source"],
+                params_shape=sample["params_shape"],
+                calls=1,
+                total_ms=duration,
+                max_ms=duration,
+                plan=plan,
+                plan_captured_at=now if plan else None,
+                first_seen=now,
+                last_seen=now,
+            )
+    except IntegrityError:
+        # Another worker created the row first.
+        rows.update(**changes)
+
+
+def top_slow_queries(limit: int = 20, order: str = "total") -> QuerySet[SlowQuery]:
+    """Return the ``limit`` worst fingerprints by one of ``ORDERINGS``."""
+    return SlowQuery.objects.annotate(
+        mean_ms=F("total_ms") / F("calls"),
+    ).order_by(ORDERINGS[order], "fingerprint")[:limit]
+
+
+def request_source(request: Any) -> str:
+    """Name the view that served ``request``, e.g. ``PayoutViewSet.list``."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return request.path
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name or request.path
+    action = (getattr(match.func, "actions", None) or {}).get(request.method.lower())
+    return f"{view_class.__name__}.{action}" if action else view_class.__name__
+
+
+class SlowQueryMiddleware:
+    """Log the slow statements of each request; unused unless the log is enabled."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[Any], Any]) -> None:
+        if not settings.PAYOUTS_SLOW_QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: Any) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+        if _active_scope.get() is not None:
+            return self.get_response(request)
+        # The view is only resolved further down the chain, so name the source lazily.
+        scope = QueryScope(lambda: request_source(request))
+        token = _active_scope.set(scope)
+        scope.start()
+        try:
+            return self.get_response(request)
+        finally:
+            _active_scope.reset(token)
+            scope.stop()
+
+    async def __acall__(self, request: Any) -> Any:
+        get_response: Callable[[Any], Awaitable[Any]] = self.get_response
+        if _active_scope.get() is not None:
+            return await get_response(request)
+        scope = QueryScope(lambda: request_source(request))
+        token = _active_scope.set(scope)
+        # Async ORM calls run on the request's thread-sensitive sync thread,
+        # whose connections are the ones to wrap.
+        await sync_to_async(scope.start)()
+        try:
+            return await get_response(request)
+        finally:
+            _active_scope.reset(token)
+            scope.stop()
+
+
+def _start_task_scope(task_id: str | None = None, task: Any = None, **kwargs: Any) -> None:
+    from apps.payouts.tasks import capture_slow_queries
+
+    if (
+        task_id is None
+        or not task.name.startswith(_TASK_PREFIX)
+        or task.name == capture_slow_queries.name
+        or _active_scope.get() is not None
+    ):
+        return
+    scope = QueryScope(lambda: task.name)
+    _task_scopes[task_id] = (scope, _active_scope.set(scope))
+    scope.start()
+
+
+def _finish_task_scope(task_id: str | None = None, **kwargs: Any) -> None:
+    entry = _task_scopes.pop(task_id, None) if task_id else None
+    if entry is None:
+        return
+    scope, token = entry
+    _active_scope.reset(token)
+    scope.stop()
+
+
+def install_slow_query_log() -> None:
+    """Connect the task hooks when the slow-query log is enabled."""
+    if not settings.PAYOUTS_SLOW_QUERY_LOG_ENABLED:
+        return
+    task_prerun.connect(_start_task_scope, dispatch_uid="payouts-slow-query-start")
+    task_postrun.connect(_finish_task_scope, dispatch_uid="payouts-slow-query-finish")
+
+
+def uninstall_slow_query_log() -> None:
+    """Disconnect the task hooks added by ``install_slow_query_log``."""
+    task_prerun.disconnect(dispatch_uid="payouts-slow-query-start")
+    task_postrun.disconnect(dispatch_uid="payouts-slow-query-finish")
@@ -8,14 +8,36 @@ transitions according to the payout lifecycle.
 from __future__ import annotations
 
 import logging
-import random
-import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
 from typing import Any
 
 from celery import Task, shared_task
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
 
-from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.batches import record_batch_transition
+from apps.payouts.fairness import plan_dispatch
+from apps.payouts.gateway import GatewayError, submit_payout
+from apps.payouts.health import sample
+from apps.payouts.history import record_status_change
+from apps.payouts.list_cache import invalidate
+from apps.payouts.locks import (
+    enqueue_lock_key,
+    fair_dispatch_queued_key,
+    fair_dispatch_run_key,
+    get_dispatch_lock,
+    run_lock_key,
+    webhook_delivery_queued_key,
+)
+from apps.payouts.models import Payout, StatusChoices, StatusEventSource
+from apps.payouts.reconciliation import reconcile
+from apps.payouts.slow_queries import record_samples
+from apps.payouts.webhooks import deliver_due_webhooks, queue_status_webhooks
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +46,11 @@ class PayoutProcessingError(Exception):
     """Raised when payout processing fails."""
 
 
+def is_scheduled_in_future(payout: Payout) -> bool:
+    """Return True if the payout must wait for its ``scheduled_for`` time."""
+    return payout.scheduled_for is not None and payout.scheduled_for > timezone.now()
+
+
 class PayoutTask(Task):
     """Base Celery task for payout processing with failure handling."""
 
@@ -43,11 +70,37 @@ class PayoutTask(Task):
         """
         payout_id = args[0] if args else None
         if payout_id:
-            logger.error("Payout %s failed permanently: %s", payout_id, exc)
+            logger.error(
+                "Payout %s failed permanently: %s",
+                payout_id,
+                exc,
+                extra={"event": "payout.failed", "payout_id": payout_id},
+            )
             with transaction.atomic():
-                Payout.objects.filter(id=payout_id).update(
-                    status=StatusChoices.FAILED,
+                row = (
+                    Payout.objects.select_for_update()
+                    .filter(id=payout_id)
+                    .values_list("status", "currency", "batch_id")
+                    .first()
                 )
+                if row is None:
+                    logger.warning("Payout %s no longer exists, not marking it FAILED", payout_id)
+                else:
+                    previous, currency, batch_id = row
+                    Payout.objects.filter(id=payout_id).update(
+                        status=StatusChoices.FAILED,
+                        updated_at=timezone.now(),
+                    )
+                    invalidate([previous, StatusChoices.FAILED], [currency])
+                    if previous != StatusChoices.FAILED:
+                        record_status_change(
+                            payout_id,
+                            previous,
+                            StatusChoices.FAILED,
+                            StatusEventSource.TASK_FAILURE,
+                        )
+                        record_batch_transition(batch_id, previous, StatusChoices.FAILED)
+                        queue_status_webhooks(payout_id, StatusChoices.FAILED)
         super().on_failure(exc, task_id, args, kwargs, einfo)
 
 
@@ -64,40 +117,373 @@ def process_payout_task(self: PayoutTask, payout_id: str) -> str:
     Process a payout asynchronously.
 
     1. Set status to PROCESSING
-    2. Simulate processing (5s delay)
-    3. 10% chance of failure (demonstrates retry)
+    2. Submit to the provider (``apps.payouts.gateway``, simulated: 5s
+       delay, 10% chance of failure); a retry first looks up the outcome
+       of the previous attempt and only resubmits if it truly failed
+    3. On failure reset to PENDING and retry
     4. Set status to COMPLETED or FAILED
+
+    A run lock keyed by payout id is taken before touching the database,
+    so duplicate messages for a payout that is already being processed are
+    dropped without taking a connection or waiting on the row lock.
     """
-    logger.info("Processing payout %s, attempt %s", payout_id, self.request.retries + 1)
+    lock = get_dispatch_lock()
+    run_token = lock.acquire(
+        run_lock_key(payout_id),
+        settings.PAYOUTS_DEDUP_RUN_LOCK_TTL,
+    )
+    if run_token is None:
+        logger.info(
+            "Payout %s already in flight, dropping duplicate",
+            payout_id,
+            extra={"event": "payout.duplicate", "payout_id": payout_id},
+        )
+        return "Skipped: duplicate of in-flight task"
+
+    # This message is now being consumed, so later re-queues may publish again.
+    lock.release(enqueue_lock_key(payout_id))
+    try:
+        return _process_payout(self, payout_id)
+    finally:
+        lock.release(run_lock_key(payout_id), run_token)
+        if settings.PAYOUTS_FAIR_DISPATCH:
+            # A tenant slot may have freed up. A broker error here must not
+            # replace the task's own outcome; beat runs the dispatcher anyway.
+            try:
+                request_fair_dispatch()
+            except Exception:
+                logger.warning(
+                    "Failed to publish dispatch_fair_payouts, beat will retry",
+                    exc_info=True,
+                )
+
+
+def enqueue_payout(payout_id: str) -> bool:
+    """
+    Publish ``process_payout_task`` unless the payout is already queued.
+
+    Returns False when an identical message was published within
+    ``PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL`` seconds and has not been picked up yet.
+    """
+    lock = get_dispatch_lock()
+    key = enqueue_lock_key(payout_id)
+    token = lock.acquire(key, settings.PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL)
+    if token is None:
+        logger.info(
+            "Payout %s already queued, not enqueuing again",
+            payout_id,
+            extra={"event": "payout.duplicate", "payout_id": payout_id},
+        )
+        return False
+    try:
+        process_payout_task.delay(payout_id)
+    except Exception:
+        lock.release(key, token)
+        raise
+    return True
+
+
+def _process_payout(task: PayoutTask, payout_id: str) -> str:
+    """Run the payout state machine for a single attempt."""
+    logger.info(
+        "Processing payout %s, attempt %s",
+        payout_id,
+        task.request.retries + 1,
+        extra={"event": "payout.started", "payout_id": payout_id},
+    )
 
     with transaction.atomic():
         payout = Payout.objects.select_for_update().get(id=payout_id)
 
         if payout.status != StatusChoices.PENDING:
-            logger.warning("Payout %s not PENDING, skipping", payout_id)
+            logger.warning(
+                "Payout %s not PENDING, skipping",
+                payout_id,
+                extra={"event": "payout.skipped", "payout_id": payout_id},
+            )
             return f"Skipped: status was {payout.status}"
 
+        if is_scheduled_in_future(payout):
+            assert payout.scheduled_for is not None
+            logger.info(
+                "Payout %s scheduled for %s, deferring",
+                payout_id,
+                payout.scheduled_for,
+                extra={"event": "payout.deferred", "payout_id": payout_id},
+            )
+            return f"Deferred: scheduled for {payout.scheduled_for.isoformat()}"
+
         payout.status = StatusChoices.PROCESSING
         payout.save(update_fields=["status", "updated_at"])
+        invalidate([StatusChoices.PENDING, StatusChoices.PROCESSING], [payout.currency])
+        record_status_change(
+            payout_id,
+            StatusChoices.PENDING,
+            StatusChoices.PROCESSING,
+            StatusEventSource.TASK,
+        )
+        record_batch_transition(payout.batch_id, StatusChoices.PENDING, StatusChoices.PROCESSING)
 
-    # Simulate external processing
-    time.sleep(5)
-
-    # 10% failure rate for demonstration
-    if random.random() < 0.1:
-        logger.warning("Payout %s processing failed, will retry", payout_id)
+    try:
+        attempt = submit_payout(payout)
+    except GatewayError as exc:
+        logger.warning(
+            "Payout %s processing failed, will retry: %s",
+            payout_id,
+            exc,
+            extra={"event": "payout.retry", "payout_id": payout_id},
+        )
         # Reset to PENDING so retry can pick it up
         with transaction.atomic():
             payout = Payout.objects.select_for_update().get(id=payout_id)
+            previous = payout.status
             payout.status = StatusChoices.PENDING
             payout.save(update_fields=["status", "updated_at"])
-        raise PayoutProcessingError("Simulated processing failure")
+            invalidate([previous, StatusChoices.PENDING], [payout.currency])
+            record_status_change(
+                payout_id,
+                previous,
+                StatusChoices.PENDING,
+                StatusEventSource.TASK,
+            )
+            record_batch_transition(payout.batch_id, previous, StatusChoices.PENDING)
+        raise PayoutProcessingError(str(exc)) from exc
 
     # Success
     with transaction.atomic():
         payout = Payout.objects.select_for_update().get(id=payout_id)
+        previous = payout.status
         payout.status = StatusChoices.COMPLETED
         payout.save(update_fields=["status", "updated_at"])
+        invalidate([previous, StatusChoices.COMPLETED], [payout.currency])
+        record_status_change(
+            payout_id,
+            previous,
+            StatusChoices.COMPLETED,
+            StatusEventSource.TASK,
+        )
+        record_batch_transition(payout.batch_id, previous, StatusChoices.COMPLETED)
+        queue_status_webhooks(payout_id, StatusChoices.COMPLETED)
 
-    logger.info("Payout %s completed successfully", payout_id)
+    logger.info(
+        "Payout %s completed successfully, provider reference %s",
+        payout_id,
+        attempt.provider_reference,
+        extra={"event": "payout.completed", "payout_id": payout_id},
+    )
     return f"Completed: {payout_id}"
+
+
+@shared_task
+def dispatch_scheduled_payouts() -> int:
+    """
+    Enqueue PENDING payouts whose ``scheduled_for`` time has passed.
+
+    Runs periodically from Celery beat. Due rows are claimed through the
+    ``(status, scheduled_for)`` index in batches of
+    ``PAYOUTS_SCHEDULE_DISPATCH_BATCH_SIZE`` using ``SKIP LOCKED`` so several
+    dispatchers can run concurrently. ``scheduled_for`` is cleared in the
+    same transaction that enqueues the tasks; if enqueueing fails the batch
+    rolls back and is picked up again on the next run.
+    """
+    batch_size = settings.PAYOUTS_SCHEDULE_DISPATCH_BATCH_SIZE
+    dispatched = 0
+
+    for _ in range(settings.PAYOUTS_SCHEDULE_DISPATCH_MAX_BATCHES):
+        with transaction.atomic():
+            due_ids = list(
+                Payout.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=StatusChoices.PENDING,
+                    scheduled_for__lte=timezone.now(),
+                )
+                .order_by("scheduled_for")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not due_ids:
+                break
+            Payout.objects.filter(id__in=due_ids).update(
+                scheduled_for=None,
+                updated_at=timezone.now(),
+            )
+            invalidate([StatusChoices.PENDING])
+            if not settings.PAYOUTS_FAIR_DISPATCH:
+                for payout_id in due_ids:
+                    enqueue_payout(str(payout_id))
+        dispatched += len(due_ids)
+        if len(due_ids) < batch_size:
+            break
+
+    if dispatched:
+        logger.info("Dispatched %s scheduled payouts", dispatched)
+        if settings.PAYOUTS_FAIR_DISPATCH:
+            request_fair_dispatch()
+    return dispatched
+
+
+def request_fair_dispatch() -> None:
+    """Publish ``dispatch_fair_payouts`` unless a run is already queued."""
+    lock = get_dispatch_lock()
+    key = fair_dispatch_queued_key()
+    token = lock.acquire(key, settings.PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL)
+    if token is None:
+        return
+    try:
+        dispatch_fair_payouts.delay()
+    except Exception:
+        lock.release(key, token)
+        raise
+
+
+@shared_task
+def dispatch_fair_payouts() -> int:
+    """
+    Publish due PENDING payouts in weighted round-robin order across tenants.
+
+    Runs from Celery beat and whenever a payout is created or finishes.
+    Each tenant is limited to ``PAYOUTS_TENANT_MAX_IN_FLIGHT`` dispatched
+    payouts that are still PENDING or PROCESSING, so a large backlog from
+    one tenant cannot delay the others. Only one dispatcher runs at a time;
+    overlapping runs return immediately.
+    """
+    if not settings.PAYOUTS_FAIR_DISPATCH:
+        return 0
+    lock = get_dispatch_lock()
+    lock.release(fair_dispatch_queued_key())
+    run_token = lock.acquire(fair_dispatch_run_key(), settings.PAYOUTS_DEDUP_RUN_LOCK_TTL)
+    if run_token is None:
+        return 0
+    try:
+        dispatched = _dispatch_fair()
+    finally:
+        lock.release(fair_dispatch_run_key(), run_token)
+    if dispatched:
+        logger.info("Dispatched %s payouts across tenants", dispatched)
+    return dispatched
+
+
+def _dispatch_fair() -> int:
+    """Claim and publish one batch of payouts chosen by ``plan_dispatch``."""
+    now = timezone.now()
+
+    # Messages for these were lost (or never consumed); dispatch them again.
+    Payout.objects.filter(
+        status=StatusChoices.PENDING,
+        dispatched_at__lt=now - timedelta(seconds=settings.PAYOUTS_FAIR_DISPATCH_TIMEOUT),
+    ).update(dispatched_at=None)
+
+    queue = Payout.objects.filter(
+        Q(scheduled_for__isnull=True) | Q(scheduled_for__lte=now),
+        status=StatusChoices.PENDING,
+        dispatched_at__isnull=True,
+    )
+    waiting = dict(
+        queue.values("tenant")
+        .annotate(waiting=Count("id"), oldest=Min("created_at"))
+        .order_by("oldest")
+        .values_list("tenant", "waiting")
+    )
+    in_flight = dict(
+        Payout.objects.filter(
+            status__in=[StatusChoices.PENDING, StatusChoices.PROCESSING],
+            dispatched_at__isnull=False,
+        )
+        .values("tenant")
+        .annotate(in_flight=Count("id"))
+        .order_by()
+        .values_list("tenant", "in_flight")
+    )
+    plan = plan_dispatch(
+        waiting,
+        in_flight,
+        budget=settings.PAYOUTS_FAIR_DISPATCH_BATCH_SIZE,
+        max_in_flight=settings.PAYOUTS_TENANT_MAX_IN_FLIGHT,
+    )
+    if not plan:
+        return 0
+
+    with transaction.atomic():
+        claimed = {
+            tenant: iter(
+                list(
+                    queue.select_for_update(skip_locked=True)
+                    .filter(tenant=tenant)
+                    .order_by("created_at")
+                    .values_list("id", flat=True)[:count]
+                )
+            )
+            for tenant, count in Counter(plan).items()
+        }
+        ordered_ids = [
+            payout_id
+            for payout_id in (next(claimed[tenant], None) for tenant in plan)
+            if payout_id is not None
+        ]
+        Payout.objects.filter(id__in=ordered_ids).update(dispatched_at=now)
+        for payout_id in ordered_ids:
+            enqueue_payout(str(payout_id))
+    return len(ordered_ids)
+
+
+@shared_task
+def reconcile_statement_task(
+        statement_path: str,
+        report_path: str,
+        start_id: str,
+        end_id: str,
+) -> dict[str, Any]:
+    """Reconcile one ``[start_id, end_id)`` shard of a provider statement."""
+    result = reconcile(
+        Path(statement_path),
+        Path(report_path),
+        start_id=uuid.UUID(start_id),
+        end_id=uuid.UUID(end_id),
+    )
+    summary = result.as_dict()
+    logger.info("Reconciled %s [%s, %s): %s", statement_path, start_id, end_id, summary)
+    return summary
+
+
+@shared_task
+def capture_slow_queries(samples: list[dict[str, Any]]) -> int:
+    """Capture plans for and aggregate slow-query samples (``apps.payouts.slow_queries``)."""
+    return record_samples(samples)
+
+
+@shared_task
+def sample_pipeline_health() -> dict[str, Any]:
+    """Store a fresh pipeline health snapshot (``apps.payouts.health``)."""
+    return sample()
+
+
+def request_webhook_delivery() -> None:
+    """Publish ``deliver_webhooks`` unless a run is already queued."""
+    lock = get_dispatch_lock()
+    key = webhook_delivery_queued_key()
+    token = lock.acquire(key, settings.PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL)
+    if token is None:
+        return
+    try:
+        deliver_webhooks.delay()
+    except Exception:
+        lock.release(key, token)
+        logger.warning("Failed to publish deliver_webhooks, beat will retry", exc_info=True)
+
+
+@shared_task
+def deliver_webhooks() -> int:
+    """
+    Send due webhook deliveries (``apps.payouts.webhooks``).
+
+    Routed to the dedicated ``webhooks`` queue. Runs whenever deliveries
+    are queued and from Celery beat to pick up retries. Several runs may
+    overlap; each claims its own rows. Returns the number delivered.
+    """
+    get_dispatch_lock().release(webhook_delivery_queued_key())
+    delivered = 0
+    for _ in range(settings.PAYOUTS_WEBHOOK_MAX_CLAIMS_PER_RUN):
+        claimed, sent = deliver_due_webhooks()
+        delivered += sent
+        if claimed < settings.PAYOUTS_WEBHOOK_CLAIM_SIZE:
+            break
+    return delivered
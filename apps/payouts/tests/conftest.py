@@ -4,13 +4,34 @@ Payout-specific pytest fixtures.
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from decimal import Decimal
 from typing import Any, Dict
 
 import pytest
 from django.utils import timezone
 
+from apps.payouts.list_cache import get_list_cache
 from apps.payouts.models import CurrencyChoices, Payout, StatusChoices
+from apps.payouts.tests.webhook_receiver import WebhookReceiver
+from apps.payouts.webhooks import pool
+
+
+@pytest.fixture(autouse=True)
+def _clear_list_cache():
+    """Start every test with an empty list response cache."""
+    get_list_cache().clear()
+    yield
+    get_list_cache().clear()
+
+
+@pytest.fixture
+def webhook_receiver() -> Iterator[WebhookReceiver]:
+    """A local webhook endpoint that records the batches it receives."""
+    receiver = WebhookReceiver().start()
+    yield receiver
+    pool.close()
+    receiver.stop()
 
 
 @pytest.fixture
@@ -18,7 +18,7 @@ pytestmark = pytest.mark.django_db
 
 class TestPayoutCreateAPI:
     @patch("apps.payouts.services.transaction.on_commit")
-    @patch("apps.payouts.services.process_payout_task.delay")
+    @patch("apps.payouts.tasks.process_payout_task.delay")
     def test_create_payout_success(
             self,
             mock_delay,
@@ -126,3 +126,63 @@ class TestPayoutDeleteAPI:
 
         assert response.status_code == 204
         assert not Payout.objects.filter(id=payout.id).exists()
+
+
+class TestPayoutBulkStatusAPI:
+    def test_bulk_cancel_by_ids_skips_non_pending(
+            self,
+            client,
+            payout: Payout,
+            processing_payout: Payout,
+    ) -> None:
+        url = reverse("payout-bulk-status")
+        payload = {
+            "status": StatusChoices.CANCELLED,
+            "ids": [str(payout.id), str(processing_payout.id)],
+        }
+
+        response = client.post(url, data=payload, content_type="application/json")
+
+        assert response.status_code == 200
+        assert response.json() == {"affected": 1, "skipped": 1}
+        payout.refresh_from_db()
+        processing_payout.refresh_from_db()
+        assert payout.status == StatusChoices.CANCELLED
+        assert processing_payout.status == StatusChoices.PROCESSING
+
+    def test_bulk_cancel_by_filter(
+            self,
+            client,
+            payout: Payout,
+            completed_payout: Payout,
+    ) -> None:
+        url = reverse("payout-bulk-status")
+        payload = {"status": StatusChoices.CANCELLED, "filter": {"currency": "usd"}}
+
+        response = client.post(url, data=payload, content_type="application/json")
+
+        assert response.status_code == 200
+        assert response.json() == {"affected": 1, "skipped": 1}
+        assert Payout.objects.get(id=payout.id).status == StatusChoices.CANCELLED
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"status": StatusChoices.CANCELLED},
+            {"status": StatusChoices.COMPLETED, "filter": {"currency": "USD"}},
+            {"status": StatusChoices.CANCELLED, "filter": {"status": ""}},
+            {"status": StatusChoices.CANCELLED, "filter": {"min_amount": "abc"}},
+        ],
+    )
+    def test_bulk_status_validation_error(
+            self,
+            client,
+            payout: Payout,
+            payload: Dict[str, Any],
+    ) -> None:
+        url = reverse("payout-bulk-status")
+
+        response = client.post(url, data=payload, content_type="application/json")
+
+        assert response.status_code == 400
+        assert Payout.objects.get(id=payout.id).status == StatusChoices.PENDING
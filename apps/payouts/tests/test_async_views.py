@@ -0,0 +1,85 @@
+"""
+Tests for the async read-only payouts views.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from apps.payouts.models import Payout, StatusChoices
+
+pytestmark = pytest.mark.django_db
+
+
+@async_to_sync
+async def _get(url: str, params: dict[str, Any] | None = None) -> Any:
+    """Perform a GET through Django's AsyncClient from a sync test."""
+    return await AsyncClient().get(url, params or {})
+
+
+class TestAsyncPayoutList:
+    def test_list_matches_sync_envelope(self, client, payout: Payout) -> None:
+        url = reverse("payout-async-list")
+
+        response = _get(url)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert data["next"] is None
+        assert data["previous"] is None
+        assert data == client.get(reverse("payout-list")).json()
+
+    def test_filter_by_status(self, payout: Payout, completed_payout: Payout) -> None:
+        url = reverse("payout-async-list")
+
+        response = _get(url, {"status": StatusChoices.COMPLETED})
+
+        results = response.json()["results"]
+        assert [item["id"] for item in results] == [str(completed_payout.id)]
+
+    def test_invalid_filter_returns_400(self, payout: Payout) -> None:
+        response = _get(reverse("payout-async-list"), {"status": "BOGUS"})
+
+        assert response.status_code == 400
+        assert "status" in response.json()
+
+    def test_pagination_links(self, valid_payout_data: dict[str, Any]) -> None:
+        for _ in range(11):
+            Payout.objects.create(**valid_payout_data)
+        url = reverse("payout-async-list")
+
+        first = _get(url).json()
+        second = _get(url, {"page": 2}).json()
+
+        assert first["count"] == 11
+        assert len(first["results"]) == 10
+        assert first["next"].endswith("?page=2")
+        assert len(second["results"]) == 1
+        assert second["next"] is None
+        assert second["previous"].endswith(url)
+
+    def test_out_of_range_page_returns_404(self, payout: Payout) -> None:
+        response = _get(reverse("payout-async-list"), {"page": 5})
+
+        assert response.status_code == 404
+
+
+class TestAsyncPayoutDetail:
+    def test_retrieve_payout(self, client, payout: Payout) -> None:
+        response = _get(reverse("payout-async-detail", args=[payout.id]))
+
+        assert response.status_code == 200
+        sync_data = client.get(reverse("payout-detail", args=[payout.id])).json()
+        assert response.json() == sync_data
+
+    def test_missing_payout_returns_404(self) -> None:
+        response = _get(reverse("payout-async-detail", args=[uuid.uuid4()]))
+
+        assert response.status_code == 404
@@ -0,0 +1,217 @@
+"""
+Tests for payout batches and their progress counters.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, cast
+from unittest.mock import patch
+
+import pytest
+from celery.exceptions import Retry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.payouts.batches import recount_batches
+from apps.payouts.models import Payout, PayoutBatch, StatusChoices
+from apps.payouts.services import PayoutService
+from apps.payouts.tasks import PayoutProcessingError, process_payout_task
+from apps.payouts.views import PayoutViewSet
+
+pytestmark = pytest.mark.django_db
+
+COUNTERS = (
+    "total",
+    "pending_count",
+    "processing_count",
+    "completed_count",
+    "failed_count",
+    "cancelled_count",
+)
+
+
+def _counters(batch: PayoutBatch) -> tuple[int, ...]:
+    batch.refresh_from_db()
+    return tuple(getattr(batch, field) for field in COUNTERS)
+
+
+def _item(valid_payout_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {**valid_payout_data, "amount": str(valid_payout_data["amount"])}
+
+
+@pytest.fixture
+def batch(valid_payout_data: Dict[str, Any]) -> PayoutBatch:
+    """A batch of three PENDING payouts, not yet dispatched."""
+    with patch("apps.payouts.services.transaction.on_commit"):
+        return PayoutService.create_batch([valid_payout_data] * 3, tenant="acme")
+
+
+class TestBatchApi:
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_submit_creates_payouts_and_dispatches_them(
+            self,
+            mock_delay: Any,
+            client,
+            valid_payout_data: Dict[str, Any],
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("payout-batch-list"),
+                data={
+                    "tenant": "acme",
+                    "reference": "payroll-2025-03",
+                    "payouts": [_item(valid_payout_data)] * 4,
+                },
+                content_type="application/json",
+            )
+
+        data = response.json()
+        assert response.status_code == 201
+        assert data["reference"] == "payroll-2025-03"
+        assert (data["total"], data["pending_count"], data["completed_count"]) == (4, 4, 0)
+        payouts = Payout.objects.filter(batch_id=data["id"])
+        assert {payout.tenant for payout in payouts} == {"acme"}
+        assert all(payout.amount_base is not None for payout in payouts)
+        assert {call.args[0] for call in mock_delay.call_args_list} == {
+            str(payout.id) for payout in payouts
+        }
+
+    def test_submission_size_is_limited(
+            self,
+            client,
+            settings: Any,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_BATCH_MAX_SIZE = 2
+
+        response = client.post(
+            reverse("payout-batch-list"),
+            data={"payouts": [_item(valid_payout_data)] * 3},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "payouts" in response.json()
+        assert not PayoutBatch.objects.exists()
+
+    def test_progress_is_one_query(
+            self,
+            client,
+            batch: PayoutBatch,
+            django_assert_num_queries: Any,
+    ) -> None:
+        with django_assert_num_queries(1):
+            response = client.get(reverse("payout-batch-detail", args=[batch.id]))
+
+        assert response.json()["pending_count"] == 3
+
+    def test_list_filters_by_batch(
+            self,
+            client,
+            batch: PayoutBatch,
+            payout: Payout,
+    ) -> None:
+        response = client.get(reverse("payout-list"), {"batch": str(batch.id)})
+
+        assert response.json()["count"] == 3
+        assert {item["batch"] for item in response.json()["results"]} == {str(batch.id)}
+
+
+class TestBatchCounters:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", side_effect=[0.5, 0.07])
+    def test_task_transitions_move_counters(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            batch: PayoutBatch,
+    ) -> None:
+        first, second, _ = batch.payouts.order_by("id")
+
+        process_payout_task.apply(args=(str(first.id),))
+        with pytest.raises(Retry):
+            process_payout_task.apply(args=(str(second.id),))
+        assert _counters(batch) == (3, 2, 0, 1, 0, 0)
+
+        process_payout_task.on_failure(
+            PayoutProcessingError("boom"),
+            "task-id",
+            (str(second.id),),
+            {},
+            cast(Any, None),
+        )
+        assert _counters(batch) == (3, 1, 0, 1, 1, 0)
+
+    def test_on_failure_ignores_deleted_payout(self, batch: PayoutBatch) -> None:
+        payout_id = str(uuid.uuid4())
+
+        process_payout_task.on_failure(
+            PayoutProcessingError("boom"),
+            "task-id",
+            (payout_id,),
+            {},
+            cast(Any, None),
+        )
+
+        assert _counters(batch) == (3, 3, 0, 0, 0, 0)
+
+    def test_service_update_moves_counters(self, batch: PayoutBatch) -> None:
+        payout = batch.payouts.all()[0]
+
+        PayoutService.update_status(payout, StatusChoices.CANCELLED)
+
+        assert _counters(batch) == (3, 2, 0, 0, 0, 1)
+
+    def test_bulk_update_coalesces_per_batch(
+            self,
+            batch: PayoutBatch,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        with patch("apps.payouts.services.transaction.on_commit"):
+            other = PayoutService.create_batch([valid_payout_data] * 2, tenant="acme")
+        ids = list(Payout.objects.values_list("id", flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            affected, skipped = PayoutService.bulk_update_status(StatusChoices.CANCELLED, ids=ids)
+
+        batch_updates = [q for q in queries if q["sql"].startswith('UPDATE "payouts_payoutbatch"')]
+        assert (affected, skipped) == (5, 0)
+        assert len(batch_updates) == 2
+        assert _counters(batch) == (3, 0, 0, 0, 0, 3)
+        assert _counters(other) == (2, 0, 0, 0, 0, 2)
+
+    def test_bulk_update_by_filter_skips_claimed(self, batch: PayoutBatch) -> None:
+        claimed = batch.payouts.all()[0]
+        PayoutService.update_status(claimed, StatusChoices.PROCESSING)
+
+        affected, skipped = PayoutService.bulk_update_status(
+            StatusChoices.FAILED,
+            queryset=Payout.objects.filter(batch=batch),
+        )
+
+        assert (affected, skipped) == (2, 1)
+        assert _counters(batch) == (3, 0, 1, 0, 2, 0)
+
+    def test_api_delete_and_recount(self, client, batch: PayoutBatch) -> None:
+        payout = batch.payouts.all()[0]
+
+        client.delete(reverse("payout-detail", args=[payout.id]))
+        assert _counters(batch) == (2, 2, 0, 0, 0, 0)
+
+        Payout.objects.filter(batch=batch).update(status=StatusChoices.COMPLETED)
+        recount_batches([batch.id])
+        assert _counters(batch) == (2, 0, 0, 2, 0, 0)
+
+    def test_delete_counts_the_current_status(self, batch: PayoutBatch) -> None:
+        stale = batch.payouts.all()[0]
+        PayoutService.update_status(
+            Payout.objects.get(id=stale.id),
+            StatusChoices.PROCESSING,
+        )
+
+        PayoutViewSet().perform_destroy(stale)
+
+        assert _counters(batch) == (2, 2, 0, 0, 0, 0)
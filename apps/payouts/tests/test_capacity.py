@@ -0,0 +1,115 @@
+"""
+Tests for the process_payout_task capacity simulator.
+"""
+
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.payouts.capacity import TaskModel, find_min_workers, simulate
+from apps.payouts.tasks import process_payout_task
+
+
+class TestTaskModel:
+    def test_from_task_uses_task_retry_configuration(self) -> None:
+        model = TaskModel.from_task(failure_rate=0.03)
+
+        assert model.max_retries == process_payout_task.max_retries
+        assert model.retry_backoff_max == process_payout_task.retry_backoff_max
+        assert model.failure_rate == 0.03
+
+
+class TestSimulate:
+    def test_underloaded_fleet_adds_no_queueing(self) -> None:
+        model = TaskModel(latency_p50=0.5, latency_p99=0.5, failure_rate=0)
+
+        result = simulate(model, workers=10, arrival_rate=5, duration=60, arrival="constant")
+
+        assert result.completed == result.submitted == 300
+        assert result.queue_depth_max == 0
+        assert result.latency_percentile(99) == pytest.approx(0.51)
+
+    def test_failures_follow_retry_backoff_then_on_failure(self) -> None:
+        model = TaskModel(latency_p50=0.1, latency_p99=0.1, failure_rate=1.0)
+
+        result = simulate(model, workers=1, arrival_rate=0.1, duration=10, drain_limit=60)
+
+        assert result.failed == result.submitted == 1
+        assert result.attempts == model.max_retries + 1
+        # 4 attempts, backoffs of 1 + 2 + 4 s, and the on_failure transaction.
+        assert result.latencies[0] == pytest.approx(4 * 0.11 + 7 + 0.005)
+
+    def test_overload_leaves_unfinished_backlog(self) -> None:
+        model = TaskModel(latency_p50=1.0, latency_p99=1.0, failure_rate=0)
+
+        result = simulate(model, workers=2, arrival_rate=5, duration=30)
+
+        assert result.unfinished > 0
+        assert result.utilization == pytest.approx(1.0, abs=0.01)
+
+    def test_same_seed_is_reproducible(self) -> None:
+        model = TaskModel.from_task(latency_p50=0.3, latency_p99=0.8, failure_rate=0.03)
+
+        first = simulate(model, workers=20, arrival_rate=50, duration=20, seed=7)
+        second = simulate(model, workers=20, arrival_rate=50, duration=20, seed=7)
+
+        assert first.as_dict() == second.as_dict()
+
+
+class TestFindMinWorkers:
+    def test_returns_smallest_count_meeting_target(self) -> None:
+        model = TaskModel.from_task(latency_p50=0.3, latency_p99=0.8, failure_rate=0.03)
+
+        workers, result = find_min_workers(
+            model,
+            arrival_rate=100,
+            duration=30,
+            target_p99=2.0,
+        )
+
+        assert result.latency_percentile(99) <= 2.0
+        fewer = simulate(model, workers - 1, arrival_rate=100, duration=30)
+        assert fewer.unfinished or fewer.latency_percentile(99) > 2.0
+
+    def test_unreachable_target_raises(self) -> None:
+        model = TaskModel.from_task(latency_p50=0.3, latency_p99=0.8, failure_rate=0.03)
+
+        with pytest.raises(ValueError, match="not reachable"):
+            find_min_workers(
+                model,
+                arrival_rate=10,
+                duration=10,
+                target_p99=0.1,
+                max_workers=64,
+            )
+
+    def test_command_reports_unreachable_target(self) -> None:
+        with pytest.raises(CommandError, match="not reachable"):
+            call_command(
+                "simulate_capacity",
+                "--rate=10",
+                "--target-p99-ms=1000",
+                "--duration=10",
+                "--max-workers=64",
+            )
+
+    def test_command_prints_json_summary(self) -> None:
+        out = StringIO()
+
+        call_command(
+            "simulate_capacity",
+            "--rate=20",
+            "--workers=150",
+            "--duration=30",
+            "--json",
+            stdout=out,
+        )
+
+        summary = json.loads(out.getvalue())
+        assert summary["workers"] == 150
+        assert summary["unfinished"] == 0
@@ -0,0 +1,107 @@
+"""
+Tests for the payout change feed.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.payouts.changes import FeedPosition, decode_cursor, encode_cursor
+from apps.payouts.models import Payout, StatusChoices
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def payouts(valid_payout_data: Dict[str, Any]) -> list[Payout]:
+    """Five payouts changed at the very same instant, a minute ago."""
+    created = [Payout.objects.create(**valid_payout_data) for _ in range(5)]
+    Payout.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+    return sorted(created, key=lambda payout: payout.id)
+
+
+def _read_feed(client, **params: Any) -> tuple[list[str], str | None]:
+    """Follow ``next_cursor`` until the feed is drained."""
+    seen: list[str] = []
+    while True:
+        data = client.get(reverse("payout-changes"), params).json()
+        seen += [item["id"] for item in data["results"]]
+        params = {"cursor": data["next_cursor"], "limit": params.get("limit", 100)}
+        if not data["has_more"]:
+            return seen, data["next_cursor"]
+
+
+class TestCursor:
+    def test_round_trip(self, payout: Payout) -> None:
+        position = FeedPosition(payout.updated_at, payout.id)
+
+        assert decode_cursor(encode_cursor(position)) == position
+
+    def test_invalid_cursor_is_rejected(self, client) -> None:
+        response = client.get(reverse("payout-changes"), {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert "cursor" in response.json()
+
+
+class TestChangeFeed:
+    def test_pages_through_shared_timestamp_without_gaps(
+            self,
+            client,
+            payouts: list[Payout],
+    ) -> None:
+        seen, cursor = _read_feed(client, limit=2)
+        data = client.get(reverse("payout-changes"), {"cursor": cursor}).json()
+
+        assert seen == [str(payout.id) for payout in payouts]
+        assert data == {"results": [], "next_cursor": cursor, "has_more": False}
+
+    def test_changed_payout_reappears_after_cursor(
+            self,
+            client,
+            payouts: list[Payout],
+    ) -> None:
+        _, cursor = _read_feed(client)
+        changed = payouts[2]
+        Payout.objects.filter(id=changed.id).update(
+            status=StatusChoices.CANCELLED,
+            updated_at=timezone.now() - timedelta(seconds=30),
+        )
+
+        data = client.get(reverse("payout-changes"), {"cursor": cursor}).json()
+
+        assert [(item["id"], item["status"]) for item in data["results"]] == [
+            (str(changed.id), StatusChoices.CANCELLED),
+        ]
+
+    def test_recent_changes_wait_for_settle_window(
+            self,
+            client,
+            settings: Any,
+            payout: Payout,
+    ) -> None:
+        assert client.get(reverse("payout-changes")).json()["results"] == []
+
+        settings.PAYOUTS_CHANGE_FEED_SETTLE_SECONDS = 0
+        data = client.get(reverse("payout-changes")).json()
+
+        assert [item["id"] for item in data["results"]] == [str(payout.id)]
+
+    def test_updated_since_starts_mid_feed(self, client, payouts: list[Payout]) -> None:
+        newest = payouts[0]
+        since = timezone.now() - timedelta(seconds=30)
+        Payout.objects.filter(id=newest.id).update(updated_at=since)
+
+        response = client.get(reverse("payout-changes"), {"updated_since": since.isoformat()})
+        both = client.get(
+            reverse("payout-changes"),
+            {"updated_since": since.isoformat(), "cursor": encode_cursor(FeedPosition(since))},
+        )
+
+        assert [item["id"] for item in response.json()["results"]] == [str(newest.id)]
+        assert both.status_code == 400
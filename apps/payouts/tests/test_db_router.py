@@ -0,0 +1,158 @@
+"""
+Tests for primary/replica routing and read-your-writes pinning.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from apps.payouts.models import Payout
+from config.db_router import (
+    PIN_COOKIE_NAME,
+    PrimaryPinningMiddleware,
+    PrimaryReplicaRouter,
+    allow_replica,
+    pin_to_primary,
+)
+
+router = PrimaryReplicaRouter()
+
+
+class TestPrimaryReplicaRouter:
+    def test_reads_use_primary_without_replicas(self) -> None:
+        assert router.db_for_read(Payout) == "default"
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_reads_use_primary_unless_replica_allowed(self) -> None:
+        assert router.db_for_read(Payout) == "default"
+        with allow_replica():
+            assert router.db_for_read(Payout) == "replica_0"
+        assert router.db_for_write(Payout) == "default"
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_pinned_reads_use_primary(self) -> None:
+        with allow_replica():
+            with pin_to_primary():
+                assert router.db_for_read(Payout) == "default"
+            assert router.db_for_read(Payout) == "replica_0"
+
+    @pytest.mark.django_db
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_reads_inside_primary_transaction_use_primary(self) -> None:
+        with allow_replica(), transaction.atomic():
+            assert router.db_for_read(Payout) == "default"
+
+    def test_only_primary_is_migrated(self) -> None:
+        assert router.allow_migrate("default", "payouts") is True
+        assert router.allow_migrate("replica_0", "payouts") is False
+
+
+@pytest.mark.django_db
+class TestPrimaryPinningMiddleware:
+    @patch("apps.payouts.services.transaction.on_commit")
+    def test_write_sets_pin_cookie(
+            self,
+            mock_on_commit,
+            client,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        payload = {**valid_payout_data, "amount": "10.00"}
+
+        response = client.post(
+            reverse("payout-list"),
+            data=payload,
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        assert response.cookies[PIN_COOKIE_NAME]["max-age"] == 5
+
+    def test_read_does_not_set_pin_cookie(self, client, payout: Payout) -> None:
+        response = client.get(reverse("payout-list"))
+
+        assert PIN_COOKIE_NAME not in response.cookies
+
+    # Outside the test transaction, so the router is free to pick a replica.
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_retrieve_reads_from_replica(self, client, payout: Payout) -> None:
+        with patch("config.db_router.random.choice", return_value="default") as mock_choice:
+            response = client.get(reverse("payout-detail", args=[payout.id]))
+
+        assert response.status_code == 200
+        mock_choice.assert_called_with(["replica_0"])
+
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_list_cache_miss_reads_replica_and_is_not_cached(
+            self,
+            client,
+            payout: Payout,
+    ) -> None:
+        with (
+            patch("config.db_router.random.choice", return_value="default") as mock_choice,
+            patch("apps.payouts.views.set_page") as mock_set_page,
+        ):
+            response = client.get(reverse("payout-list"))
+
+        assert response.json()["count"] == 1
+        mock_choice.assert_called_with(["replica_0"])
+        mock_set_page.assert_not_called()
+
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(
+        DATABASE_REPLICAS=["replica_0"],
+        PAYOUTS_LIST_CACHE_MISS_FROM_REPLICA=False,
+    )
+    def test_list_cache_miss_from_primary_is_cached(self, client, payout: Payout) -> None:
+        with (
+            patch("config.db_router.random.choice") as mock_choice,
+            patch("apps.payouts.views.set_page") as mock_set_page,
+        ):
+            client.get(reverse("payout-list"))
+
+        mock_choice.assert_not_called()
+        mock_set_page.assert_called_once()
+
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_worker_reads_stay_on_primary(self, payout: Payout) -> None:
+        with patch("config.db_router.random.choice") as mock_choice:
+            Payout.objects.get(id=payout.id)
+
+        mock_choice.assert_not_called()
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_pinned_client_reads_from_primary(self, client, payout: Payout) -> None:
+        client.cookies[PIN_COOKIE_NAME] = "1"
+
+        with patch("config.db_router.random.choice") as mock_choice:
+            response = client.get(reverse("payout-detail", args=[payout.id]))
+
+        assert response.status_code == 200
+        mock_choice.assert_not_called()
+
+    def test_async_chain_is_awaited_without_thread_hop(self) -> None:
+        seen = []
+
+        async def view(request: HttpRequest) -> HttpResponse:
+            seen.append(router.db_for_read(Payout))
+            return HttpResponse(status=201)
+
+        middleware = PrimaryPinningMiddleware(view)
+        request = RequestFactory().post("/api/payouts/")
+
+        with override_settings(DATABASE_REPLICAS=["replica_0"]), allow_replica():
+            response = async_to_sync(middleware)(request)
+
+        assert iscoroutinefunction(middleware)
+        assert seen == ["default"]
+        assert response.cookies[PIN_COOKIE_NAME]["max-age"] == 5
@@ -0,0 +1,153 @@
+"""
+Tests for fair payout dispatch across tenants.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from apps.payouts.fairness import plan_dispatch
+from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.services import PayoutService
+from apps.payouts.tasks import dispatch_fair_payouts, process_payout_task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def fair_settings(settings: Any) -> Any:
+    settings.PAYOUTS_FAIR_DISPATCH = True
+    settings.PAYOUTS_TENANT_MAX_IN_FLIGHT = 2
+    settings.PAYOUTS_FAIR_DISPATCH_BATCH_SIZE = 100
+    settings.PAYOUTS_TENANT_WEIGHTS = {}
+    return settings
+
+
+def simulate(
+        submissions: list[tuple[int, str]],
+        workers: int,
+        fair: bool,
+        max_in_flight: int = 10,
+) -> dict[str, list[int]]:
+    """
+    Run a tick-based model of the broker and workers; return latencies per tenant.
+
+    Every payout takes one tick to process. In FIFO mode payouts go to the
+    broker queue on submission; in fair mode they wait in per-tenant sets
+    and ``plan_dispatch`` decides what is published each tick.
+    """
+    arrivals = deque(sorted(submissions))
+    pending: dict[str, deque[int]] = {}
+    broker: deque[tuple[str, int]] = deque()
+    in_flight: Counter[str] = Counter()
+    latencies: dict[str, list[int]] = {}
+    tick = 0
+    while arrivals or broker or any(pending.values()):
+        while arrivals and arrivals[0][0] <= tick:
+            submitted, tenant = arrivals.popleft()
+            if fair:
+                pending.setdefault(tenant, deque()).append(submitted)
+            else:
+                broker.append((tenant, submitted))
+        if fair:
+            # Tenants ordered by their oldest waiting payout, like the dispatcher.
+            queues = sorted((q[0], t) for t, q in pending.items() if q)
+            waiting = {tenant: len(pending[tenant]) for _, tenant in queues}
+            for tenant in plan_dispatch(waiting, in_flight, 10_000, max_in_flight):
+                broker.append((tenant, pending[tenant].popleft()))
+                in_flight[tenant] += 1
+        for _ in range(min(workers, len(broker))):
+            tenant, submitted = broker.popleft()
+            in_flight[tenant] -= 1
+            latencies.setdefault(tenant, []).append(tick + 1 - submitted)
+        tick += 1
+    return latencies
+
+
+class TestPlanDispatch:
+    def test_round_robin_respects_weights_and_caps(self, settings: Any) -> None:
+        settings.PAYOUTS_TENANT_WEIGHTS = {"big": "2"}
+
+        plan = plan_dispatch(
+            {"big": 100, "small": 1, "medium": 5},
+            in_flight={"medium": 2},
+            budget=8,
+            max_in_flight=4,
+        )
+
+        assert plan == ["big", "big", "small", "medium", "big", "big", "medium"]
+
+
+class TestFairnessSimulation:
+    def test_small_tenants_unaffected_by_giant_backlog(self) -> None:
+        small = [(t, f"small-{t % 3}") for t in range(5, 200, 7)]
+        giant = [(0, "giant")] * 20_000
+
+        alone = simulate(small, workers=10, fair=True)
+        fair = simulate(giant + small, workers=10, fair=True)
+        fifo = simulate(giant + small, workers=10, fair=False)
+
+        def worst(latencies: dict[str, list[int]]) -> int:
+            return max(max(v) for k, v in latencies.items() if k.startswith("small"))
+
+        assert worst(alone) == 1
+        # Waiting behind the giant's in-flight cap costs at most one extra tick.
+        assert worst(fair) <= worst(alone) + 1
+        assert worst(fifo) > 1_000
+        # The giant still gets all spare capacity.
+        assert len(fair["giant"]) == 20_000
+
+
+class TestDispatchFairPayouts:
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_interleaves_tenants_within_caps(
+            self,
+            mock_delay: Any,
+            fair_settings: Any,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        big = [Payout.objects.create(**valid_payout_data, tenant="big") for _ in range(5)]
+        small = Payout.objects.create(**valid_payout_data, tenant="small")
+
+        assert dispatch_fair_payouts() == 3
+        published = [call.args[0] for call in mock_delay.call_args_list]
+        assert published == [str(big[0].id), str(small.id), str(big[1].id)]
+
+        # Both tenants are at their cap until a payout finishes.
+        assert dispatch_fair_payouts() == 0
+        Payout.objects.filter(id=big[0].id).update(status=StatusChoices.COMPLETED)
+        assert dispatch_fair_payouts() == 1
+        assert mock_delay.call_args.args[0] == str(big[2].id)
+
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_create_wakes_dispatcher(
+            self,
+            mock_delay: Any,
+            fair_settings: Any,
+            valid_payout_data: Dict[str, Any],
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        with django_capture_on_commit_callbacks(execute=True):
+            payout = PayoutService.create_payout({**valid_payout_data, "tenant": "acme"})
+
+        mock_delay.assert_called_once_with(str(payout.id))
+        payout.refresh_from_db()
+        assert payout.dispatched_at is not None
+
+    @patch("apps.payouts.tasks.dispatch_fair_payouts.delay", side_effect=ConnectionError)
+    @patch("apps.payouts.tasks._process_payout", side_effect=RuntimeError("provider down"))
+    def test_broker_error_does_not_hide_task_error(
+            self,
+            mock_process: Any,
+            mock_dispatch: Any,
+            fair_settings: Any,
+            payout: Payout,
+    ) -> None:
+        with pytest.raises(RuntimeError, match="provider down"):
+            process_payout_task.run(str(payout.id))
+
+        mock_dispatch.assert_called_once_with()
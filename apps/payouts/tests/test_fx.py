@@ -0,0 +1,131 @@
+"""
+Tests for FX conversion and the base-currency amount column.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+
+from apps.payouts.fx import FxRateCache, backfill_amount_base, fx_rates
+from apps.payouts.models import CurrencyChoices, FxRate, Payout
+from apps.payouts.services import PayoutService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def eur_rate():
+    fx_rates.clear()
+    rate = FxRate.objects.create(currency=CurrencyChoices.EUR, rate_to_base=Decimal("1.1"))
+    yield rate
+    fx_rates.clear()
+
+
+class TestFxRateCache:
+    def test_caches_rate_until_ttl(self) -> None:
+        cache = FxRateCache(ttl=60, maxsize=4)
+
+        assert cache.get_rate(CurrencyChoices.EUR) == Decimal("1.1")
+        FxRate.objects.filter(currency=CurrencyChoices.EUR).update(rate_to_base=2)
+
+        assert cache.get_rate(CurrencyChoices.EUR) == Decimal("1.1")
+        cache.clear()
+        assert cache.get_rate(CurrencyChoices.EUR) == Decimal("2")
+
+    def test_evicts_least_recently_used(self) -> None:
+        FxRate.objects.create(currency=CurrencyChoices.GBP, rate_to_base=Decimal("1.3"))
+        cache = FxRateCache(ttl=60, maxsize=1)
+
+        cache.get_rate(CurrencyChoices.EUR)
+        cache.get_rate(CurrencyChoices.GBP)
+
+        assert list(cache._entries) == [CurrencyChoices.GBP]
+
+
+class TestAmountBase:
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_create_fills_amount_base(
+            self,
+            mock_delay: Any,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        payout = PayoutService.create_payout(
+            {**valid_payout_data, "currency": CurrencyChoices.EUR},
+        )
+
+        assert payout.amount_base == Decimal("110.00")
+
+    def test_update_recomputes_amount_base(self, client, payout: Payout) -> None:
+        url = reverse("payout-detail", args=[payout.id])
+
+        response = client.patch(
+            url,
+            data={"currency": CurrencyChoices.EUR},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        payout.refresh_from_db()
+        assert payout.amount_base == Decimal("110.00")
+
+    def test_save_converts_changed_amount_or_currency(self, payout: Payout) -> None:
+        payout.currency = CurrencyChoices.EUR
+        payout.save()
+        converted = payout.amount_base
+
+        payout.amount = Decimal("200.00")
+        payout.save(update_fields=["amount", "updated_at"])
+        payout.refresh_from_db()
+
+        assert converted == Decimal("110.00")
+        assert payout.amount_base == Decimal("220.00")
+
+    def test_admin_edit_converts_amount(self, admin_client, payout: Payout) -> None:
+        url = reverse("admin:payouts_payout_change", args=[payout.id])
+        form = admin_client.get(url).context["adminform"].form
+        data = {
+            **{name: form[name].value() for name in form.fields},
+            "currency": CurrencyChoices.EUR,
+            "recipient_details": '{"account_number": "1234567890"}',
+            "attempts-TOTAL_FORMS": 0,
+            "attempts-INITIAL_FORMS": 0,
+        }
+        data = {name: value for name, value in data.items() if value is not None}
+
+        response = admin_client.post(url, data)
+
+        payout.refresh_from_db()
+        assert response.status_code == 302
+        assert payout.amount_base == Decimal("110.00")
+
+    def test_filter_by_base_amount(self, client, valid_payout_data: Dict[str, Any]) -> None:
+        usd = Payout.objects.create(**valid_payout_data, amount_base=Decimal("100.00"))
+        Payout.objects.create(
+            **{**valid_payout_data, "currency": CurrencyChoices.EUR},
+            amount_base=Decimal("110.00"),
+        )
+
+        response = client.get(reverse("payout-list"), {"max_amount_base": "105"})
+
+        assert [item["id"] for item in response.json()["results"]] == [str(usd.id)]
+
+    def test_backfill_fills_missing_in_chunks(self, valid_payout_data: Dict[str, Any]) -> None:
+        for currency in (CurrencyChoices.USD, CurrencyChoices.EUR, CurrencyChoices.RUB):
+            Payout.objects.create(**{**valid_payout_data, "currency": currency})
+        Payout.objects.update(amount_base=None)
+        updated_at = dict(Payout.objects.values_list("id", "updated_at"))
+
+        updated = backfill_amount_base(chunk_size=2)
+
+        assert updated == 2
+        assert dict(Payout.objects.values_list("id", "updated_at")) == updated_at
+        assert dict(Payout.objects.values_list("currency", "amount_base")) == {
+            CurrencyChoices.USD: Decimal("100.00"),
+            CurrencyChoices.EUR: Decimal("110.00"),
+            CurrencyChoices.RUB: None,
+        }
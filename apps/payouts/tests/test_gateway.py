@@ -0,0 +1,172 @@
+"""
+Tests for provider attempts, idempotency keys and resumed retries.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from celery.exceptions import Retry
+
+from apps.payouts.gateway import (
+    GatewayDeclined,
+    GatewayTimeout,
+    InMemoryPaymentStore,
+    ProviderPayment,
+    RedisPaymentStore,
+    gateway,
+    submit_payout,
+)
+from apps.payouts.models import AttemptStatusChoices, Payout, PayoutAttempt, StatusChoices
+from apps.payouts.tasks import process_payout_task
+
+pytestmark = pytest.mark.django_db
+
+# Rolls of the simulated provider: a lost response, a decline and a success.
+ACCEPTED_BUT_LOST = 0.01
+DECLINED = 0.07
+SUCCEEDED = 0.5
+
+
+@pytest.fixture(autouse=True)
+def _reset_gateway():
+    gateway.reset()
+    yield
+    gateway.reset()
+
+
+def _attempts(payout: Payout) -> list[tuple[int, str]]:
+    return [(attempt.number, attempt.status) for attempt in payout.attempts.all()]
+
+
+class TestSimulatedGateway:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=ACCEPTED_BUT_LOST)
+    def test_repeated_key_replays_outcome(self, mock_random: Any, mock_sleep: Any) -> None:
+        with pytest.raises(GatewayTimeout):
+            gateway.submit("key-1", Decimal("10"), "USD")
+        reference = gateway.submit("key-1", Decimal("10"), "USD")
+
+        payment = gateway.lookup("key-1")
+        assert payment is not None and payment.reference == reference
+        assert gateway.lookup("key-2") is None
+        assert mock_sleep.call_count == 1
+
+
+    def test_store_keeps_the_first_outcome(self) -> None:
+        store = InMemoryPaymentStore()
+        first = ProviderPayment(reference="ref-1", succeeded=True)
+
+        store.add("key-1", first)
+        recorded = store.add("key-1", ProviderPayment(reference="ref-2", succeeded=False))
+
+        assert recorded == first == store.get("key-1")
+
+    def test_unreachable_store_is_an_unknown_outcome(self) -> None:
+        # Answering "never received" here would pay the payout out again.
+        store = RedisPaymentStore("redis://127.0.0.1:1/0")
+
+        with pytest.raises(GatewayTimeout):
+            store.get("key-1")
+
+
+class TestSubmitPayout:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", side_effect=[ACCEPTED_BUT_LOST])
+    def test_lost_response_is_looked_up_not_resubmitted(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        with pytest.raises(GatewayTimeout):
+            submit_payout(payout)
+        assert _attempts(payout) == [(1, AttemptStatusChoices.SUBMITTED)]
+
+        attempt = submit_payout(payout)
+
+        assert attempt.number == 1
+        assert attempt.idempotency_key == f"{payout.id}:1"
+        payment = gateway.lookup(attempt.idempotency_key)
+        assert payment is not None and attempt.provider_reference == payment.reference
+        assert _attempts(payout) == [(1, AttemptStatusChoices.SUCCEEDED)]
+        assert mock_sleep.call_count == 1
+
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", side_effect=[DECLINED, SUCCEEDED])
+    def test_declined_attempt_is_resubmitted_under_new_key(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        with pytest.raises(GatewayDeclined):
+            submit_payout(payout)
+
+        attempt = submit_payout(payout)
+
+        assert attempt.idempotency_key == f"{payout.id}:2"
+        assert _attempts(payout) == [
+            (1, AttemptStatusChoices.FAILED),
+            (2, AttemptStatusChoices.SUCCEEDED),
+        ]
+        assert mock_sleep.call_count == 2
+
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=SUCCEEDED)
+    def test_unreceived_attempt_is_resubmitted(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        # The worker died after the checkpoint, before the request went out.
+        PayoutAttempt.objects.create(payout=payout, number=1, idempotency_key=f"{payout.id}:1")
+
+        attempt = submit_payout(payout)
+
+        assert attempt.number == 2
+        lost = payout.attempts.get(number=1)
+        assert lost.status == AttemptStatusChoices.FAILED
+        assert lost.error == "Not received by the provider"
+
+    def test_succeeded_attempt_is_not_paid_again(self, payout: Payout) -> None:
+        PayoutAttempt.objects.create(
+            payout=payout,
+            number=1,
+            idempotency_key=f"{payout.id}:1",
+            status=AttemptStatusChoices.SUCCEEDED,
+            provider_reference="ref-1",
+        )
+
+        with patch.object(gateway, "submit") as mock_submit:
+            attempt = submit_payout(payout)
+
+        assert attempt.provider_reference == "ref-1"
+        mock_submit.assert_not_called()
+
+
+class TestTaskRetry:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", side_effect=[ACCEPTED_BUT_LOST])
+    def test_retry_completes_without_second_external_call(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        with pytest.raises(Retry):
+            process_payout_task.apply(args=(str(payout.id),))
+        payout.refresh_from_db()
+        assert payout.status == StatusChoices.PENDING
+
+        result = process_payout_task.apply(args=(str(payout.id),)).get()
+
+        payout.refresh_from_db()
+        assert result.startswith("Completed:")
+        assert payout.status == StatusChoices.COMPLETED
+        assert _attempts(payout) == [(1, AttemptStatusChoices.SUCCEEDED)]
+        mock_sleep.assert_called_once_with(5)
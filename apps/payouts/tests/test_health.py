@@ -0,0 +1,134 @@
+"""
+Tests for the pipeline health sampler and endpoint.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.payouts.health import compute_snapshot, get_snapshot_store
+from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.tasks import sample_pipeline_health
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_snapshot():
+    get_snapshot_store().clear()
+    yield
+    get_snapshot_store().clear()
+
+
+def _create(data: Dict[str, Any], status: str, age: timedelta, **fields: Any) -> Payout:
+    payout = Payout.objects.create(**data, **fields)
+    Payout.objects.filter(id=payout.id).update(
+        status=status,
+        created_at=timezone.now() - age,
+        updated_at=timezone.now() - age,
+    )
+    return payout
+
+
+class TestComputeSnapshot:
+    def test_backlog_age_and_throughput(
+            self,
+            settings: Any,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_PIPELINE_HEALTH_WINDOW = 120
+        now = timezone.now()
+        _create(valid_payout_data, StatusChoices.PENDING, timedelta(seconds=30))
+        _create(valid_payout_data, StatusChoices.PENDING, timedelta(seconds=90))
+        _create(valid_payout_data, StatusChoices.PROCESSING, timedelta(seconds=10))
+        for _ in range(3):
+            _create(valid_payout_data, StatusChoices.COMPLETED, timedelta(seconds=60))
+        _create(valid_payout_data, StatusChoices.COMPLETED, timedelta(minutes=10))
+
+        snapshot = compute_snapshot(now)
+
+        assert snapshot["backlog"][StatusChoices.PENDING]["count"] == 2
+        assert snapshot["backlog"][StatusChoices.PENDING]["oldest_age_seconds"] == pytest.approx(
+            90,
+            abs=2,
+        )
+        assert snapshot["backlog"][StatusChoices.PROCESSING]["count"] == 1
+        assert snapshot["completed_per_minute"] == 1.5
+
+    def test_scheduled_payouts_count_once_due(self, valid_payout_data: Dict[str, Any]) -> None:
+        now = timezone.now()
+        _create(
+            valid_payout_data,
+            StatusChoices.PENDING,
+            timedelta(days=2),
+            scheduled_for=now + timedelta(hours=1),
+        )
+        _create(
+            valid_payout_data,
+            StatusChoices.PENDING,
+            timedelta(days=2),
+            scheduled_for=now - timedelta(seconds=20),
+        )
+
+        pending = compute_snapshot(now)["backlog"][StatusChoices.PENDING]
+
+        assert pending["count"] == 1
+        assert pending["oldest_age_seconds"] == pytest.approx(20, abs=2)
+
+    def test_empty_pipeline(self) -> None:
+        snapshot = compute_snapshot()
+
+        assert snapshot["backlog"] == {
+            StatusChoices.PENDING: {"count": 0, "oldest_age_seconds": 0.0},
+            StatusChoices.PROCESSING: {"count": 0, "oldest_age_seconds": 0.0},
+        }
+        assert snapshot["completed_per_minute"] == 0
+
+
+class TestPipelineHealthView:
+    def test_scrape_reads_stored_snapshot_without_queries(
+            self,
+            client,
+            payout: Payout,
+            django_assert_num_queries: Any,
+    ) -> None:
+        sample_pipeline_health.apply()
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse("pipeline-health"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        body = response.content.decode()
+        assert 'payouts_backlog{status="PENDING"} 1\n' in body
+        assert 'payouts_backlog{status="PROCESSING"} 0\n' in body
+        assert "# TYPE payouts_completed_per_minute gauge" in body
+        assert "payouts_health_sample_age_seconds " in body
+
+    def test_samples_inline_when_no_snapshot_is_stored(
+            self,
+            client,
+            payout: Payout,
+    ) -> None:
+        response = client.get(reverse("pipeline-health"), {"format": "json"})
+        stored = client.get(reverse("pipeline-health"), {"format": "json"})
+
+        data = response.json()
+        assert data["backlog"][StatusChoices.PENDING]["count"] == 1
+        assert data["sampled_at"] == stored.json()["sampled_at"]
+
+    def test_snapshot_expires(self, client, settings: Any, payout: Payout) -> None:
+        settings.PAYOUTS_PIPELINE_HEALTH_TTL = 0
+        first = client.get(reverse("pipeline-health"), {"format": "json"}).json()
+        Payout.objects.filter(id=payout.id).update(status=StatusChoices.PROCESSING)
+
+        second = client.get(reverse("pipeline-health"), {"format": "json"}).json()
+
+        assert first["backlog"][StatusChoices.PENDING]["count"] == 1
+        assert second["backlog"][StatusChoices.PENDING]["count"] == 0
+        assert second["backlog"][StatusChoices.PROCESSING]["count"] == 1
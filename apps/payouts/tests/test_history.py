@@ -0,0 +1,110 @@
+"""
+Tests for the payout status history.
+"""
+
+from __future__ import annotations
+
+from typing import Any, cast
+from unittest.mock import patch
+
+import pytest
+from celery.exceptions import Retry
+from django.db import transaction
+from django.urls import reverse
+
+from apps.payouts.history import record_status_change
+from apps.payouts.models import (
+    Payout,
+    PayoutStatusEvent,
+    StatusChoices,
+    StatusEventSource,
+)
+from apps.payouts.services import PayoutService
+from apps.payouts.tasks import PayoutProcessingError, process_payout_task
+
+pytestmark = pytest.mark.django_db
+
+
+def _transitions(payout: Payout) -> list[tuple[str, str, str]]:
+    return list(
+        PayoutStatusEvent.objects.filter(payout_id=payout.id).values_list(
+            "from_status",
+            "to_status",
+            "source",
+        )
+    )
+
+
+class TestRecordStatusChange:
+    def test_event_is_written_in_the_transition_transaction(self, payout: Payout) -> None:
+        with transaction.atomic():
+            record_status_change(payout.id, "PENDING", "PROCESSING", StatusEventSource.TASK)
+            assert _transitions(payout) == [("PENDING", "PROCESSING", StatusEventSource.TASK)]
+
+    def test_rolled_back_transition_is_not_recorded(self, payout: Payout) -> None:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            record_status_change(payout.id, "PENDING", "FAILED", StatusEventSource.SERVICE)
+            raise RuntimeError("rolled back")
+
+        assert not PayoutStatusEvent.objects.exists()
+
+
+class TestStatusHistoryRecording:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", side_effect=[0.05, 0.5])
+    def test_task_records_retry_and_completion(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        with pytest.raises(Retry):
+            process_payout_task.apply(args=(str(payout.id),))
+        process_payout_task.apply(args=(str(payout.id),))
+
+        assert _transitions(payout) == [
+            ("PENDING", "PROCESSING", StatusEventSource.TASK),
+            ("PROCESSING", "PENDING", StatusEventSource.TASK),
+            ("PENDING", "PROCESSING", StatusEventSource.TASK),
+            ("PROCESSING", "COMPLETED", StatusEventSource.TASK),
+        ]
+
+    def test_on_failure_and_service_record_events(
+            self,
+            payout: Payout,
+            processing_payout: Payout,
+    ) -> None:
+        process_payout_task.on_failure(
+            PayoutProcessingError("boom"),
+            "task-id",
+            (str(processing_payout.id),),
+            {},
+            cast(Any, None),
+        )
+        PayoutService.update_status(payout, StatusChoices.COMPLETED)
+
+        assert _transitions(processing_payout) == [
+            ("PROCESSING", "FAILED", StatusEventSource.TASK_FAILURE),
+        ]
+        assert _transitions(payout) == [
+            ("PENDING", "COMPLETED", StatusEventSource.SERVICE),
+        ]
+
+
+class TestStatusHistoryAPI:
+    def test_history_endpoint_lists_events(self, client, payout: Payout) -> None:
+        PayoutStatusEvent.objects.create(
+            payout_id=payout.id,
+            from_status=StatusChoices.PENDING,
+            to_status=StatusChoices.PROCESSING,
+            source=StatusEventSource.TASK,
+            occurred_at=payout.created_at,
+        )
+
+        response = client.get(reverse("payout-history", args=[payout.id]))
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(e["from_status"], e["to_status"]) for e in data] == [
+            ("PENDING", "PROCESSING"),
+        ]
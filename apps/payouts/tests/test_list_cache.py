@@ -0,0 +1,149 @@
+"""
+Tests for the payouts list response cache.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+
+from apps.payouts.list_cache import (
+    InMemoryListCache,
+    generation_keys,
+    get_list_cache,
+    invalidate,
+)
+from apps.payouts.models import CurrencyChoices, Payout, StatusChoices
+from apps.payouts.services import PayoutService
+from apps.payouts.tasks import process_payout_task
+
+pytestmark = pytest.mark.django_db
+
+EUR_PENDING = {"status": "PENDING", "currency": "eur"}
+
+
+def _ids(response: Any) -> list[str]:
+    return [item["id"] for item in response.json()["results"]]
+
+
+class TestInMemoryListCache:
+    def test_evicts_least_recently_used_and_expired(self) -> None:
+        cache = InMemoryListCache(maxsize=2)
+        cache.set("a", "1", ttl=60)
+        cache.set("b", "2", ttl=60)
+        cache.get("a")
+        cache.set("c", "3", ttl=60)
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        cache.set("d", "4", ttl=0)
+        assert cache.get("d") is None
+
+    def test_bump_waits_for_commit(self, django_capture_on_commit_callbacks: Any) -> None:
+        keys = generation_keys([StatusChoices.PENDING], [CurrencyChoices.EUR])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                invalidate([StatusChoices.PENDING], [CurrencyChoices.EUR])
+                assert get_list_cache().generations(keys) == [0]
+
+        assert get_list_cache().generations(keys) == [1]
+
+
+class TestListResponseCache:
+    def test_repeated_query_is_served_from_cache(
+            self,
+            client,
+            payout: Payout,
+            django_assert_num_queries: Any,
+    ) -> None:
+        first = client.get(reverse("payout-list"), {"status": "PENDING"})
+
+        with django_assert_num_queries(0):
+            second = client.get(reverse("payout-list"), {"status": "PENDING"})
+
+        assert second.json() == first.json()
+        assert _ids(second) == [str(payout.id)]
+
+    def test_page_parameters_are_part_of_the_key(
+            self,
+            client,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        for _ in range(11):
+            Payout.objects.create(**valid_payout_data)
+
+        first = client.get(reverse("payout-list"))
+        second = client.get(reverse("payout-list"), {"page": 2})
+
+        assert len(_ids(first)) == 10
+        assert len(_ids(second)) == 1
+
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_service_write_invalidates_only_its_bucket(
+            self,
+            mock_delay: Any,
+            client,
+            valid_payout_data: Dict[str, Any],
+            django_capture_on_commit_callbacks: Any,
+            django_assert_num_queries: Any,
+    ) -> None:
+        client.get(reverse("payout-list"), EUR_PENDING)
+        client.get(reverse("payout-list"), {"currency": "USD"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            payout = PayoutService.create_payout(
+                {**valid_payout_data, "currency": CurrencyChoices.EUR},
+            )
+
+        assert _ids(client.get(reverse("payout-list"), EUR_PENDING)) == [str(payout.id)]
+        with django_assert_num_queries(0):
+            assert _ids(client.get(reverse("payout-list"), {"currency": "USD"})) == []
+
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=0.5)
+    def test_task_completion_invalidates_status_pages(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            client,
+            payout: Payout,
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        assert _ids(client.get(reverse("payout-list"), {"status": "COMPLETED"})) == []
+        assert _ids(client.get(reverse("payout-list"), {"status": "PENDING"})) == [
+            str(payout.id),
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            process_payout_task.apply(args=(str(payout.id),))
+
+        assert _ids(client.get(reverse("payout-list"), {"status": "COMPLETED"})) == [
+            str(payout.id),
+        ]
+        assert _ids(client.get(reverse("payout-list"), {"status": "PENDING"})) == []
+
+    def test_api_update_invalidates_old_and_new_currency(
+            self,
+            client,
+            payout: Payout,
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        client.get(reverse("payout-list"), {"currency": "USD"})
+        client.get(reverse("payout-list"), {"currency": "GBP"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.patch(
+                reverse("payout-detail", args=[payout.id]),
+                data={"currency": CurrencyChoices.GBP},
+                content_type="application/json",
+            )
+
+        assert _ids(client.get(reverse("payout-list"), {"currency": "USD"})) == []
+        assert _ids(client.get(reverse("payout-list"), {"currency": "GBP"})) == [
+            str(payout.id),
+        ]
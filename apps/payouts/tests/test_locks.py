@@ -0,0 +1,79 @@
+"""
+Tests for payout dispatch deduplication locks.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from apps.payouts.locks import (
+    InMemoryDispatchLock,
+    enqueue_lock_key,
+    get_dispatch_lock,
+    run_lock_key,
+)
+from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.tasks import enqueue_payout, process_payout_task
+
+
+class TestInMemoryDispatchLock:
+    def test_acquire_is_exclusive_until_released(self) -> None:
+        lock = InMemoryDispatchLock()
+
+        token = lock.acquire("key", ttl=60)
+
+        assert token is not None
+        assert lock.acquire("key", ttl=60) is None
+        lock.release("key", token)
+        assert lock.acquire("key", ttl=60) is not None
+
+    def test_release_with_foreign_token_is_ignored(self) -> None:
+        lock = InMemoryDispatchLock()
+        lock.acquire("key", ttl=60)
+
+        lock.release("key", "not-the-owner")
+
+        assert lock.acquire("key", ttl=60) is None
+
+    def test_expired_lock_can_be_reacquired(self) -> None:
+        lock = InMemoryDispatchLock()
+        lock.acquire("key", ttl=0)
+
+        assert lock.acquire("key", ttl=60) is not None
+
+
+@pytest.mark.django_db
+class TestDispatchDeduplication:
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_enqueue_drops_duplicates_until_consumed(
+            self,
+            mock_delay: Any,
+            payout: Payout,
+    ) -> None:
+        payout_id = str(payout.id)
+
+        assert enqueue_payout(payout_id) is True
+        assert enqueue_payout(payout_id) is False
+
+        mock_delay.assert_called_once_with(payout_id)
+        get_dispatch_lock().release(enqueue_lock_key(payout_id))
+
+    @patch("apps.payouts.gateway.time.sleep")
+    def test_task_drops_duplicate_while_in_flight(
+            self,
+            mock_sleep: Any,
+            payout: Payout,
+    ) -> None:
+        lock = get_dispatch_lock()
+        token = lock.acquire(run_lock_key(str(payout.id)), ttl=60)
+
+        result = process_payout_task.apply(args=(str(payout.id),)).get()
+
+        lock.release(run_lock_key(str(payout.id)), token)
+        payout.refresh_from_db()
+        assert result == "Skipped: duplicate of in-flight task"
+        assert payout.status == StatusChoices.PENDING
+        mock_sleep.assert_not_called()
@@ -0,0 +1,150 @@
+"""
+Tests for the queued JSON logging pipeline and per-event sampling.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import sys
+import threading
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from apps.payouts.models import Payout
+from apps.payouts.tasks import process_payout_task
+from config.logs import JsonFormatter, QueuedStreamHandler, SamplingFilter
+
+pytestmark = pytest.mark.django_db
+
+
+def _record(level: int = logging.INFO, **extra: Any) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {
+            "name": "apps.payouts.tasks",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": "Payout %s",
+            "args": ("p-1",),
+            **extra,
+        }
+    )
+
+
+class _ThreadRecordingFormatter(JsonFormatter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: set[int] = set()
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.threads.add(threading.get_ident())
+        return super().format(record)
+
+
+class TestJsonFormatter:
+    def test_renders_extra_fields_and_exception(self) -> None:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = _record(
+                logging.ERROR,
+                event="payout.failed",
+                payout_id="p-1",
+                exc_info=sys.exc_info(),
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert (entry["level"], entry["logger"]) == ("ERROR", "apps.payouts.tasks")
+        assert entry["message"] == "Payout p-1"
+        assert (entry["event"], entry["payout_id"]) == ("payout.failed", "p-1")
+        assert "ValueError: boom" in entry["exception"]
+
+
+class TestSamplingFilter:
+    def test_samples_info_lines_but_keeps_warnings(self) -> None:
+        sampling = SamplingFilter(rates={"payout.completed": 0.01})
+
+        with patch.object(sampling._random, "random", return_value=0.5):
+            dropped = sampling.filter(_record(event="payout.completed"))
+            warning = sampling.filter(_record(logging.WARNING, event="payout.completed"))
+            untagged = sampling.filter(_record())
+        with patch.object(sampling._random, "random", return_value=0.001):
+            kept = _record(event="payout.completed")
+            assert sampling.filter(kept)
+
+        assert (dropped, warning, untagged) == (False, True, True)
+        assert getattr(kept, "sample_rate", None) == 0.01
+
+    @patch("config.logs.time.monotonic")
+    def test_rate_limits_each_event_per_second(self, mock_monotonic: Any) -> None:
+        sampling = SamplingFilter(limits={"payout.duplicate": 2})
+
+        mock_monotonic.return_value = 100.2
+        first_second = [sampling.filter(_record(event="payout.duplicate")) for _ in range(3)]
+        other_event = sampling.filter(_record(event="payout.deferred"))
+        mock_monotonic.return_value = 101.1
+        next_second = sampling.filter(_record(event="payout.duplicate"))
+
+        assert first_second == [True, True, False]
+        assert (other_event, next_second) == (True, True)
+
+
+class TestQueuedStreamHandler:
+    def test_formats_and_writes_on_listener_thread(self) -> None:
+        stream = io.StringIO()
+        formatter = _ThreadRecordingFormatter()
+        handler = QueuedStreamHandler(stream)
+        handler.setFormatter(formatter)
+        logger = logging.getLogger("apps.payouts.tests.queued")
+        logger.addHandler(handler)
+        items = [1]
+
+        try:
+            logger.warning("Items %s", items, extra={"event": "test"})
+            items.append(2)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        entry = json.loads(stream.getvalue())
+        assert (entry["message"], entry["event"]) == ("Items [1]", "test")
+        assert formatter.threads and threading.get_ident() not in formatter.threads
+
+    def test_full_queue_drops_records(self) -> None:
+        stream = io.StringIO()
+        handler = QueuedStreamHandler(stream, queue_size=1)
+        handler.close()
+
+        handler.handle(_record())
+        handler.handle(_record())
+
+        assert handler.dropped == 1
+        assert stream.getvalue() == ""
+
+
+class TestTaskLogEvents:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=0.5)
+    def test_hot_path_lines_are_tagged(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            payout: Payout,
+            caplog: Any,
+    ) -> None:
+        with caplog.at_level(logging.INFO, logger="apps.payouts.tasks"):
+            process_payout_task.apply(args=(str(payout.id),))
+
+        tagged = [
+            (record.event, record.payout_id)
+            for record in caplog.records
+            if hasattr(record, "event")
+        ]
+        assert tagged == [
+            ("payout.started", str(payout.id)),
+            ("payout.completed", str(payout.id)),
+        ]
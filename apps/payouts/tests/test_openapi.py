@@ -0,0 +1,80 @@
+"""
+Tests for the cached OpenAPI schema endpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+
+from config.openapi import get_document, load_schema
+
+
+@pytest.fixture(autouse=True)
+def _fresh_schema_cache():
+    load_schema.cache_clear()
+    get_document.cache_clear()
+    yield
+    load_schema.cache_clear()
+    get_document.cache_clear()
+
+
+class TestSchemaView:
+    def test_schema_includes_lazy_annotations(self, client) -> None:
+        response = client.get(reverse("schema"), {"format": "json"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("application/vnd.oai.openapi+json")
+        operation = response.json()["paths"]["/api/payouts/bulk-status/"]["post"]
+        assert operation["summary"] == "Bulk status change"
+        assert operation["tags"] == ["Payouts"]
+
+    def test_schema_is_generated_once_and_revalidated_with_etag(self, client) -> None:
+        with patch(
+            "config.openapi_generator.SchemaGenerator.get_schema",
+            return_value={"openapi": "3.0.3", "paths": {}},
+        ) as mock_get_schema:
+            first = client.get(reverse("schema"))
+            second = client.get(reverse("schema"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert first.status_code == 200
+        assert first["Content-Type"].startswith("application/vnd.oai.openapi;")
+        assert second.status_code == 304
+        assert mock_get_schema.call_count == 1
+
+    def test_serves_build_time_file(self, client, settings: Any, tmp_path: Path) -> None:
+        schema_file = tmp_path / "openapi-schema.json"
+        schema_file.write_text(json.dumps({"openapi": "3.0.3", "info": {"title": "Built"}}))
+        settings.OPENAPI_SCHEMA_FILE = str(schema_file)
+
+        with patch("config.openapi_generator.SchemaGenerator.get_schema") as mock_get_schema:
+            response = client.get(reverse("schema"), HTTP_ACCEPT="application/json")
+
+        assert response.json()["info"]["title"] == "Built"
+        mock_get_schema.assert_not_called()
+
+
+class TestStartup:
+    def test_urlconf_does_not_import_drf_spectacular_openapi(self) -> None:
+        # A fresh interpreter: this test process has generated schemas already.
+        code = (
+            "import sys, django; django.setup(); import config.urls; "
+            "print('drf_spectacular.openapi' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings.test"},
+        )
+
+        assert result.stdout.strip() == "False"
@@ -0,0 +1,115 @@
+"""
+Tests for estimated and cached counts on the payouts list endpoint.
+"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.pagination import invalidate_counts
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestPayoutPagination:
+    def test_small_table_uses_exact_count(self, client, payout: Payout) -> None:
+        response = client.get(reverse("payout-list"))
+
+        data = response.json()
+        assert data["count"] == 1
+        assert data["count_estimated"] is False
+
+    @patch("apps.payouts.pagination.estimate_table_rows", return_value=5_000_000)
+    def test_unfiltered_large_table_uses_planner_estimate(
+            self,
+            mock_estimate,
+            client,
+            payout: Payout,
+    ) -> None:
+        response = client.get(reverse("payout-list"))
+
+        data = response.json()
+        assert data["count"] == 5_000_000
+        assert data["count_estimated"] is True
+        assert len(data["results"]) == 1
+
+    @patch("apps.payouts.pagination.estimate_table_rows", return_value=5_000_000)
+    def test_planner_estimate_is_cached(
+            self,
+            mock_estimate,
+            client,
+            payout: Payout,
+    ) -> None:
+        client.get(reverse("payout-list"))
+        client.get(reverse("payout-list"), {"status": StatusChoices.PENDING})
+
+        mock_estimate.assert_called_once()
+
+    @patch("apps.payouts.pagination.estimate_table_rows", return_value=5_000_000)
+    def test_invalidate_counts_drops_cached_estimate_and_counts(
+            self,
+            mock_estimate,
+            client,
+            payout: Payout,
+    ) -> None:
+        url = reverse("payout-list")
+        params = {"status": StatusChoices.PENDING}
+        client.get(url, params)
+        Payout.objects.create(
+            **{field: getattr(payout, field) for field in ("amount", "currency", "recipient_details")},
+        )
+
+        invalidate_counts()
+        data = client.get(url, {**params, "page": 1}).json()
+
+        assert mock_estimate.call_count == 2
+        assert (data["count"], data["count_estimated"]) == (2, False)
+
+    @patch("apps.payouts.pagination.estimate_table_rows", return_value=5_000_000)
+    def test_filtered_large_table_caches_count(
+            self,
+            mock_estimate,
+            client,
+            payout: Payout,
+            completed_payout: Payout,
+    ) -> None:
+        url = reverse("payout-list")
+        params = {"status": StatusChoices.PENDING}
+
+        first = client.get(url, params).json()
+        Payout.objects.filter(id=completed_payout.id).update(
+            status=StatusChoices.PENDING,
+        )
+        second = client.get(url, {**params, "page": 1}).json()
+
+        assert (first["count"], first["count_estimated"]) == (1, False)
+        assert (second["count"], second["count_estimated"]) == (1, True)
+
+    @patch("apps.payouts.pagination.estimate_table_rows", return_value=5_000_000)
+    def test_distinct_filters_use_distinct_cache_entries(
+            self,
+            mock_estimate,
+            client,
+            payout: Payout,
+            completed_payout: Payout,
+    ) -> None:
+        url = reverse("payout-list")
+
+        pending = client.get(url, {"status": StatusChoices.PENDING}).json()
+        completed = client.get(url, {"status": StatusChoices.COMPLETED}).json()
+
+        assert pending["count"] == 1
+        assert completed["count"] == 1
+        assert completed["count_estimated"] is False
@@ -0,0 +1,131 @@
+"""
+Tests for opt-in request and task profiling.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from celery.signals import task_prerun
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+
+from apps.payouts.models import ExecutionProfile, Payout, ProfileKind, SlowQuery
+from apps.payouts.profiling import (
+    PROFILE_HEADER,
+    ProfilingMiddleware,
+    install_profiling,
+    uninstall_profiling,
+)
+from apps.payouts.slow_queries import recorder
+from apps.payouts.tasks import process_payout_task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profiling(settings: Any):
+    settings.PAYOUTS_PROFILING_ENABLED = True
+    settings.PAYOUTS_PROFILING_TOKEN = "let-me-profile"
+    settings.PAYOUTS_PROFILING_SAMPLE_RATE = 0.0
+    install_profiling()
+    yield settings
+    uninstall_profiling()
+
+
+class TestRequestProfiling:
+    def test_token_header_stores_profile_with_queries(
+            self,
+            client,
+            profiling: Any,
+            payout: Payout,
+    ) -> None:
+        response = client.get(
+            reverse("payout-list"),
+            {"status": "PENDING"},
+            headers={PROFILE_HEADER: "let-me-profile"},
+        )
+
+        assert response.status_code == 200
+        profile = ExecutionProfile.objects.get()
+        assert profile.kind == ProfileKind.REQUEST
+        assert profile.name == "PayoutViewSet.list"
+        assert profile.path == "/api/payouts/?status=PENDING"
+        assert profile.status_code == 200
+        assert profile.sql_count == len(profile.queries) > 0
+        assert any("payouts_payout" in query["sql"] for query in profile.queries)
+        assert "cumulative" in profile.stats
+
+    def test_requests_without_token_are_not_profiled(self, client, profiling: Any) -> None:
+        client.get(reverse("payout-list"), headers={PROFILE_HEADER: "wrong"})
+
+        assert not ExecutionProfile.objects.exists()
+
+    def test_nothing_installed_when_disabled(self, settings: Any) -> None:
+        settings.PAYOUTS_PROFILING_ENABLED = False
+
+        install_profiling()
+
+        assert "payouts-profiling-start" not in {key for (key, _), _ in task_prerun.receivers}
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    # The slow-query recorder thread writes on its own connection.
+    @pytest.mark.django_db(transaction=True)
+    def test_profiles_alongside_slow_query_log(
+            self,
+            client,
+            profiling: Any,
+            payout: Payout,
+    ) -> None:
+        profiling.PAYOUTS_SLOW_QUERY_LOG_ENABLED = True
+        profiling.PAYOUTS_SLOW_QUERY_MS = 0.0
+
+        client.get(reverse("payout-list"), headers={PROFILE_HEADER: "let-me-profile"})
+        recorder.join()
+
+        assert ExecutionProfile.objects.get().name == "PayoutViewSet.list"
+        assert SlowQuery.objects.filter(source="PayoutViewSet.list").exists()
+
+
+class TestTaskProfiling:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=0.5)
+    def test_sampled_task_run_is_stored(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            profiling: Any,
+            payout: Payout,
+    ) -> None:
+        with patch("apps.payouts.profiling._sampled", return_value=True):
+            process_payout_task.apply(args=(str(payout.id),))
+
+        profile = ExecutionProfile.objects.get()
+        assert profile.kind == ProfileKind.TASK
+        assert profile.name == f"{process_payout_task.name} [SUCCESS]"
+        assert profile.sql_count > 0
+
+
+class TestProfileAdmin:
+    def test_admin_lists_and_shows_profiles(self, admin_client) -> None:
+        profile = ExecutionProfile.objects.create(
+            kind=ProfileKind.REQUEST,
+            name="PayoutViewSet.list",
+            duration_ms=1234.5,
+            sql_count=1,
+            sql_ms=1000.0,
+            queries=[{"alias": "default", "sql": "SELECT 1", "many": False, "ms": 1000.0}],
+            stats="ncalls  tottime  percall  cumtime",
+        )
+
+        changelist = admin_client.get(reverse("admin:payouts_executionprofile_changelist"))
+        detail = admin_client.get(
+            reverse("admin:payouts_executionprofile_change", args=[profile.pk])
+        )
+
+        assert changelist.status_code == 200
+        assert detail.status_code == 200
+        assert b"SELECT 1" in detail.content
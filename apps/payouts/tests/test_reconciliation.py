@@ -0,0 +1,157 @@
+"""
+Tests for provider statement reconciliation.
+"""
+
+from __future__ import annotations
+
+import csv
+import uuid
+from decimal import Decimal
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from django.core.management import call_command
+
+from apps.payouts.models import CurrencyChoices, Payout, StatusChoices
+from apps.payouts.reconciliation import (
+    MAX_ID,
+    MIN_ID,
+    MismatchKind,
+    ReconciliationError,
+    iter_statement,
+    reconcile,
+    split_id_range,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def _payout(data: Dict[str, Any], status: str = StatusChoices.COMPLETED, **extra: Any) -> Payout:
+    return Payout.objects.create(**{**data, **extra, "status": status})
+
+
+def _write_statement(path: Path, lines: Sequence[tuple[Any, str, str]]) -> Path:
+    rows = sorted(lines, key=lambda line: uuid.UUID(str(line[0])))
+    path.write_text(
+        "payout_id,amount,currency\n"
+        + "".join(f"{pid},{amount},{currency}\n" for pid, amount, currency in rows)
+    )
+    return path
+
+
+def _report_kinds(path: Path) -> dict[str, str]:
+    with path.open() as handle:
+        return {row["payout_id"]: row["kind"] for row in csv.DictReader(handle)}
+
+
+class TestReconcile:
+    def test_classifies_mismatches(self, tmp_path: Path, valid_payout_data: Dict[str, Any]) -> None:
+        matched = _payout(valid_payout_data)
+        wrong_amount = _payout(valid_payout_data)
+        wrong_currency = _payout(valid_payout_data)
+        not_completed = _payout(valid_payout_data, status=StatusChoices.PENDING)
+        unreported = _payout(valid_payout_data)
+        unknown_id = uuid.uuid4()
+        statement = _write_statement(
+            tmp_path / "statement.csv",
+            [
+                (matched.id, "100.00", "USD"),
+                (wrong_amount.id, "99.99", "USD"),
+                (wrong_currency.id, "100.00", "EUR"),
+                (not_completed.id, "100.00", "USD"),
+                (unknown_id, "5.00", "USD"),
+            ],
+        )
+        report = tmp_path / "report.csv"
+
+        result = reconcile(statement, report, chunk_lines=2, payout_chunk=2)
+
+        assert result.matched == 1
+        assert result.statement_lines == 5
+        assert _report_kinds(report) == {
+            str(wrong_amount.id): MismatchKind.AMOUNT,
+            str(wrong_currency.id): MismatchKind.CURRENCY,
+            str(not_completed.id): MismatchKind.STATUS,
+            str(unknown_id): MismatchKind.MISSING_PAYOUT,
+            str(unreported.id): MismatchKind.MISSING_STATEMENT,
+        }
+
+    def test_shards_cover_every_line_exactly_once(self, tmp_path: Path) -> None:
+        lines = [(uuid.uuid4(), "1.00", CurrencyChoices.USD) for _ in range(200)]
+        statement = _write_statement(tmp_path / "statement.csv", lines)
+
+        seen = [
+            line[0]
+            for start, end in split_id_range(7)
+            for line in iter_statement(statement, start, end, chunk_lines=16)
+        ]
+
+        assert sorted(seen) == sorted(line[0] for line in lines)
+        assert all(
+            amount == Decimal("1.00")
+            for _, amount, _ in iter_statement(statement)
+        )
+
+    def test_last_shard_includes_max_id(
+            self,
+            tmp_path: Path,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        _payout(valid_payout_data, id=MAX_ID)
+        statement = _write_statement(tmp_path / "statement.csv", [(MAX_ID, "100.00", "USD")])
+        start, end = split_id_range(4)[-1]
+
+        result = reconcile(statement, tmp_path / "report.csv", start, end)
+
+        assert end == MAX_ID
+        assert (result.statement_lines, result.payouts_scanned, result.matched) == (1, 1, 1)
+
+    def test_unsorted_statement_is_rejected(self, tmp_path: Path) -> None:
+        ids = sorted(uuid.uuid4() for _ in range(2))
+        statement = tmp_path / "statement.csv"
+        statement.write_text(f"{ids[1]},1.00,USD\n{ids[0]},1.00,USD\n")
+
+        with pytest.raises(ReconciliationError):
+            reconcile(statement, tmp_path / "report.csv")
+
+
+    @pytest.mark.parametrize("line", ["{id},1.00", "{id},abc,USD", "not-a-uuid,1.00,USD"])
+    def test_malformed_line_is_rejected(self, tmp_path: Path, line: str) -> None:
+        statement = tmp_path / "statement.csv"
+        statement.write_text(f"{MIN_ID},1.00,USD\n" + line.format(id=MAX_ID) + "\n")
+
+        with pytest.raises(ReconciliationError, match="Malformed line"):
+            list(iter_statement(statement))
+
+    def test_blocks_parse_quoted_and_padded_columns(self, tmp_path: Path) -> None:
+        ids = sorted(uuid.uuid4() for _ in range(3))
+        statement = tmp_path / "statement.csv"
+        statement.write_text(
+            f"{ids[0]},\"1.50\",usd\r\n\n {ids[1]} , 2.00 ,EUR\n{ids[2]},3,GBP"
+        )
+
+        assert list(iter_statement(statement, chunk_lines=1)) == [
+            (ids[0], Decimal("1.50"), "USD"),
+            (ids[1], Decimal("2.00"), "EUR"),
+            (ids[2], Decimal("3"), "GBP"),
+        ]
+
+class TestReconcileCommand:
+    def test_command_writes_one_report_per_shard(
+            self,
+            tmp_path: Path,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        payout = _payout(valid_payout_data)
+        statement = _write_statement(
+            tmp_path / "statement.csv",
+            [(payout.id, "100.00", "USD")],
+        )
+
+        call_command("reconcile_statement", str(statement), "--shards", "2")
+
+        reports = sorted(tmp_path.glob("statement.mismatches.*.csv"))
+        assert len(reports) == 2
+        assert all(_report_kinds(path) == {} for path in reports)
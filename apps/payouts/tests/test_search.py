@@ -0,0 +1,78 @@
+"""
+Tests for fragment search on the payouts list endpoint.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import pytest
+from django.urls import reverse
+
+from apps.payouts.models import Payout
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def payouts(valid_payout_data: Dict[str, Any]) -> dict[str, Payout]:
+    def create(description: str, bank_name: str) -> Payout:
+        return Payout.objects.create(
+            **{
+                **valid_payout_data,
+                "description": description,
+                "recipient_details": {"account_number": "1", "bank_name": bank_name},
+            }
+        )
+
+    return {
+        "invoice": create("Invoice 2025-0042 for consulting", "Barclays"),
+        "refund": create("Refund of duplicate charge", "Deutsche Bank"),
+        "salary": create("March salary", "HSBC"),
+    }
+
+
+class TestPayoutSearch:
+    def test_matches_description_fragment_case_insensitively(
+            self,
+            client,
+            payouts: dict[str, Payout],
+    ) -> None:
+        response = client.get(reverse("payout-list"), {"search": "2025-004"})
+
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.json()["results"]]
+        assert ids == [str(payouts["invoice"].id)]
+
+    def test_matches_bank_name_fragment(self, client, payouts: dict[str, Payout]) -> None:
+        response = client.get(reverse("payout-list"), {"search": "deutsche"})
+
+        ids = [item["id"] for item in response.json()["results"]]
+        assert ids == [str(payouts["refund"].id)]
+
+    def test_combines_with_other_filters(self, client, payouts: dict[str, Payout]) -> None:
+        response = client.get(
+            reverse("payout-list"),
+            {"search": "bank", "status": "COMPLETED"},
+        )
+
+        assert response.json()["results"] == []
+
+    def test_rejects_terms_too_short_for_the_index(self, client) -> None:
+        response = client.get(reverse("payout-list"), {"search": "ab"})
+
+        assert response.status_code == 400
+        assert "search" in response.json()
+
+    def test_admin_search_uses_fragment_search(
+            self,
+            admin_client,
+            payouts: dict[str, Payout],
+    ) -> None:
+        response = admin_client.get(
+            reverse("admin:payouts_payout_changelist"),
+            {"q": "salary"},
+        )
+
+        assert response.status_code == 200
+        assert list(response.context["cl"].queryset) == [payouts["salary"]]
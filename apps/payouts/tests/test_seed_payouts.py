@@ -0,0 +1,62 @@
+"""
+Tests for the seed_payouts management command.
+"""
+
+from __future__ import annotations
+
+from io import StringIO
+from typing import Any
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.payouts.models import Payout
+
+pytestmark = pytest.mark.django_db
+
+
+def _seed(seed: int) -> list[tuple]:
+    call_command(
+        "seed_payouts",
+        "--rows",
+        "250",
+        "--chunk-size",
+        "100",
+        "--seed",
+        str(seed),
+        stdout=StringIO(),
+    )
+    rows = list(
+        Payout.objects.order_by("id").values_list(
+            "id", "amount", "currency", "status", "created_at"
+        )
+    )
+    Payout.objects.all().delete()
+    return rows
+
+
+class TestSeedPayoutsCommand:
+    def test_loads_requested_rows_with_status_mix(self) -> None:
+        call_command("seed_payouts", "--rows", "500", "--chunk-size", "128", stdout=StringIO())
+
+        assert Payout.objects.count() == 500
+        assert Payout.objects.values("status").distinct().count() > 1
+        assert Payout.objects.values("currency").distinct().count() > 1
+
+    def test_output_is_deterministic_for_a_seed(self) -> None:
+        assert _seed(7) == _seed(7)
+        assert _seed(7) != _seed(8)
+
+    def test_cached_list_pages_are_invalidated(
+            self,
+            client,
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        before = client.get(reverse("payout-list")).json()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("seed_payouts", "--rows", "5", "--chunk-size", "5", stdout=StringIO())
+
+        assert before["count"] == 0
+        assert client.get(reverse("payout-list")).json()["count"] == 5
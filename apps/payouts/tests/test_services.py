@@ -4,19 +4,29 @@ Tests for the payout service layer.
 
 from __future__ import annotations
 
+import uuid
+from datetime import timedelta
 from typing import Any, Dict
 from unittest.mock import patch
 
 import pytest
+from django.utils import timezone
 
-from apps.payouts.models import Payout, StatusChoices
+from apps.payouts.models import (
+    Payout,
+    PayoutStatusEvent,
+    StatusChoices,
+    StatusEventSource,
+    WebhookDelivery,
+    WebhookSubscription,
+)
 from apps.payouts.services import PayoutService
 
 
 @pytest.mark.django_db
 class TestPayoutServiceCreatePayout:
     @patch("apps.payouts.services.transaction.on_commit")
-    @patch("apps.payouts.services.process_payout_task.delay")
+    @patch("apps.payouts.tasks.process_payout_task.delay")
     def test_create_payout_dispatches_task(
             self,
             mock_delay,
@@ -44,3 +54,109 @@ class TestPayoutServiceUpdateStatus:
         assert updated.status == StatusChoices.COMPLETED
         payout.refresh_from_db()
         assert payout.status == StatusChoices.COMPLETED
+
+
+@pytest.mark.django_db
+class TestPayoutServiceBulkUpdateStatus:
+    def test_filter_updates_in_chunks(
+            self,
+            settings,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_BULK_UPDATE_CHUNK_SIZE = 2
+        for _ in range(5):
+            Payout.objects.create(**valid_payout_data)
+
+        affected, skipped = PayoutService.bulk_update_status(
+            StatusChoices.CANCELLED,
+            queryset=Payout.objects.all(),
+        )
+
+        assert (affected, skipped) == (5, 0)
+        assert not Payout.objects.filter(status=StatusChoices.PENDING).exists()
+
+    def test_ids_count_missing_as_skipped(self, payout: Payout) -> None:
+        affected, skipped = PayoutService.bulk_update_status(
+            StatusChoices.FAILED,
+            ids=[payout.id, payout.id, uuid.uuid4()],
+        )
+
+        assert (affected, skipped) == (1, 1)
+
+    def test_records_history_and_queues_webhooks(
+            self,
+            payout: Payout,
+            completed_payout: Payout,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        other_tenant = Payout.objects.create(**valid_payout_data, tenant="acme")
+        WebhookSubscription.objects.create(
+            url="http://example.com/hook",
+            secret="s3cret",
+            statuses=[StatusChoices.CANCELLED],
+        )
+
+        affected, _ = PayoutService.bulk_update_status(
+            StatusChoices.CANCELLED,
+            queryset=Payout.objects.all(),
+        )
+
+        assert affected == 2
+        assert sorted(
+            PayoutStatusEvent.objects.values_list("payout_id", "from_status", "to_status", "source")
+        ) == sorted(
+            (moved.id, StatusChoices.PENDING, StatusChoices.CANCELLED, StatusEventSource.SERVICE)
+            for moved in (payout, other_tenant)
+        )
+        delivery = WebhookDelivery.objects.get()
+        assert (delivery.payout_id, delivery.payload["type"]) == (payout.id, "payout.cancelled")
+        assert delivery.payload["data"]["status"] == StatusChoices.CANCELLED
+
+    def test_only_moved_rows_are_recorded(
+            self,
+            payout: Payout,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        now = timezone.now()
+        # Another writer moved this one to the same status at the same instant.
+        cancelled = Payout.objects.create(**valid_payout_data)
+        Payout.objects.filter(id=cancelled.id).update(
+            status=StatusChoices.CANCELLED,
+            updated_at=now,
+        )
+
+        with patch("apps.payouts.services.timezone.now", return_value=now):
+            PayoutService.bulk_update_status(StatusChoices.CANCELLED, ids=[payout.id])
+
+        assert list(PayoutStatusEvent.objects.values_list("payout_id", flat=True)) == [payout.id]
+
+    @patch("apps.payouts.services.invalidate")
+    def test_each_chunk_invalidates_the_list_cache(
+            self,
+            mock_invalidate: Any,
+            settings,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_BULK_UPDATE_CHUNK_SIZE = 2
+        ids = [Payout.objects.create(**valid_payout_data).id for _ in range(3)]
+
+        PayoutService.bulk_update_status(StatusChoices.CANCELLED, ids=ids)
+
+        assert mock_invalidate.call_count == 2
+        mock_invalidate.assert_called_with([StatusChoices.PENDING, StatusChoices.CANCELLED])
+
+
+@pytest.mark.django_db
+class TestPayoutServiceScheduling:
+    @patch("apps.payouts.services.transaction.on_commit")
+    def test_future_payout_is_not_enqueued(
+            self,
+            mock_on_commit,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        data = {**valid_payout_data, "scheduled_for": timezone.now() + timedelta(days=7)}
+
+        payout = PayoutService.create_payout(data)
+
+        assert payout.status == StatusChoices.PENDING
+        mock_on_commit.assert_not_called()
@@ -0,0 +1,238 @@
+"""
+Tests for the slow-query log.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from io import StringIO
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from apps.payouts.locks import get_dispatch_lock, slow_query_explain_key
+from apps.payouts.models import Payout, SlowQuery
+from apps.payouts.slow_queries import (
+    SlowQueryMiddleware,
+    fingerprint,
+    install_slow_query_log,
+    normalize_sql,
+    params_shape,
+    recorder,
+    uninstall_slow_query_log,
+)
+from apps.payouts.tasks import dispatch_scheduled_payouts
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def log_everything(settings: Any):
+    settings.PAYOUTS_SLOW_QUERY_LOG_ENABLED = True
+    settings.PAYOUTS_SLOW_QUERY_MS = 0.0
+    settings.PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL = 0
+    # Repeated list requests must reach the database.
+    settings.PAYOUTS_LIST_CACHE_ENABLED = False
+    install_slow_query_log()
+    yield settings
+    uninstall_slow_query_log()
+
+
+def _payout_list_queries() -> list[SlowQuery]:
+    recorder.join()
+    return [
+        query
+        for query in SlowQuery.objects.filter(source="PayoutViewSet.list")
+        if query.sql.startswith('SELECT "payouts_payout"')
+    ]
+
+
+class TestNormalization:
+    def test_literals_and_value_lists_share_a_fingerprint(self) -> None:
+        first = normalize_sql(
+            "SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s) AND c = %s LIMIT 10"
+        )
+        second = normalize_sql(
+            "SELECT *\n  FROM t WHERE a = 'z' AND b IN (%s, %s, %s) AND c = %s LIMIT 20"
+        )
+
+        assert first == "SELECT * FROM t WHERE a = ? AND b IN (?+) AND c = ? LIMIT ?"
+        assert fingerprint(first) == fingerprint(second)
+
+    def test_identifiers_with_digits_are_kept(self) -> None:
+        assert normalize_sql('SELECT U0."id" FROM "t2" U0') == 'SELECT U0."id" FROM "t2" U0'
+
+    def test_params_shape_records_types_only(self) -> None:
+        assert params_shape(("EUR", 10, None)) == "(str, int, NoneType)"
+        assert params_shape([(1, "a"), (2, "b")], many=True) == "2 x (int, str)"
+        assert params_shape({"currency": "EUR"}) == "{currency: str}"
+
+
+# The recorder thread writes on its own connection, so the rows must be committed.
+@pytest.mark.django_db(transaction=True)
+class TestSlowQueryCapture:
+    def test_slow_request_queries_are_aggregated_with_plan(
+            self,
+            client,
+            log_everything: Any,
+            payout: Payout,
+    ) -> None:
+        for _ in range(2):
+            response = client.get(reverse("payout-list"), {"currency": payout.currency})
+            assert response.status_code == 200
+
+        [query] = _payout_list_queries()
+        assert query.calls == 2
+        assert query.max_ms <= query.total_ms
+        assert "?" in query.sql and payout.currency not in query.sql
+        assert query.params_shape.startswith("(str")
+        assert "payouts_payout" in query.plan
+        assert query.plan_captured_at is not None
+
+    def test_plan_is_captured_once_per_interval(
+            self,
+            client,
+            log_everything: Any,
+            payout: Payout,
+    ) -> None:
+        log_everything.PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL = 3600
+        client.get(reverse("payout-list"), {"status": "PENDING"})
+        [query] = _payout_list_queries()
+        captured_at = query.plan_captured_at
+
+        client.get(reverse("payout-list"), {"status": "PENDING"})
+        recorder.join()
+
+        query.refresh_from_db()
+        get_dispatch_lock().release(slow_query_explain_key(query.fingerprint))
+        assert query.calls == 2
+        assert query.plan_captured_at == captured_at
+
+    def test_fast_queries_are_ignored(self, client, settings: Any, payout: Payout) -> None:
+        settings.PAYOUTS_SLOW_QUERY_LOG_ENABLED = True
+        client.get(reverse("payout-list"))
+        recorder.join()
+
+        assert not SlowQuery.objects.exists()
+
+    def test_disabled_by_default(self, client, settings: Any, payout: Payout) -> None:
+        settings.PAYOUTS_SLOW_QUERY_MS = 0.0
+
+        client.get(reverse("payout-list"))
+        recorder.join()
+
+        assert not SlowQuery.objects.exists()
+
+    @patch("apps.payouts.tasks.capture_slow_queries.delay")
+    def test_parameter_values_are_not_published(
+            self,
+            mock_delay: Any,
+            client,
+            log_everything: Any,
+    ) -> None:
+        log_everything.PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL = 3600
+        for _ in range(2):
+            client.get(reverse("payout-list"), {"currency": "EUR"})
+        recorder.join()
+        [query] = SlowQuery.objects.all()
+        get_dispatch_lock().release(slow_query_explain_key(query.fingerprint))
+
+        # Plans were captured in-process; only value-free samples were published.
+        published = [sample for call in mock_delay.call_args_list for sample in call.args[0]]
+        assert query.plan and query.calls == 1
+        assert published and all(sample["explain"] is None for sample in published)
+        assert "EUR" not in json.dumps(published)
+
+    def test_samples_are_recorded_off_the_request_thread(
+            self,
+            client,
+            log_everything: Any,
+            payout: Payout,
+    ) -> None:
+        threads = []
+
+        def record(samples: list[dict[str, Any]]) -> None:
+            threads.append(threading.current_thread())
+
+        with patch.object(recorder, "_record", side_effect=record):
+            client.get(reverse("payout-list"))
+            recorder.join()
+
+        assert threads and threading.current_thread() not in threads
+
+    def test_async_requests_are_timed(
+            self,
+            log_everything: Any,
+            payout: Payout,
+    ) -> None:
+        async def view(request: HttpRequest) -> HttpResponse:
+            return HttpResponse(str(await Payout.objects.acount()))
+
+        middleware = SlowQueryMiddleware(view)
+        response = async_to_sync(middleware)(RequestFactory().get("/async-count/"))
+        recorder.join()
+
+        assert iscoroutinefunction(middleware)
+        assert response.content == b"1"
+        assert set(SlowQuery.objects.values_list("source", flat=True)) == {"/async-count/"}
+
+    def test_task_queries_are_attributed_to_the_task(self, log_everything: Any) -> None:
+        dispatch_scheduled_payouts.apply()
+        recorder.join()
+
+        sources = set(SlowQuery.objects.values_list("source", flat=True))
+        assert sources == {dispatch_scheduled_payouts.name}
+
+
+class TestSlowQueryReport:
+    def test_endpoint_lists_top_offenders_for_staff(self, admin_client) -> None:
+        for name, calls, total in (("a", 10, 100.0), ("b", 1, 900.0)):
+            SlowQuery.objects.create(
+                fingerprint=name,
+                sql=f"SELECT {name}",
+                source="PayoutViewSet.list",
+                calls=calls,
+                total_ms=total,
+                max_ms=total / calls,
+                first_seen="2025-01-01T00:00:00Z",
+                last_seen="2025-01-01T00:00:00Z",
+            )
+        url = reverse("slow-query-report")
+
+        by_total = admin_client.get(url).json()
+        by_calls = admin_client.get(url, {"order": "calls", "limit": 1}).json()
+
+        assert [(q["fingerprint"], q["mean_ms"]) for q in by_total] == [
+            ("b", 900.0),
+            ("a", 10.0),
+        ]
+        assert [q["fingerprint"] for q in by_calls] == ["a"]
+        assert admin_client.get(url, {"order": "nope"}).status_code == 400
+
+    def test_endpoint_requires_staff(self, client) -> None:
+        assert client.get(reverse("slow-query-report")).status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_command_prints_json_and_resets(
+            self,
+            client,
+            log_everything: Any,
+            payout: Payout,
+    ) -> None:
+        client.get(reverse("payout-list"))
+        recorder.join()
+        out = StringIO()
+
+        call_command("slow_queries", "--json", "--order", "calls", stdout=out)
+        data = json.loads(out.getvalue())
+        call_command("slow_queries", "--reset", stdout=StringIO())
+
+        assert {q["source"] for q in data} == {"PayoutViewSet.list"}
+        assert not SlowQuery.objects.exists()
@@ -0,0 +1,121 @@
+"""
+Tests for the multi-id status lookup endpoint.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import timedelta
+from typing import Any, Dict
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from apps.payouts.models import Payout, StatusChoices
+from config.db_router import PIN_COOKIE_NAME
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def payouts(valid_payout_data: Dict[str, Any]) -> list[Payout]:
+    """Three payouts last updated an hour ago."""
+    created = [Payout.objects.create(**valid_payout_data) for _ in range(3)]
+    Payout.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+    for payout in created:
+        payout.refresh_from_db()
+    return created
+
+
+def _lookup(client, ids: list[Any], **headers: Any) -> Any:
+    return client.post(
+        reverse("payout-statuses"),
+        data={"ids": [str(payout_id) for payout_id in ids]},
+        content_type="application/json",
+        **headers,
+    )
+
+
+class TestStatusLookup:
+    def test_returns_status_by_id_in_one_query(
+            self,
+            client,
+            payouts: list[Payout],
+            django_assert_num_queries: Any,
+    ) -> None:
+        unknown = uuid.uuid4()
+
+        with django_assert_num_queries(1):
+            response = _lookup(client, [p.id for p in payouts] + [unknown])
+
+        data = response.json()
+        assert response.status_code == 200
+        assert set(data) == {str(p.id) for p in payouts}
+        assert data[str(payouts[0].id)] == {
+            "status": StatusChoices.PENDING,
+            "updated_at": payouts[0].updated_at.isoformat().replace("+00:00", "Z"),
+        }
+        assert response["Last-Modified"] == http_date(
+            max(p.updated_at for p in payouts).timestamp(),
+        )
+
+    def test_if_modified_since_filters_unchanged(
+            self,
+            client,
+            payouts: list[Payout],
+    ) -> None:
+        since = http_date((timezone.now() - timedelta(minutes=1)).timestamp())
+        Payout.objects.filter(id=payouts[1].id).update(
+            status=StatusChoices.CANCELLED,
+            updated_at=timezone.now(),
+        )
+
+        changed = _lookup(client, [p.id for p in payouts], HTTP_IF_MODIFIED_SINCE=since)
+        Payout.objects.filter(id=payouts[1].id).update(
+            updated_at=timezone.now() - timedelta(hours=1),
+        )
+        unchanged = _lookup(client, [p.id for p in payouts], HTTP_IF_MODIFIED_SINCE=since)
+
+        assert {key: value["status"] for key, value in changed.json().items()} == {
+            str(payouts[1].id): StatusChoices.CANCELLED,
+        }
+        assert unchanged.status_code == 200
+        assert unchanged.json() == {}
+        assert "Last-Modified" not in unchanged
+
+    def test_invalid_if_modified_since_is_ignored(
+            self,
+            client,
+            payouts: list[Payout],
+    ) -> None:
+        response = _lookup(client, [payouts[0].id], HTTP_IF_MODIFIED_SINCE="yesterday")
+
+        assert list(response.json()) == [str(payouts[0].id)]
+
+    def test_batch_size_is_limited(self, client, settings: Any) -> None:
+        settings.PAYOUTS_STATUS_LOOKUP_MAX_IDS = 2
+
+        too_many = _lookup(client, [uuid.uuid4() for _ in range(3)])
+        empty = _lookup(client, [])
+        malformed = client.post(
+            reverse("payout-statuses"),
+            data={"ids": ["not-a-uuid"]},
+            content_type="application/json",
+        )
+
+        assert too_many.status_code == 400
+        assert "ids" in too_many.json()
+        assert empty.status_code == 400
+        assert malformed.status_code == 400
+
+    def test_lookup_does_not_pin_client_to_primary(
+            self,
+            client,
+            payouts: list[Payout],
+    ) -> None:
+        response = _lookup(client, [payouts[0].id])
+
+        assert response.status_code == 200
+        assert PIN_COOKIE_NAME not in response.cookies
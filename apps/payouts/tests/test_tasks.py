@@ -4,20 +4,26 @@ Tests for the process_payout_task Celery task.
 
 from __future__ import annotations
 
-from typing import Any, cast
+from datetime import timedelta
+from typing import Any, Dict, cast
 from unittest.mock import patch
 
 import pytest
+from django.utils import timezone
 
 from apps.payouts.models import Payout, StatusChoices
-from apps.payouts.tasks import PayoutProcessingError, process_payout_task
+from apps.payouts.tasks import (
+    PayoutProcessingError,
+    dispatch_scheduled_payouts,
+    process_payout_task,
+)
 
 pytestmark = pytest.mark.django_db
 
 
 class TestProcessPayoutTask:
-    @patch("apps.payouts.tasks.time.sleep")
-    @patch("apps.payouts.tasks.random.random", return_value=0.5)
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=0.5)
     def test_process_payout_success(
             self,
             mock_random: Any,
@@ -63,3 +69,50 @@ class TestProcessPayoutTask:
 
         payout.refresh_from_db()
         assert payout.status == StatusChoices.FAILED
+
+
+class TestScheduledPayouts:
+    def test_process_defers_future_payout(self, payout: Payout) -> None:
+        payout.scheduled_for = timezone.now() + timedelta(days=1)
+        payout.save(update_fields=["scheduled_for"])
+
+        result = process_payout_task.apply(args=(str(payout.id),)).get()
+
+        payout.refresh_from_db()
+        assert result.startswith("Deferred:")
+        assert payout.status == StatusChoices.PENDING
+
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_dispatch_enqueues_only_due_payouts(
+            self,
+            mock_delay: Any,
+            settings: Any,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_SCHEDULE_DISPATCH_BATCH_SIZE = 2
+        now = timezone.now()
+        due = [
+            Payout.objects.create(
+                **valid_payout_data,
+                scheduled_for=now - timedelta(minutes=i),
+            )
+            for i in range(3)
+        ]
+        future = Payout.objects.create(
+            **valid_payout_data,
+            scheduled_for=now + timedelta(days=1),
+        )
+
+        dispatched = dispatch_scheduled_payouts()
+
+        assert dispatched == 3
+        assert {call.args[0] for call in mock_delay.call_args_list} == {
+            str(p.id) for p in due
+        }
+        assert not Payout.objects.filter(
+            id__in=[p.id for p in due],
+            scheduled_for__isnull=False,
+        ).exists()
+        future.refresh_from_db()
+        assert future.scheduled_for is not None
+        assert dispatch_scheduled_payouts() == 0
@@ -0,0 +1,191 @@
+"""
+Tests for conditional payout updates and If-Match handling.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.payouts.fx import fx_rates
+from apps.payouts.models import CurrencyChoices, FxRate, Payout, StatusChoices
+
+pytestmark = pytest.mark.django_db
+
+
+def _patch(client, payout: Payout, data: Dict[str, Any], **headers: Any) -> Any:
+    return client.patch(
+        reverse("payout-detail", args=[payout.id]),
+        data=data,
+        content_type="application/json",
+        **headers,
+    )
+
+
+def _admin_form_data(admin_client, payout: Payout, **changes: Any) -> Dict[str, Any]:
+    url = reverse("admin:payouts_payout_change", args=[payout.id])
+    form = admin_client.get(url).context["adminform"].form
+    data = {
+        **{name: form[name].value() for name in form.fields},
+        "recipient_details": '{"account_number": "1234567890"}',
+        "attempts-TOTAL_FORMS": 0,
+        "attempts-INITIAL_FORMS": 0,
+        **changes,
+    }
+    return {name: value for name, value in data.items() if value is not None}
+
+
+@pytest.fixture
+def eur_rate():
+    fx_rates.clear()
+    yield FxRate.objects.create(currency=CurrencyChoices.EUR, rate_to_base=Decimal("1.1"))
+    fx_rates.clear()
+
+
+class TestConditionalUpdate:
+    def test_update_is_one_write_and_one_read(
+            self,
+            client,
+            payout: Payout,
+            django_assert_num_queries: Any,
+    ) -> None:
+        with django_assert_num_queries(2):
+            response = _patch(client, payout, {"amount": "250.00"}, HTTP_IF_MATCH='"1"')
+
+        payout.refresh_from_db()
+        assert response.status_code == 200
+        assert response.json()["amount"] == "250.00"
+        assert response["ETag"] == '"2"'
+        assert (payout.amount, payout.amount_base, payout.version) == (
+            Decimal("250.00"),
+            Decimal("250.00"),
+            2,
+        )
+
+    def test_amount_only_change_converts_at_the_row_currency(
+            self,
+            client,
+            eur_rate: FxRate,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        eur = Payout.objects.create(**{**valid_payout_data, "currency": CurrencyChoices.EUR})
+        gbp = Payout.objects.create(
+            **{**valid_payout_data, "currency": CurrencyChoices.GBP},
+            amount_base=Decimal("130.00"),
+        )
+
+        _patch(client, eur, {"amount": "200.00"})
+        _patch(client, gbp, {"amount": "200.00"})
+
+        eur.refresh_from_db()
+        gbp.refresh_from_db()
+        assert eur.amount_base == Decimal("220.00")
+        assert gbp.amount_base is None
+
+    def test_stale_version_conflicts(self, client, payout: Payout) -> None:
+        first = _patch(client, payout, {"description": "first"}, HTTP_IF_MATCH='"1"')
+        second = _patch(client, payout, {"description": "second"}, HTTP_IF_MATCH='"1"')
+
+        payout.refresh_from_db()
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert second["ETag"] == '"2"'
+        assert payout.description == "first"
+
+    def test_claimed_payout_is_not_updated(self, client, payout: Payout) -> None:
+        # The worker moved the payout on after the client read version 1.
+        Payout.objects.filter(id=payout.id).update(status=StatusChoices.PROCESSING)
+
+        response = _patch(client, payout, {"amount": "250.00"}, HTTP_IF_MATCH='"1"')
+
+        payout.refresh_from_db()
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Only PENDING payouts can be updated."
+        assert payout.amount == Decimal("100.00")
+
+    @pytest.mark.parametrize("if_match", ["*", 'W/"1"', '"7", "1"'])
+    def test_if_match_forms(self, client, payout: Payout, if_match: str) -> None:
+        response = _patch(client, payout, {"description": "edited"}, HTTP_IF_MATCH=if_match)
+
+        assert response.status_code == 200
+
+    def test_unversioned_update_still_bumps_version(self, client, payout: Payout) -> None:
+        etag = client.get(reverse("payout-detail", args=[payout.id]))["ETag"]
+
+        client.put(
+            reverse("payout-detail", args=[payout.id]),
+            data={"amount": "10.00", "recipient_details": {"account_number": "9876543210"}},
+            content_type="application/json",
+        )
+        response = _patch(client, payout, {"description": "late"}, HTTP_IF_MATCH=etag)
+
+        assert etag == '"1"'
+        assert response.status_code == 409
+
+    def test_unknown_or_malformed_id_is_not_found(self, client) -> None:
+        unknown = client.patch(
+            reverse("payout-detail", args=["00000000-0000-0000-0000-000000000000"]),
+            data={"description": "x"},
+            content_type="application/json",
+        )
+        malformed = client.patch(
+            reverse("payout-detail", args=["not-a-uuid"]),
+            data={"description": "x"},
+            content_type="application/json",
+        )
+
+        assert (unknown.status_code, malformed.status_code) == (404, 404)
+
+    @patch("apps.payouts.tasks.process_payout_task.delay")
+    def test_clearing_schedule_enqueues(
+            self,
+            mock_delay: Any,
+            client,
+            valid_payout_data: Dict[str, Any],
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        payout = Payout.objects.create(
+            **valid_payout_data,
+            scheduled_for=timezone.now() + timedelta(days=1),
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            _patch(client, payout, {"scheduled_for": None})
+
+        mock_delay.assert_called_once_with(str(payout.id))
+
+
+class TestAdminEdit:
+    def test_admin_edit_bumps_version(self, admin_client, client, payout: Payout) -> None:
+        data = _admin_form_data(admin_client, payout, description="admin")
+
+        response = admin_client.post(reverse("admin:payouts_payout_change", args=[payout.id]), data)
+        stale = _patch(client, payout, {"description": "api"}, HTTP_IF_MATCH='"1"')
+
+        payout.refresh_from_db()
+        assert response.status_code == 302
+        assert stale.status_code == 409
+        assert (payout.version, payout.description) == (2, "admin")
+
+    def test_admin_edit_of_a_changed_payout_is_rejected(
+            self,
+            admin_client,
+            client,
+            payout: Payout,
+    ) -> None:
+        data = _admin_form_data(admin_client, payout, description="admin")
+        # An API edit commits between opening and saving the admin form.
+        _patch(client, payout, {"description": "api"}, HTTP_IF_MATCH='"1"')
+
+        response = admin_client.post(reverse("admin:payouts_payout_change", args=[payout.id]), data)
+
+        payout.refresh_from_db()
+        assert response.status_code == 200
+        assert "changed after you opened it" in response.content.decode()
+        assert (payout.version, payout.description) == (2, "api")
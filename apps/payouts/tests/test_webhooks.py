@@ -0,0 +1,229 @@
+"""
+Tests for outbound payout webhooks.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from apps.payouts.models import (
+    Payout,
+    StatusChoices,
+    WebhookDelivery,
+    WebhookSubscription,
+)
+from apps.payouts.services import PayoutService
+from apps.payouts.tasks import process_payout_task
+from apps.payouts.tests.webhook_receiver import WebhookReceiver
+from apps.payouts.webhooks import (
+    deliver_due_webhooks,
+    queue_status_webhooks,
+    sign_payload,
+    verify_signature,
+)
+
+pytestmark = pytest.mark.django_db
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture
+def subscription(webhook_receiver: WebhookReceiver) -> WebhookSubscription:
+    return WebhookSubscription.objects.create(url=webhook_receiver.url, secret=SECRET)
+
+
+def _make_due() -> None:
+    WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+
+
+class TestSignature:
+    def test_round_trip_and_tampering(self) -> None:
+        header = sign_payload(SECRET, b'{"events":[]}')
+
+        assert verify_signature(SECRET, b'{"events":[]}', header)
+        assert not verify_signature(SECRET, b'{"events":[1]}', header)
+        assert not verify_signature("other", b'{"events":[]}', header)
+        assert not verify_signature(SECRET, b'{"events":[]}', "garbage")
+
+    def test_stale_timestamp_is_rejected(self) -> None:
+        header = sign_payload(SECRET, b"{}", timestamp=1)
+
+        assert not verify_signature(SECRET, b"{}", header)
+
+
+class TestQueueing:
+    def test_other_tenants_and_statuses_queue_nothing(
+            self,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        WebhookSubscription.objects.create(
+            tenant="acme",
+            url=subscription.url,
+            secret=SECRET,
+        )
+
+        assert queue_status_webhooks(payout.id, StatusChoices.PROCESSING) == 0
+        assert queue_status_webhooks(payout.id, StatusChoices.COMPLETED) == 1
+        assert WebhookDelivery.objects.get().subscription == subscription
+
+    def test_unsubscribed_status_queues_nothing(
+            self,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        subscription.statuses = [StatusChoices.FAILED]
+        subscription.save()
+
+        assert queue_status_webhooks(payout.id, StatusChoices.COMPLETED) == 0
+        assert queue_status_webhooks(payout.id, StatusChoices.FAILED) == 1
+
+
+class TestDelivery:
+    @patch("apps.payouts.gateway.time.sleep")
+    @patch("apps.payouts.gateway.random.random", return_value=0.5)
+    def test_completion_delivers_signed_event(
+            self,
+            mock_random: Any,
+            mock_sleep: Any,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            payout: Payout,
+            django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        with django_capture_on_commit_callbacks(execute=True):
+            process_payout_task.apply(args=(str(payout.id),))
+
+        [batch] = webhook_receiver.batches
+        [event] = batch.events
+        delivery = WebhookDelivery.objects.get()
+        assert webhook_receiver.verified(SECRET)
+        assert event["type"] == "payout.completed"
+        assert event["id"] == str(delivery.event_id)
+        assert event["data"]["id"] == str(payout.id)
+        assert event["data"]["status"] == StatusChoices.COMPLETED
+        assert delivery.delivered_at is not None
+        assert delivery.attempts == 1
+
+    def test_events_are_batched_over_one_connection(
+            self,
+            settings: Any,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_WEBHOOK_BATCH_SIZE = 3
+        WebhookSubscription.objects.create(
+            url=f"{webhook_receiver.url}/second",
+            secret=SECRET,
+        )
+        for _ in range(5):
+            payout = Payout.objects.create(**valid_payout_data)
+            PayoutService.update_status(payout, StatusChoices.FAILED)
+
+        assert deliver_due_webhooks() == (10, 10)
+        assert sorted(len(batch.events) for batch in webhook_receiver.batches) == [2, 2, 3, 3]
+        assert webhook_receiver.connections == 1
+        assert webhook_receiver.verified(SECRET)
+        assert deliver_due_webhooks() == (0, 0)
+
+    def test_failed_batch_is_retried_with_backoff(
+            self,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        PayoutService.update_status(payout, StatusChoices.FAILED)
+        webhook_receiver.fail_next(1)
+
+        assert deliver_due_webhooks() == (1, 0)
+        delivery = WebhookDelivery.objects.get()
+        assert delivery.attempts == 1
+        assert delivery.last_error == "HTTP 503"
+        assert delivery.next_attempt_at > timezone.now()
+        assert deliver_due_webhooks() == (0, 0)
+
+        _make_due()
+
+        assert deliver_due_webhooks() == (1, 1)
+        delivery.refresh_from_db()
+        assert delivery.attempts == 2
+        assert delivery.delivered_at is not None
+        assert [batch.events[0]["id"] for batch in webhook_receiver.batches] == [
+            str(delivery.event_id),
+        ] * 2
+
+    def test_failing_endpoint_gets_no_more_batches_this_run(
+            self,
+            settings: Any,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            valid_payout_data: Dict[str, Any],
+    ) -> None:
+        settings.PAYOUTS_WEBHOOK_BATCH_SIZE = 1
+        for _ in range(3):
+            payout = Payout.objects.create(**valid_payout_data)
+            PayoutService.update_status(payout, StatusChoices.FAILED)
+        webhook_receiver.fail_next(1)
+
+        assert deliver_due_webhooks() == (3, 0)
+        assert len(webhook_receiver.batches) == 1
+        assert sorted(WebhookDelivery.objects.values_list("attempts", flat=True)) == [0, 0, 1]
+        assert deliver_due_webhooks() == (0, 0)
+
+        _make_due()
+
+        assert deliver_due_webhooks() == (3, 3)
+
+    def test_deactivated_subscription_is_not_sent(
+            self,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        PayoutService.update_status(payout, StatusChoices.FAILED)
+        WebhookSubscription.objects.update(is_active=False)
+
+        assert deliver_due_webhooks() == (1, 0)
+        delivery = WebhookDelivery.objects.get()
+        assert not webhook_receiver.batches
+        assert delivery.failed_at is not None
+        assert delivery.last_error == "Subscription is inactive"
+
+    def test_gives_up_after_max_attempts(
+            self,
+            settings: Any,
+            webhook_receiver: WebhookReceiver,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        settings.PAYOUTS_WEBHOOK_MAX_ATTEMPTS = 2
+        PayoutService.update_status(payout, StatusChoices.FAILED)
+        webhook_receiver.fail_next(2, status=500)
+
+        deliver_due_webhooks()
+        _make_due()
+        deliver_due_webhooks()
+        _make_due()
+
+        delivery = WebhookDelivery.objects.get()
+        assert delivery.failed_at is not None
+        assert delivery.delivered_at is None
+        assert deliver_due_webhooks() == (0, 0)
+
+    def test_leased_rows_are_not_claimed_twice(
+            self,
+            subscription: WebhookSubscription,
+            payout: Payout,
+    ) -> None:
+        PayoutService.update_status(payout, StatusChoices.FAILED)
+        WebhookDelivery.objects.update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        assert deliver_due_webhooks() == (0, 0)
@@ -0,0 +1,98 @@
+"""
+Local HTTP endpoint that records webhook batches for tests.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from apps.payouts.webhooks import SIGNATURE_HEADER, verify_signature
+
+
+@dataclass
+class ReceivedBatch:
+    """One POST received by the stub."""
+
+    path: str
+    body: bytes
+    signature: str
+    client_port: int
+
+    @property
+    def events(self) -> list[dict[str, Any]]:
+        return json.loads(self.body)["events"]
+
+
+class WebhookReceiver:
+    """
+    Keep-alive HTTP/1.1 server on localhost that records every POST.
+
+    ``fail_next(n)`` makes the next ``n`` requests return ``status``.
+    """
+
+    def __init__(self) -> None:
+        self.batches: list[ReceivedBatch] = []
+        self._failures: list[int] = []
+        self._mutex = threading.Lock()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with receiver._mutex:
+                    receiver.batches.append(
+                        ReceivedBatch(
+                            path=self.path,
+                            body=body,
+                            signature=self.headers.get(SIGNATURE_HEADER, ""),
+                            client_port=self.client_address[1],
+                        )
+                    )
+                    status = receiver._failures.pop(0) if receiver._failures else 204
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}/hooks"
+
+    @property
+    def connections(self) -> int:
+        """Distinct client connections the batches arrived on."""
+        return len({batch.client_port for batch in self.batches})
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        with self._mutex:
+            self._failures.extend([status] * count)
+
+    def verified(self, secret: str) -> bool:
+        """Return True if every recorded batch carries a valid signature."""
+        return all(
+            verify_signature(secret, batch.body, batch.signature)
+            for batch in self.batches
+        )
+
+    def start(self) -> WebhookReceiver:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,7 +1,11 @@
 """
 URL configuration for the payouts' app.
 
-Exposes the PayoutViewSet under the /api/payouts/ path via a DRF router.
+Exposes the PayoutViewSet under the /api/payouts/ path and payout batches
+under /api/batches/ via a DRF router, the async read-only views under
+/api/async/payouts/, the slow-query report under
+/api/diagnostics/slow-queries/ and the pipeline health metrics under
+/api/health/pipeline/.
 """
 
 from __future__ import annotations
@@ -9,11 +13,34 @@ from __future__ import annotations
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.payouts.views import PayoutViewSet
+from apps.payouts.async_views import payout_detail, payout_list
+from apps.payouts.views import (
+    PayoutBatchViewSet,
+    PayoutViewSet,
+    PipelineHealthView,
+    SlowQueryReportView,
+)
 
 router = DefaultRouter()
 router.register("payouts", PayoutViewSet, basename="payout")
+router.register("batches", PayoutBatchViewSet, basename="payout-batch")
 
 urlpatterns = [
+    path("async/payouts/", payout_list, name="payout-async-list"),
+    path(
+        "async/payouts/<uuid:pk>/",
+        payout_detail,
+        name="payout-async-detail",
+    ),
+    path(
+        "diagnostics/slow-queries/",
+        SlowQueryReportView.as_view(),
+        name="slow-query-report",
+    ),
+    path(
+        "health/pipeline/",
+        PipelineHealthView.as_view(),
+        name="pipeline-health",
+    ),
     path("", include(router.urls)),
 ]
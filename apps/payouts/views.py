@@ -4,50 +4,77 @@ ViewSet implementations for the payouts application.
 
 from __future__ import annotations
 
+import uuid
+from collections.abc import Mapping
+from contextlib import nullcontext
+from datetime import datetime, timezone as dt_timezone
 from typing import Any, cast
 
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils.http import http_date, parse_http_date_safe
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import (
-    OpenApiExample,
-    extend_schema,
-    extend_schema_view,
-)
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
 
+from apps.payouts.batches import record_batch_removal
+from apps.payouts.changes import changes_after, encode_cursor
 from apps.payouts.filters import PayoutFilter
-from apps.payouts.models import Payout
-from apps.payouts.serializers import PayoutSerializer, PayoutUpdateSerializer
+from apps.payouts.health import current_snapshot, render_prometheus
+from apps.payouts.list_cache import get_page, invalidate, page_key, set_page
+from apps.payouts.models import Payout, PayoutBatch, PayoutStatusEvent
+from apps.payouts.pagination import PayoutPagination
+from apps.payouts.serializers import (
+    PayoutBatchCreateSerializer,
+    PayoutBatchSerializer,
+    PayoutBulkStatusSerializer,
+    PayoutChangeFeedSerializer,
+    PayoutChangesQuerySerializer,
+    PayoutSerializer,
+    PayoutStatusEventSerializer,
+    PayoutStatusLookupSerializer,
+    PayoutStatusSerializer,
+    PayoutUpdateSerializer,
+    PipelineHealthSerializer,
+    SlowQueryReportQuerySerializer,
+    SlowQuerySerializer,
+)
 from apps.payouts.services import PayoutService
+from apps.payouts.slow_queries import top_slow_queries
+from config.db_router import allow_replica, mark_read_only, reads_use_replica
 
 
-@extend_schema(tags=["Payouts"])
-@extend_schema_view(
-    list=extend_schema(
-        summary="List payouts",
-        description="Retrieve a paginated list of payouts with optional filtering.",
-    ),
-    create=extend_schema(
-        summary="Create payout",
-        description="Create a new payout and enqueue it for asynchronous processing.",
-        examples=[
-            OpenApiExample(
-                "Create payout example",
-                value={
-                    "amount": "250.00",
-                    "currency": "EUR",
-                    "recipient_details": {
-                        "account_number": "DE89370400440532013000",
-                        "bank_name": "Deutsche Bank",
-                    },
-                    "description": "Contractor payment - March 2025",
-                },
-            )
-        ],
-    ),
-)
+def _etag(version: int) -> str:
+    """Return the ETag of a payout version."""
+    return f'"{version}"'
+
+
+def _if_match_versions(header: str | None) -> list[int] | None:
+    """
+    Return the payout versions listed in an ``If-Match`` header.
+
+    None means no condition (no header, or ``*``). Tags that are not
+    versions are dropped, so a header listing none of them matches nothing.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.append(int(tag))
+    return versions
+
+
+# OpenAPI annotations live in apps.payouts.schema and are only loaded to build the schema.
 class PayoutViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing payouts via the REST API.
@@ -60,11 +87,18 @@ class PayoutViewSet(viewsets.ModelViewSet):
     serializer_class = PayoutSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = PayoutFilter
+    pagination_class = PayoutPagination
 
     def get_serializer_class(self):
         """Return serializer based on action (create/read vs. update)."""
         if self.action in ["partial_update", "update"]:
             return PayoutUpdateSerializer
+        if self.action == "bulk_status":
+            return PayoutBulkStatusSerializer
+        if self.action == "history":
+            return PayoutStatusEventSerializer
+        if self.action == "statuses":
+            return PayoutStatusLookupSerializer
         return PayoutSerializer
 
     def perform_create(self, serializer: BaseSerializer[Any]) -> None:
@@ -75,22 +109,243 @@ class PayoutViewSet(viewsets.ModelViewSet):
         payout = PayoutService.create_payout(payout_serializer.validated_data)
         payout_serializer.instance = payout
 
+    @transaction.atomic
+    def perform_destroy(self, instance: Payout) -> None:
+        """Delete the payout, update its batch and invalidate cached list pages showing it."""
+        # Re-read under lock: a worker may have moved the payout on since it was fetched.
+        locked = (
+            Payout.objects.select_for_update()
+            .only("status", "currency", "batch_id")
+            .filter(pk=instance.pk)
+            .first()
+        )
+        if locked is None:
+            return
+        invalidate([locked.status], [locked.currency])
+        locked.delete()
+        record_batch_removal(locked.batch_id, locked.status)
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        List payouts, serving repeated queries from the list response cache.
+
+        See ``apps.payouts.list_cache`` for keys and invalidation. Pages
+        that are not cached are read from a replica when one is configured,
+        and a page read from a replica is not cached: it may predate a write
+        whose generation bump is already in the key. With
+        ``PAYOUTS_LIST_CACHE_MISS_FROM_REPLICA`` off, misses are read from
+        the primary and cached instead.
+        """
+        filterset = PayoutFilter(request.query_params, queryset=self.get_queryset())
+        key = None
+        if filterset.is_valid():
+            key = page_key(filterset.form.cleaned_data, request.query_params)
+        if key is None:
+            with allow_replica():
+                return super().list(request, *args, **kwargs)
+        cached = get_page(key)
+        if cached is not None:
+            return Response(cached)
+        replica = (
+            allow_replica() if settings.PAYOUTS_LIST_CACHE_MISS_FROM_REPLICA else nullcontext()
+        )
+        with replica:
+            from_replica = reads_use_replica()
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and not from_replica:
+            set_page(key, response.data)
+        return response
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """Retrieve a payout; its version is sent as the ``ETag`` for ``If-Match``."""
+        with allow_replica():
+            response = super().retrieve(request, *args, **kwargs)
+        response["ETag"] = _etag(response.data["version"])
+        return response
+
     def update(self, request: Request, *args, **kwargs) -> Response:
-        """Allow updates only for PENDING payouts."""
-        instance = self.get_object()
-        if not PayoutService.can_update(instance):
+        """
+        Apply the validated changes if the payout is still PENDING.
+
+        The changes are written with one conditional UPDATE (see
+        ``PayoutService.update_pending``); with ``If-Match`` it also has to
+        match the payout's current version. The payout is then read once,
+        either for the response or to answer 403 (no longer PENDING) or 409
+        (version changed).
+        """
+        serializer = self.get_serializer(data=request.data, partial=kwargs.pop("partial", False))
+        serializer.is_valid(raise_exception=True)
+        try:
+            payout_id = uuid.UUID(str(self.kwargs[self.lookup_url_kwarg or self.lookup_field]))
+        except ValueError:
+            raise Http404 from None
+        versions = _if_match_versions(request.headers.get("If-Match"))
+
+        updated = PayoutService.update_pending(payout_id, serializer.validated_data, versions)
+        payout = get_object_or_404(self.get_queryset(), id=payout_id)
+        headers = {"ETag": _etag(payout.version)}
+        if updated:
+            return Response(self.get_serializer(payout).data, headers=headers)
+        if not PayoutService.can_update(payout):
             return Response(
                 {"detail": "Only PENDING payouts can be updated."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        return super().update(request, *args, **kwargs)
+        return Response(
+            {"detail": "The payout was modified by another request; fetch it and retry."},
+            status=status.HTTP_409_CONFLICT,
+            headers=headers,
+        )
 
-    def partial_update(self, request: Request, *args, **kwargs) -> Response:
-        """Allow partial updates only for PENDING payouts."""
-        instance = self.get_object()
-        if not PayoutService.can_update(instance):
-            return Response(
-                {"detail": "Only PENDING payouts can be updated."},
-                status=status.HTTP_403_FORBIDDEN,
+    @action(detail=False, methods=["post"], url_path="bulk-status")
+    def bulk_status(self, request: Request) -> Response:
+        """Apply a status change to all matching PENDING payouts."""
+        serializer = PayoutBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        filterset = data.get("filter")
+        affected, skipped = PayoutService.bulk_update_status(
+            data["status"],
+            ids=data.get("ids"),
+            queryset=filterset.qs if filterset is not None else None,
+        )
+        return Response({"affected": affected, "skipped": skipped})
+
+    @action(detail=False, methods=["post"], filter_backends=[], pagination_class=None)
+    def statuses(self, request: Request) -> Response:
+        """
+        Return ``{id: {status, updated_at}}`` for up to ``PAYOUTS_STATUS_LOOKUP_MAX_IDS`` ids.
+
+        Unknown ids are left out. With ``If-Modified-Since``, so are payouts
+        not updated after that time; the header has one-second resolution,
+        so payouts changed within that second may be returned again.
+        ``Last-Modified`` carries the latest ``updated_at`` returned.
+        """
+        serializer = PayoutStatusLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = Payout.objects.filter(id__in=serializer.validated_data["ids"])
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        if since is not None:
+            queryset = queryset.filter(
+                updated_at__gt=datetime.fromtimestamp(since, tz=dt_timezone.utc),
             )
-        return super().partial_update(request, *args, **kwargs)
+        rows = list(queryset.order_by().values("id", "status", "updated_at"))
+
+        data = PayoutStatusSerializer(rows, many=True).data
+        response = Response({str(row["id"]): item for row, item in zip(rows, data)})
+        if rows:
+            latest = max(row["updated_at"] for row in rows)
+            response["Last-Modified"] = http_date(latest.timestamp())
+        return mark_read_only(response)
+
+    @action(detail=False, methods=["get"], filter_backends=[], pagination_class=None)
+    def changes(self, request: Request) -> Response:
+        """Return payouts changed after the cursor, oldest change first."""
+        params = PayoutChangesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page, position, has_more = changes_after(
+            params.validated_data["position"],
+            params.validated_data["limit"],
+        )
+        feed = {
+            "results": page,
+            "next_cursor": encode_cursor(position) if position is not None else None,
+            "has_more": has_more,
+        }
+        return Response(PayoutChangeFeedSerializer(feed).data)
+
+    @action(detail=True, methods=["get"])
+    def history(self, request: Request, pk: str | None = None) -> Response:
+        """List the status transitions recorded for a payout."""
+        payout = self.get_object()
+        events = PayoutStatusEvent.objects.filter(payout_id=payout.id)
+        return Response(PayoutStatusEventSerializer(events, many=True).data)
+
+
+class PayoutBatchViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Submit payouts as one batch and track its progress.
+
+    Retrieving a batch reads only its counter row, however many payouts it
+    holds; list the payouts themselves with ``/api/payouts/?batch=<id>``.
+    """
+
+    queryset = PayoutBatch.objects.all()
+    serializer_class = PayoutBatchSerializer
+
+    def get_serializer_class(self):
+        """Return the submission serializer for create."""
+        if self.action == "create":
+            return PayoutBatchCreateSerializer
+        return PayoutBatchSerializer
+
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        """Create the batch and its payouts, and dispatch them."""
+        serializer = PayoutBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        batch = PayoutService.create_batch(
+            data["payouts"],
+            tenant=data["tenant"],
+            reference=data["reference"],
+        )
+        return Response(PayoutBatchSerializer(batch).data, status=status.HTTP_201_CREATED)
+
+
+class SlowQueryReportView(APIView):
+    """
+    Top offenders from the slow-query log, worst first.
+
+    ``order`` is one of ``total`` (default), ``mean``, ``max`` or ``calls``;
+    ``limit`` caps the number of fingerprints returned. Staff only.
+    """
+
+    permission_classes = [IsAdminUser]
+    serializer_class = SlowQuerySerializer
+
+    def get(self, request: Request) -> Response:
+        """Return the aggregated slow queries with their latest plans."""
+        params = SlowQueryReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        with allow_replica():
+            queries = top_slow_queries(**params.validated_data)
+            return Response(SlowQuerySerializer(queries, many=True).data)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Render a pipeline health snapshot in the Prometheus text format."""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(
+            self,
+            data: Any,
+            accepted_media_type: str | None = None,
+            renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        return render_prometheus(data).encode(self.charset)
+
+
+class PipelineHealthView(APIView):
+    """
+    Backlog depth, oldest-item age and throughput of the payout pipeline.
+
+    Served from the snapshot stored by the ``sample_pipeline_health`` task,
+    as Prometheus text by default or as JSON with ``?format=json``.
+    """
+
+    authentication_classes: list[type] = []
+    renderer_classes = [PrometheusRenderer, JSONRenderer]
+    serializer_class = PipelineHealthSerializer
+
+    def get(self, request: Request) -> Response:
+        """Return the latest pipeline health snapshot."""
+        return Response(current_snapshot())
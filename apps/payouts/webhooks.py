@@ -0,0 +1,387 @@
+"""
+Outbound webhooks for terminal payout status changes.
+
+When a payout reaches a status a tenant's ``WebhookSubscription`` listens
+for, a ``WebhookDelivery`` row is written in the same transaction as the
+status change, so no event is lost or sent for a rolled-back change.
+Processing workers never make HTTP calls themselves.
+
+The ``deliver_webhooks`` task, routed to its own ``webhooks`` queue,
+claims due rows with ``SKIP LOCKED`` and leases them by pushing
+``next_attempt_at`` forward. It then POSTs them in batches of up to
+``PAYOUTS_WEBHOOK_BATCH_SIZE`` events per subscription over keep-alive
+connections reused across batches. Every request body is signed with the
+subscription secret::
+
+    X-Payouts-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">
+
+Failed batches are retried with exponential backoff and jitter up to
+``PAYOUTS_WEBHOOK_MAX_ATTEMPTS`` times; the subscription's remaining
+batches wait for the next run. Delivery is at least once;
+receivers deduplicate on the event ``id``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, QuerySet, Subquery
+from django.utils import timezone
+
+from apps.payouts.models import Payout, WebhookDelivery, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Payouts-Signature"
+EVENT_TYPES = {
+    "COMPLETED": "payout.completed",
+    "FAILED": "payout.failed",
+    "CANCELLED": "payout.cancelled",
+}
+
+# Errors a reused keep-alive connection raises when the server closed it.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class WebhookDeliveryError(Exception):
+    """Raised when an endpoint rejects a batch or cannot be reached."""
+
+
+def sign_payload(secret: str, body: bytes, timestamp: int | None = None) -> str:
+    """Return the ``X-Payouts-Signature`` header value for ``body``."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}.".encode() + body
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(
+        secret: str,
+        body: bytes,
+        header: str,
+        tolerance: int = 300,
+) -> bool:
+    """Check a signature header the way a receiver should."""
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    expected = sign_payload(secret, body, timestamp)
+    return hmac.compare_digest(expected.encode(), header.encode())
+
+
+def queue_status_webhooks(payout_id: Any, status: str) -> int:
+    """
+    Queue a delivery for every active subscription interested in ``status``.
+
+    Must run inside the transaction that makes the transition. Delivery is
+    requested once it commits. Returns the number of deliveries queued.
+    """
+    if status not in EVENT_TYPES:
+        return 0
+    # One query on the common path where the tenant has no subscriptions.
+    subscriptions = [
+        subscription
+        for subscription in WebhookSubscription.objects.filter(
+            tenant=Subquery(Payout.objects.filter(id=payout_id).values("tenant")[:1]),
+            is_active=True,
+        )
+        if status in subscription.statuses
+    ]
+    if not subscriptions:
+        return 0
+    payout = Payout.objects.get(id=payout_id)
+
+    from apps.payouts.tasks import request_webhook_delivery
+
+    now = timezone.now()
+    data = _payload_data(payout)
+    WebhookDelivery.objects.bulk_create(
+        [_delivery(subscription, payout.id, status, data, now) for subscription in subscriptions]
+    )
+    transaction.on_commit(request_webhook_delivery)
+    return len(subscriptions)
+
+
+def queue_bulk_status_webhooks(payouts: QuerySet[Payout], status: str) -> int:
+    """
+    Queue deliveries for ``payouts``, which all just moved to ``status``.
+
+    Must run inside the transaction that makes the transitions. One query
+    finds the subscriptions of the payouts' tenants; only payouts of
+    subscribed tenants are then loaded to build their payloads. Returns the
+    number of deliveries queued.
+    """
+    if status not in EVENT_TYPES:
+        return 0
+    subscriptions: defaultdict[str, list[WebhookSubscription]] = defaultdict(list)
+    for subscription in WebhookSubscription.objects.filter(
+        tenant__in=payouts.order_by().values("tenant"),
+        is_active=True,
+    ):
+        if status in subscription.statuses:
+            subscriptions[subscription.tenant].append(subscription)
+    if not subscriptions:
+        return 0
+
+    from apps.payouts.tasks import request_webhook_delivery
+
+    now = timezone.now()
+    deliveries: list[WebhookDelivery] = []
+    for payout in payouts.filter(tenant__in=list(subscriptions)).iterator():
+        data = _payload_data(payout)
+        deliveries.extend(
+            _delivery(subscription, payout.id, status, data, now)
+            for subscription in subscriptions[payout.tenant]
+        )
+    WebhookDelivery.objects.bulk_create(deliveries, batch_size=settings.PAYOUTS_BULK_UPDATE_CHUNK_SIZE)
+    if deliveries:
+        transaction.on_commit(request_webhook_delivery)
+    return len(deliveries)
+
+
+def _payload_data(payout: Payout) -> Any:
+    from apps.payouts.serializers import PayoutSerializer
+
+    return json.loads(json.dumps(PayoutSerializer(payout).data, cls=DjangoJSONEncoder))
+
+
+def _delivery(
+        subscription: WebhookSubscription,
+        payout_id: Any,
+        status: str,
+        data: Any,
+        now: datetime,
+) -> WebhookDelivery:
+    event_id = uuid.uuid4()
+    return WebhookDelivery(
+        subscription=subscription,
+        event_id=event_id,
+        payout_id=payout_id,
+        status=status,
+        payload={
+            "id": str(event_id),
+            "type": EVENT_TYPES[status],
+            "created_at": now.isoformat(),
+            "data": data,
+        },
+        next_attempt_at=now,
+    )
+
+
+class ConnectionPool:
+    """Per-thread keep-alive HTTP connections keyed by scheme, host and port."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def _connections(self) -> dict[tuple[str, str], http.client.HTTPConnection]:
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def post(self, url: str, body: bytes, headers: dict[str, str], timeout: float) -> int:
+        """POST ``body`` to ``url`` and return the response status."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        key = (parts.scheme, parts.netloc)
+        reused = key in self._connections()
+        try:
+            return self._send(key, path, body, headers, timeout)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            # The server closed the idle connection; retry once on a new one.
+            return self._send(key, path, body, headers, timeout)
+
+    def _send(
+            self,
+            key: tuple[str, str],
+            path: str,
+            body: bytes,
+            headers: dict[str, str],
+            timeout: float,
+    ) -> int:
+        connections = self._connections()
+        connection = connections.get(key)
+        if connection is None:
+            scheme, netloc = key
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(netloc, timeout=timeout)
+            else:
+                connection = http.client.HTTPConnection(netloc, timeout=timeout)
+            connections[key] = connection
+        try:
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except Exception:
+            self._discard(key)
+            raise
+        if response.will_close:
+            self._discard(key)
+        return response.status
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        connection = self._connections().pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        """Close every connection opened by the current thread."""
+        for key in list(self._connections()):
+            self._discard(key)
+
+
+pool = ConnectionPool()
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt after ``attempts`` failures, with jitter."""
+    delay = min(
+        settings.PAYOUTS_WEBHOOK_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.PAYOUTS_WEBHOOK_RETRY_BACKOFF_MAX,
+    )
+    return delay * (0.5 + random.random() / 2)
+
+
+def send_batch(subscription: WebhookSubscription, deliveries: list[WebhookDelivery]) -> None:
+    """POST one signed batch of events; raise ``WebhookDeliveryError`` unless 2xx."""
+    body = json.dumps(
+        {"events": [delivery.payload for delivery in deliveries]},
+        separators=(",", ":"),
+    ).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "payouts-webhooks/1",
+        SIGNATURE_HEADER: sign_payload(subscription.secret, body),
+    }
+    try:
+        status = pool.post(
+            subscription.url,
+            body,
+            headers,
+            settings.PAYOUTS_WEBHOOK_TIMEOUT,
+        )
+    except (OSError, http.client.HTTPException) as exc:
+        raise WebhookDeliveryError(f"{type(exc).__name__}: {exc}") from exc
+    if not 200 <= status < 300:
+        raise WebhookDeliveryError(f"HTTP {status}")
+
+
+def _claim(limit: int) -> list[WebhookDelivery]:
+    """Lease up to ``limit`` due deliveries for this worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(
+                delivered_at__isnull=True,
+                failed_at__isnull=True,
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        WebhookDelivery.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.PAYOUTS_WEBHOOK_LEASE_SECONDS),
+        )
+    return list(
+        WebhookDelivery.objects.filter(id__in=ids)
+        .select_related("subscription")
+        .order_by("created_at", "id")
+    )
+
+
+def _record_failure(deliveries: list[WebhookDelivery], error: str) -> None:
+    now = timezone.now()
+    for delivery in deliveries:
+        delivery.attempts += 1
+        delivery.last_error = error[:1000]
+        if delivery.attempts >= settings.PAYOUTS_WEBHOOK_MAX_ATTEMPTS:
+            delivery.failed_at = now
+        else:
+            delivery.next_attempt_at = now + timedelta(seconds=retry_delay(delivery.attempts))
+    WebhookDelivery.objects.bulk_update(
+        deliveries,
+        ["attempts", "last_error", "failed_at", "next_attempt_at"],
+    )
+
+
+def _postpone(deliveries: list[WebhookDelivery]) -> None:
+    """Push back deliveries that were claimed but not sent, without counting an attempt."""
+    WebhookDelivery.objects.filter(id__in=[d.id for d in deliveries]).update(
+        next_attempt_at=timezone.now() + timedelta(seconds=retry_delay(1)),
+    )
+
+
+def deliver_due_webhooks(limit: int | None = None) -> tuple[int, int]:
+    """
+    Claim due deliveries and send them in batches per subscription.
+
+    Once a batch to a subscription fails, its remaining batches are not
+    sent in this run but postponed like a first failure. Deliveries to a
+    deactivated subscription are marked failed without being sent.
+    Returns ``(claimed, delivered)``.
+    """
+    deliveries = _claim(limit or settings.PAYOUTS_WEBHOOK_CLAIM_SIZE)
+    by_subscription: dict[int, list[WebhookDelivery]] = defaultdict(list)
+    for delivery in deliveries:
+        by_subscription[delivery.subscription_id].append(delivery)
+
+    delivered = 0
+    batch_size = settings.PAYOUTS_WEBHOOK_BATCH_SIZE
+    for group in by_subscription.values():
+        subscription = group[0].subscription
+        if not subscription.is_active:
+            WebhookDelivery.objects.filter(id__in=[d.id for d in group]).update(
+                failed_at=timezone.now(),
+                last_error="Subscription is inactive",
+            )
+            continue
+        for start in range(0, len(group), batch_size):
+            batch = group[start:start + batch_size]
+            try:
+                send_batch(subscription, batch)
+            except WebhookDeliveryError as exc:
+                logger.warning(
+                    "Webhook batch of %s to %s failed: %s",
+                    len(batch),
+                    subscription.url,
+                    exc,
+                )
+                _record_failure(batch, str(exc))
+                # The endpoint is failing; do not wait out a timeout per batch.
+                _postpone(group[start + batch_size:])
+                break
+            WebhookDelivery.objects.filter(id__in=[d.id for d in batch]).update(
+                attempts=F("attempts") + 1,
+                delivered_at=timezone.now(),
+                last_error="",
+            )
+            delivered += len(batch)
+    return len(deliveries), delivered
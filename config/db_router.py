@@ -0,0 +1,158 @@
+"""
+Primary/replica database routing.
+
+Every query goes to ``default`` unless the code issuing it opted in with
+``allow_replica()``; only the API's list/retrieve and reporting views do.
+Workers, services and anything that decides what to write from what it
+reads (attempt resumption, lease claims, dispatch caps, the change feed)
+therefore never see a lagging replica; ``reads_use_replica()`` tells code
+such as the list cache whether a read it is about to make may lag. Opted-in reads
+are spread across the aliases listed in ``settings.DATABASE_REPLICAS``,
+except inside a transaction on the primary. ``PrimaryPinningMiddleware``
+pins a client to the primary for ``DATABASE_PRIMARY_PIN_SECONDS`` after it
+performs a write so it always reads its own writes despite replication lag.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+PIN_COOKIE_NAME = "db_pin_primary"
+
+_UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+_pinned_to_primary: ContextVar[bool] = ContextVar(
+    "pinned_to_primary",
+    default=False,
+)
+_replica_allowed: ContextVar[bool] = ContextVar(
+    "replica_allowed",
+    default=False,
+)
+
+_ResponseT = TypeVar("_ResponseT", bound=HttpResponse)
+
+
+@contextmanager
+def allow_replica() -> Iterator[None]:
+    """Let reads issued inside the block go to a replica."""
+    token = _replica_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+@contextmanager
+def pin_to_primary() -> Iterator[None]:
+    """Route every read issued inside the block to the primary database."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def reads_use_replica() -> bool:
+    """Return whether reads issued here would currently go to a replica."""
+    return bool(
+        getattr(settings, "DATABASE_REPLICAS", [])
+        and _replica_allowed.get()
+        and not _pinned_to_primary.get()
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+def mark_read_only(response: _ResponseT) -> _ResponseT:
+    """Flag the response of a POST that wrote nothing so it does not pin the client."""
+    setattr(response, "db_read_only", True)
+    return response
+
+
+class PrimaryReplicaRouter:
+    """Send writes to the primary, and opted-in reads to a random configured replica."""
+
+    def db_for_read(self, model: type[Any], **hints: Any) -> str:
+        """Pick a replica if the current context allows one and nothing requires the primary."""
+        if not reads_use_replica():
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model: type[Any], **hints: Any) -> str:
+        """All writes go to the primary."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        """Primary and replicas hold the same data, so relations are allowed."""
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        """Only migrate the primary; replicas receive schema via replication."""
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinningMiddleware:
+    """
+    Provide read-your-writes consistency on top of ``PrimaryReplicaRouter``.
+
+    Requests carrying the pin cookie, and any request using an unsafe HTTP
+    method, read from the primary. A successful write refreshes the cookie
+    so follow-up reads within the pin window also hit the primary; POST
+    endpoints that only read opt out with ``mark_read_only``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # Async views (apps.payouts.async_views) then run without a thread hop.
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._pins(request):
+            return self.get_response(request)
+        with pin_to_primary():
+            response = self.get_response(request)
+        return self._refresh_pin(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        get_response: Callable[[HttpRequest], Awaitable[HttpResponse]] = self.get_response
+        if not self._pins(request):
+            return await get_response(request)
+        with pin_to_primary():
+            response = await get_response(request)
+        return self._refresh_pin(request, response)
+
+    @staticmethod
+    def _pins(request: HttpRequest) -> bool:
+        return request.method in _UNSAFE_METHODS or PIN_COOKIE_NAME in request.COOKIES
+
+    @staticmethod
+    def _refresh_pin(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if (
+                request.method in _UNSAFE_METHODS
+                and response.status_code < 400
+                and not getattr(response, "db_read_only", False)
+        ):
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
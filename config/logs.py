@@ -0,0 +1,190 @@
+"""
+Logging for web and worker processes: JSON lines written off the hot path.
+
+``QueuedStreamHandler`` is the only handler on the root logger. A call
+such as ``logger.info(...)`` builds the record and puts it on a bounded
+in-process queue. A ``QueueListener`` thread then formats it with
+``JsonFormatter`` and writes it to the stream. When the queue is full the
+record is dropped and counted, so a slow stream never blocks a request or
+a task.
+
+``SamplingFilter`` thins out high-volume INFO lines before they are
+queued. Records are grouped by the ``event`` passed in ``extra``, for
+example ``logger.info(..., extra={"event": "payout.completed"})``. Each
+event can keep only a fraction of its records, or at most so many per
+second. Warnings and errors are always kept.
+
+Only the standard library is used, so ``scripts/bench_logging.py`` can
+import this module without Django.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import weakref
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any
+
+# Attributes every LogRecord has; anything else came in through ``extra``.
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_RecordQueue = queue.SimpleQueue[logging.LogRecord]
+
+_handlers: weakref.WeakSet[QueuedStreamHandler] = weakref.WeakSet()
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, including its ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the JSON line for ``record``."""
+        entry: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Sample and rate-limit INFO-and-below records per ``event``.
+
+    ``rates`` maps an event to the fraction of its records to keep; kept
+    records carry that fraction as ``sample_rate``. ``limits`` maps an
+    event to the most records kept per second. Records without an event,
+    and warnings and above, always pass.
+    """
+
+    def __init__(
+            self,
+            rates: Mapping[str, float] | None = None,
+            limits: Mapping[str, float] | None = None,
+    ) -> None:
+        super().__init__()
+        self.rates = {event: float(rate) for event, rate in (rates or {}).items()}
+        self.limits = {event: float(limit) for event, limit in (limits or {}).items()}
+        self._random = random.Random()
+        self._windows: dict[str, tuple[int, int]] = {}
+        self._mutex = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether ``record`` is kept."""
+        event = getattr(record, "event", None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(event)
+        if rate is not None and rate < 1:
+            if self._random.random() >= rate:
+                return False
+            record.sample_rate = rate
+        limit = self.limits.get(event)
+        if limit is not None:
+            second = int(time.monotonic())
+            with self._mutex:
+                window, count = self._windows.get(event, (second, 0))
+                if window != second:
+                    window, count = second, 0
+                if count >= limit:
+                    return False
+                self._windows[event] = (window, count + 1)
+        return True
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    Queue records for a background thread that formats and writes them.
+
+    The formatter set on this handler (for example by ``dictConfig``) is
+    applied by the listener thread, not by the caller. Records that do not
+    fit in a queue of ``queue_size`` are dropped; ``dropped`` counts them.
+    After a fork, the child process gets its own queue and listener thread.
+    """
+
+    queue: _RecordQueue
+
+    def __init__(self, stream: IO[str] | None = None, queue_size: int = 10_000) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._listening = False
+        self._listen()
+        _handlers.add(self)
+
+    def _listen(self) -> None:
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        self._listening = True
+
+    def _stop_listening(self) -> None:
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+
+    def _after_fork(self) -> None:
+        # The parent's listener thread does not exist here, and the queued
+        # records are the parent's to write.
+        if self._listening:
+            self.queue = queue.SimpleQueue()
+            self._listen()
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:
+        """Format on the listener thread."""
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the arguments into the message so they cannot change once queued.
+
+        Unlike ``QueueHandler.prepare``, the record is neither copied nor
+        formatted here, and its exception info is kept for the formatter.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue ``record``, dropping it if the queue is full."""
+        if self.queue.qsize() >= self.queue_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+    def close(self) -> None:
+        """Write out every queued record and stop the listener thread."""
+        self._stop_listening()
+        self.target.close()
+        super().close()
+
+
+def _after_fork() -> None:
+    for handler in list(_handlers):
+        handler._after_fork()
+
+
+def _stop_listeners() -> None:
+    for handler in list(_handlers):
+        handler._stop_listening()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_stop_listeners)
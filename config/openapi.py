@@ -0,0 +1,100 @@
+"""
+OpenAPI schema and API docs endpoints.
+
+The schema is generated at build time (``make schema``, also run by the
+production Docker build) into ``OPENAPI_SCHEMA_FILE`` and served from
+memory with an ETag, so repeated gateway health and contract checks are
+answered with ``304 Not Modified``. Without that file, and always under
+DEBUG, the schema is generated once per process instead; since the schema
+only changes with the code, it is never regenerated while a process runs.
+
+``drf_spectacular`` is imported on first use only, so neither web process
+startup nor Celery workers pay for it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import condition, require_safe
+
+JSON_MEDIA_TYPE = "application/vnd.oai.openapi+json"
+YAML_MEDIA_TYPE = "application/vnd.oai.openapi"
+
+
+class SchemaDocument(NamedTuple):
+    """A rendered schema with its content type and ETag."""
+
+    body: bytes
+    content_type: str
+    etag: str
+
+
+@lru_cache(maxsize=None)
+def load_schema() -> dict[str, Any]:
+    """Return the schema from the build-time file, or generate it."""
+    path = settings.OPENAPI_SCHEMA_FILE
+    if path and not settings.DEBUG and Path(path).is_file():
+        return json.loads(Path(path).read_bytes())
+
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+@lru_cache(maxsize=None)
+def get_document(fmt: str) -> SchemaDocument:
+    """Render the schema as ``"json"`` or ``"yaml"`` once per process."""
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    if fmt == "json":
+        body = OpenApiJsonRenderer().render(load_schema(), renderer_context={})
+        content_type = JSON_MEDIA_TYPE
+    else:
+        body = OpenApiYamlRenderer().render(load_schema(), renderer_context={})
+        content_type = YAML_MEDIA_TYPE
+    return SchemaDocument(
+        body=body,
+        content_type=f"{content_type}; charset=utf-8",
+        etag=hashlib.sha256(body).hexdigest()[:32],
+    )
+
+
+def _requested_format(request: HttpRequest) -> str:
+    """Pick the format from ``?format=`` or the Accept header (YAML by default)."""
+    fmt = request.GET.get("format")
+    if fmt in ("json", "yaml"):
+        return fmt
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+@require_safe
+@condition(etag_func=lambda request: get_document(_requested_format(request)).etag)
+def schema_view(request: HttpRequest) -> HttpResponse:
+    """Serve the cached OpenAPI schema; conditional requests get a 304."""
+    document = get_document(_requested_format(request))
+    return HttpResponse(document.body, content_type=document.content_type)
+
+
+@lru_cache(maxsize=None)
+def _docs_view(name: str) -> Callable[..., HttpResponse]:
+    from drf_spectacular import views
+
+    return getattr(views, name).as_view(url_name="schema")
+
+
+def swagger_ui_view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+    """Swagger UI for the schema served by ``schema_view``."""
+    return _docs_view("SpectacularSwaggerView")(request, *args, **kwargs)
+
+
+def redoc_view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+    """ReDoc UI for the schema served by ``schema_view``."""
+    return _docs_view("SpectacularRedocView")(request, *args, **kwargs)
@@ -0,0 +1,35 @@
+"""
+Schema generator that loads the OpenAPI annotation modules on demand.
+
+Views carry no ``drf_spectacular`` decorators; the modules listed in
+``OPENAPI_ANNOTATION_MODULES`` attach them when a schema is generated
+(``manage.py spectacular``, the deploy checks or the schema endpoint).
+
+DRF's ``DEFAULT_SCHEMA_CLASS`` is left at its default in settings: the
+router reads each view's ``schema`` while building URLs, and pointing it
+at ``drf_spectacular.openapi.AutoSchema`` there would import that module
+in every web process. The generator switches it over while it runs.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+
+from django.conf import settings
+from django.test.utils import override_settings
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+
+SCHEMA_CLASS = "drf_spectacular.openapi.AutoSchema"
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """drf-spectacular generator that imports annotation modules first."""
+
+    def get_schema(self, request: Any = None, public: bool = False) -> Any:
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_SCHEMA_CLASS": SCHEMA_CLASS}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            # Annotations must be attached before the views are inspected.
+            for module in settings.OPENAPI_ANNOTATION_MODULES:
+                import_module(module)
+            return super().get_schema(request=request, public=public)
@@ -45,8 +45,13 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.db_router.PrimaryPinningMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Removed at startup unless PAYOUTS_PROFILING_ENABLED or
+    # PAYOUTS_SLOW_QUERY_LOG_ENABLED is set, respectively.
+    "apps.payouts.profiling.ProfilingMiddleware",
+    "apps.payouts.slow_queries.SlowQueryMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -84,6 +89,27 @@ DATABASES = {
     ),
 }
 
+# Read replicas: comma-separated URLs, exposed as ``replica_0``, ``replica_1``...
+# Reads are routed to them by ``config.db_router.PrimaryReplicaRouter``.
+DATABASE_REPLICA_URLS: list[str] = env.list("DATABASE_REPLICA_URLS", default=[])
+DATABASE_REPLICAS: list[str] = []
+for _index, _replica_url in enumerate(DATABASE_REPLICA_URLS):
+    _alias = f"replica_{_index}"
+    DATABASES[_alias] = {
+        **dj_database_url.parse(
+            _replica_url,
+            conn_max_age=600,
+            conn_health_checks=True,
+        ),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+
+# Seconds a client stays pinned to the primary after a write (read-your-writes).
+DATABASE_PRIMARY_PIN_SECONDS: int = env.int("DATABASE_PRIMARY_PIN_SECONDS", default=5)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,17 +149,267 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # DEFAULT_SCHEMA_CLASS stays at DRF's default so the URLconf does not
+    # import drf_spectacular; config.openapi_generator switches it while
+    # generating the schema.
 }
 
+# Payouts list pagination: above this many rows (planner estimate) the list
+# endpoint stops running exact COUNT(*) queries for every request.
+PAYOUTS_COUNT_ESTIMATE_THRESHOLD: int = env.int(
+    "PAYOUTS_COUNT_ESTIMATE_THRESHOLD",
+    default=100_000,
+)
+PAYOUTS_COUNT_CACHE_TTL: int = env.int("PAYOUTS_COUNT_CACHE_TTL", default=30)
+
+# Currency that ``Payout.amount_base`` is normalized to, and the in-process
+# FX rate cache used to compute it.
+PAYOUTS_BASE_CURRENCY: str = env("PAYOUTS_BASE_CURRENCY", default="USD")
+PAYOUTS_FX_CACHE_TTL: int = env.int("PAYOUTS_FX_CACHE_TTL", default=300)
+PAYOUTS_FX_CACHE_SIZE: int = env.int("PAYOUTS_FX_CACHE_SIZE", default=64)
+
+# Bulk status changes: rows per UPDATE statement and max explicit ids per request.
+PAYOUTS_BULK_UPDATE_CHUNK_SIZE: int = env.int(
+    "PAYOUTS_BULK_UPDATE_CHUNK_SIZE",
+    default=1000,
+)
+PAYOUTS_BULK_MAX_IDS: int = env.int("PAYOUTS_BULK_MAX_IDS", default=10_000)
+# Most payouts accepted by one POST /api/batches/ submission.
+PAYOUTS_BATCH_MAX_SIZE: int = env.int("PAYOUTS_BATCH_MAX_SIZE", default=10_000)
+# Most ids accepted by one POST /api/payouts/statuses/ lookup.
+PAYOUTS_STATUS_LOOKUP_MAX_IDS: int = env.int("PAYOUTS_STATUS_LOOKUP_MAX_IDS", default=1000)
+
+# Shortest ``search=`` term; trigram indexes cannot serve terms under 3 characters.
+PAYOUTS_SEARCH_MIN_LENGTH: int = env.int("PAYOUTS_SEARCH_MIN_LENGTH", default=3)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Payout Management API",
     "DESCRIPTION": "API for creating and tracking payouts processed asynchronously via Celery.",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "DEFAULT_GENERATOR_CLASS": "config.openapi_generator.SchemaGenerator",
+    "SCHEMA_PATH_PREFIX": "/api/",
 }
+# Modules attaching OpenAPI annotations to views, imported only to build the schema.
+OPENAPI_ANNOTATION_MODULES = ["apps.payouts.schema"]
+# Build-time schema served by /api/schema/ (``make schema``); generated per
+# process when missing and always under DEBUG.
+OPENAPI_SCHEMA_FILE: str = env(
+    "OPENAPI_SCHEMA_FILE",
+    default=str(BASE_DIR / "openapi-schema.json"),
+)
 
 # Celery / Redis configuration (broker URLs only; Celery app wiring is in a later step)
 REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/0")
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=REDIS_URL)
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default=REDIS_URL)
+
+# Deduplication locks for process_payout_task ("redis" or "memory").
+PAYOUTS_DEDUP_LOCK_BACKEND: str = env("PAYOUTS_DEDUP_LOCK_BACKEND", default="redis")
+PAYOUTS_DEDUP_LOCK_URL: str = env("PAYOUTS_DEDUP_LOCK_URL", default=REDIS_URL)
+# Held from publish until a worker starts on the message.
+PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL: int = env.int("PAYOUTS_DEDUP_ENQUEUE_LOCK_TTL", default=300)
+# Held while a worker processes a payout; must exceed one attempt's duration.
+PAYOUTS_DEDUP_RUN_LOCK_TTL: int = env.int("PAYOUTS_DEDUP_RUN_LOCK_TTL", default=60)
+
+# Idempotency records of the simulated payment provider (apps.payouts.gateway):
+# "redis" (shared by every worker, so retries elsewhere resume) or "memory".
+PAYOUTS_SIMULATED_GATEWAY_BACKEND: str = env(
+    "PAYOUTS_SIMULATED_GATEWAY_BACKEND",
+    default="redis",
+)
+PAYOUTS_SIMULATED_GATEWAY_URL: str = env("PAYOUTS_SIMULATED_GATEWAY_URL", default=REDIS_URL)
+
+# Scheduled payouts live in the database (``Payout.scheduled_for``) rather than
+# as broker ETA messages; beat runs the dispatcher that enqueues due rows.
+PAYOUTS_SCHEDULE_DISPATCH_INTERVAL: float = env.float(
+    "PAYOUTS_SCHEDULE_DISPATCH_INTERVAL",
+    default=10.0,
+)
+PAYOUTS_SCHEDULE_DISPATCH_BATCH_SIZE: int = env.int(
+    "PAYOUTS_SCHEDULE_DISPATCH_BATCH_SIZE",
+    default=500,
+)
+PAYOUTS_SCHEDULE_DISPATCH_MAX_BATCHES: int = env.int(
+    "PAYOUTS_SCHEDULE_DISPATCH_MAX_BATCHES",
+    default=20,
+)
+
+# List response cache (apps.payouts.list_cache): "redis" or "memory" (tests and
+# single-process development). Pages are invalidated by generation counters on
+# every payout write; the TTL only bounds memory and staleness after a failed bump.
+PAYOUTS_LIST_CACHE_ENABLED: bool = env.bool("PAYOUTS_LIST_CACHE_ENABLED", default=True)
+PAYOUTS_LIST_CACHE_BACKEND: str = env("PAYOUTS_LIST_CACHE_BACKEND", default="redis")
+PAYOUTS_LIST_CACHE_URL: str = env("PAYOUTS_LIST_CACHE_URL", default=REDIS_URL)
+PAYOUTS_LIST_CACHE_TTL: int = env.int("PAYOUTS_LIST_CACHE_TTL", default=300)
+# Read cache misses from a replica (when configured) and leave them uncached,
+# since a lagging replica could store an outdated page; off reads misses from
+# the primary and caches them.
+PAYOUTS_LIST_CACHE_MISS_FROM_REPLICA: bool = env.bool(
+    "PAYOUTS_LIST_CACHE_MISS_FROM_REPLICA",
+    default=True,
+)
+# Page limit of the in-memory backend.
+PAYOUTS_LIST_CACHE_MAX_ENTRIES: int = env.int("PAYOUTS_LIST_CACHE_MAX_ENTRIES", default=1000)
+
+# Change feed (GET /api/payouts/changes/): page sizes, and how old a change must be
+# before it is served, so rows from transactions committing late are not skipped.
+PAYOUTS_CHANGE_FEED_PAGE_SIZE: int = env.int("PAYOUTS_CHANGE_FEED_PAGE_SIZE", default=100)
+PAYOUTS_CHANGE_FEED_MAX_PAGE_SIZE: int = env.int(
+    "PAYOUTS_CHANGE_FEED_MAX_PAGE_SIZE",
+    default=1000,
+)
+PAYOUTS_CHANGE_FEED_SETTLE_SECONDS: float = env.float(
+    "PAYOUTS_CHANGE_FEED_SETTLE_SECONDS",
+    default=5.0,
+)
+
+# Slow-query log (apps.payouts.slow_queries): statements run by API requests or
+# payouts tasks taking at least PAYOUTS_SLOW_QUERY_MS are aggregated by fingerprint.
+PAYOUTS_SLOW_QUERY_LOG_ENABLED: bool = env.bool("PAYOUTS_SLOW_QUERY_LOG_ENABLED", default=False)
+PAYOUTS_SLOW_QUERY_MS: float = env.float("PAYOUTS_SLOW_QUERY_MS", default=200.0)
+# An EXPLAIN plan is captured at most once per fingerprint per this many seconds.
+PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL: int = env.int(
+    "PAYOUTS_SLOW_QUERY_EXPLAIN_INTERVAL",
+    default=3600,
+)
+
+# Opt-in profiling of API requests and process_payout_task (apps.payouts.profiling).
+# Nothing is installed unless enabled. Requests sending X-Profile-Token equal to
+# PAYOUTS_PROFILING_TOKEN are always profiled; others with PAYOUTS_PROFILING_SAMPLE_RATE.
+PAYOUTS_PROFILING_ENABLED: bool = env.bool("PAYOUTS_PROFILING_ENABLED", default=False)
+PAYOUTS_PROFILING_TOKEN: str = env("PAYOUTS_PROFILING_TOKEN", default="")
+PAYOUTS_PROFILING_SAMPLE_RATE: float = env.float(
+    "PAYOUTS_PROFILING_SAMPLE_RATE",
+    default=0.0,
+)
+# Functions kept in each stored cProfile report, by cumulative time.
+PAYOUTS_PROFILING_TOP_FUNCTIONS: int = env.int(
+    "PAYOUTS_PROFILING_TOP_FUNCTIONS",
+    default=60,
+)
+
+# Fair dispatch across tenants (see apps.payouts.fairness). When disabled,
+# payouts are published in FIFO order as soon as they are due.
+PAYOUTS_FAIR_DISPATCH: bool = env.bool("PAYOUTS_FAIR_DISPATCH", default=False)
+# Queued plus processing payouts allowed per tenant.
+PAYOUTS_TENANT_MAX_IN_FLIGHT: int = env.int("PAYOUTS_TENANT_MAX_IN_FLIGHT", default=50)
+# Round-robin weights, e.g. "big-merchant=4,acme=2"; unlisted tenants get 1.
+PAYOUTS_TENANT_WEIGHTS: dict[str, str] = env.dict("PAYOUTS_TENANT_WEIGHTS", default={})
+# Payouts published per dispatcher run, and the interval between runs.
+PAYOUTS_FAIR_DISPATCH_BATCH_SIZE: int = env.int(
+    "PAYOUTS_FAIR_DISPATCH_BATCH_SIZE",
+    default=500,
+)
+PAYOUTS_FAIR_DISPATCH_INTERVAL: float = env.float(
+    "PAYOUTS_FAIR_DISPATCH_INTERVAL",
+    default=1.0,
+)
+# Dispatched payouts still PENDING after this many seconds are assumed lost.
+PAYOUTS_FAIR_DISPATCH_TIMEOUT: int = env.int("PAYOUTS_FAIR_DISPATCH_TIMEOUT", default=600)
+
+# Outbound webhooks (apps.payouts.webhooks), sent by deliver_webhooks on the
+# "webhooks" queue. Events per POST and deliveries claimed per round.
+PAYOUTS_WEBHOOK_BATCH_SIZE: int = env.int("PAYOUTS_WEBHOOK_BATCH_SIZE", default=100)
+PAYOUTS_WEBHOOK_CLAIM_SIZE: int = env.int("PAYOUTS_WEBHOOK_CLAIM_SIZE", default=500)
+PAYOUTS_WEBHOOK_MAX_CLAIMS_PER_RUN: int = env.int(
+    "PAYOUTS_WEBHOOK_MAX_CLAIMS_PER_RUN",
+    default=20,
+)
+# Per-request timeout, and how long claimed deliveries stay leased to a worker.
+PAYOUTS_WEBHOOK_TIMEOUT: float = env.float("PAYOUTS_WEBHOOK_TIMEOUT", default=10.0)
+PAYOUTS_WEBHOOK_LEASE_SECONDS: int = env.int("PAYOUTS_WEBHOOK_LEASE_SECONDS", default=300)
+# Attempts before a delivery is given up, and the exponential backoff between them.
+PAYOUTS_WEBHOOK_MAX_ATTEMPTS: int = env.int("PAYOUTS_WEBHOOK_MAX_ATTEMPTS", default=8)
+PAYOUTS_WEBHOOK_RETRY_BACKOFF: float = env.float("PAYOUTS_WEBHOOK_RETRY_BACKOFF", default=10.0)
+PAYOUTS_WEBHOOK_RETRY_BACKOFF_MAX: float = env.float(
+    "PAYOUTS_WEBHOOK_RETRY_BACKOFF_MAX",
+    default=3600.0,
+)
+# How often beat runs deliver_webhooks to pick up due retries.
+PAYOUTS_WEBHOOK_POLL_INTERVAL: float = env.float("PAYOUTS_WEBHOOK_POLL_INTERVAL", default=5.0)
+
+# Pipeline health (apps.payouts.health): beat samples every INTERVAL seconds
+# and a sample is served for TTL seconds; throughput averages over WINDOW.
+PAYOUTS_PIPELINE_HEALTH_INTERVAL: float = env.float(
+    "PAYOUTS_PIPELINE_HEALTH_INTERVAL",
+    default=5.0,
+)
+PAYOUTS_PIPELINE_HEALTH_TTL: float = env.float("PAYOUTS_PIPELINE_HEALTH_TTL", default=10.0)
+PAYOUTS_PIPELINE_HEALTH_WINDOW: int = env.int("PAYOUTS_PIPELINE_HEALTH_WINDOW", default=300)
+# Where snapshots are stored: "redis" (shared by all processes) or "memory".
+PAYOUTS_PIPELINE_HEALTH_BACKEND: str = env("PAYOUTS_PIPELINE_HEALTH_BACKEND", default="redis")
+PAYOUTS_PIPELINE_HEALTH_URL: str = env("PAYOUTS_PIPELINE_HEALTH_URL", default=REDIS_URL)
+
+CELERY_TASK_ROUTES = {
+    "apps.payouts.tasks.deliver_webhooks": {"queue": "webhooks"},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-scheduled-payouts": {
+        "task": "apps.payouts.tasks.dispatch_scheduled_payouts",
+        "schedule": PAYOUTS_SCHEDULE_DISPATCH_INTERVAL,
+    },
+    "deliver-webhooks": {
+        "task": "apps.payouts.tasks.deliver_webhooks",
+        "schedule": PAYOUTS_WEBHOOK_POLL_INTERVAL,
+    },
+    "sample-pipeline-health": {
+        "task": "apps.payouts.tasks.sample_pipeline_health",
+        "schedule": PAYOUTS_PIPELINE_HEALTH_INTERVAL,
+        "options": {"expires": PAYOUTS_PIPELINE_HEALTH_INTERVAL},
+    },
+}
+if PAYOUTS_FAIR_DISPATCH:
+    CELERY_BEAT_SCHEDULE["dispatch-fair-payouts"] = {
+        "task": "apps.payouts.tasks.dispatch_fair_payouts",
+        "schedule": PAYOUTS_FAIR_DISPATCH_INTERVAL,
+    }
+
+# Logging (config.logs): JSON lines on stdout, formatted and written by a
+# background thread. Records that overflow a queue of QUEUE_SIZE are dropped.
+PAYOUTS_LOG_LEVEL: str = env("PAYOUTS_LOG_LEVEL", default="INFO")
+PAYOUTS_LOG_QUEUE_SIZE: int = env.int("PAYOUTS_LOG_QUEUE_SIZE", default=10_000)
+# Per-event fraction of INFO lines kept, e.g. "payout.completed=0.01", and the
+# most kept per second; warnings and errors are never sampled out.
+PAYOUTS_LOG_SAMPLE_RATES: dict[str, float] = env.dict(
+    "PAYOUTS_LOG_SAMPLE_RATES",
+    cast={"value": float},
+    default={"payout.started": 0.01, "payout.completed": 0.01},
+)
+PAYOUTS_LOG_RATE_LIMITS: dict[str, float] = env.dict(
+    "PAYOUTS_LOG_RATE_LIMITS",
+    cast={"value": float},
+    default={"payout.duplicate": 10.0, "payout.deferred": 10.0},
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "sampling": {
+            "()": "config.logs.SamplingFilter",
+            "rates": PAYOUTS_LOG_SAMPLE_RATES,
+            "limits": PAYOUTS_LOG_RATE_LIMITS,
+        },
+    },
+    "formatters": {
+        "json": {"()": "config.logs.JsonFormatter"},
+    },
+    "handlers": {
+        "queue": {
+            "class": "config.logs.QueuedStreamHandler",
+            "queue_size": PAYOUTS_LOG_QUEUE_SIZE,
+            "formatter": "json",
+            "filters": ["sampling"],
+        },
+    },
+    "root": {"handlers": ["queue"], "level": PAYOUTS_LOG_LEVEL},
+    "loggers": {
+        # Send Django's own records through the root handler instead of its
+        # default console handler.
+        "django": {"handlers": [], "level": "INFO"},
+    },
+}
+# Celery workers keep the handler above instead of installing their own.
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
@@ -27,7 +27,20 @@ if not os.getenv("DATABASE_URL"):
             "NAME": ":memory:",
         }
     }
+    DATABASE_REPLICAS = []
 
 # Celery configuration for tests: run tasks synchronously
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
+
+# Deduplication locks are process-local in tests.
+PAYOUTS_DEDUP_LOCK_BACKEND = "memory"
+# The list response cache is process-local in tests and cleared between them.
+PAYOUTS_LIST_CACHE_BACKEND = "memory"
+# Pipeline health snapshots are process-local in tests.
+PAYOUTS_PIPELINE_HEALTH_BACKEND = "memory"
+# The simulated provider's idempotency records are process-local in tests.
+PAYOUTS_SIMULATED_GATEWAY_BACKEND = "memory"
+
+# Always generate the OpenAPI schema from the code under test.
+OPENAPI_SCHEMA_FILE = ""
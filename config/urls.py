@@ -6,24 +6,13 @@ Exposes the Django admin, payouts API endpoints, and OpenAPI schema/docs.
 
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+
+from config.openapi import redoc_view, schema_view, swagger_ui_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("apps.payouts.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path(
-        "api/redoc/",
-        SpectacularRedocView.as_view(url_name="schema"),
-        name="redoc",
-    ),
+    path("api/schema/", schema_view, name="schema"),
+    path("api/docs/", swagger_ui_view, name="swagger-ui"),
+    path("api/redoc/", redoc_view, name="redoc"),
 ]
@@ -0,0 +1,104 @@
+"""
+Compare throughput of the sync and async payouts read endpoints.
+
+Run the project under an ASGI server first, for example::
+
+    uvicorn config.asgi:application --workers 1
+
+then::
+
+    python scripts/bench_async_views.py --base-url http://localhost:8000 \
+        --concurrency 500 --requests 5000
+
+Each client opens its own keep-alive connection and issues GET requests
+back to back; the script reports requests/sec and latency percentiles for
+``/api/payouts/`` (DRF viewset) and ``/api/async/payouts/`` (async ORM).
+Only the standard library is used so the benchmark runs anywhere.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+ENDPOINTS = {
+    "sync": "/api/payouts/",
+    "async": "/api/async/payouts/",
+}
+
+
+async def _client(
+        host: str,
+        port: int,
+        path: str,
+        queue: asyncio.Queue[int],
+        latencies: list[float],
+) -> None:
+    """Issue requests from ``queue`` over a single keep-alive connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    try:
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def _run(base_url: str, path: str, concurrency: int, total: int) -> None:
+    """Drive ``total`` requests against ``path`` and print a summary line."""
+    parts = urlsplit(base_url)
+    host = parts.hostname or "localhost"
+    port = parts.port or 80
+
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    latencies: list[float] = []
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(host, port, path, queue, latencies)
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{path:<24} {len(latencies) / elapsed:>9.1f} req/s  "
+        f"p50={quantiles[49] * 1000:.1f}ms  p99={quantiles[98] * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for path in ENDPOINTS.values():
+        asyncio.run(_run(args.base_url, path, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
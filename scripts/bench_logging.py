@@ -0,0 +1,111 @@
+"""
+Measure what one log call costs the caller under each logging setup.
+
+Run from the project root::
+
+    python scripts/bench_logging.py --calls 100000
+
+Every setup logs the task's "completed" line, with its ``event`` and
+``payout_id`` extras, as JSON to a file in a temporary directory:
+
+- ``sync``: a plain ``StreamHandler``; the caller formats and writes.
+- ``queued``: ``config.logs.QueuedStreamHandler``; the caller only queues
+  the record, a listener thread formats and writes it.
+- ``queued+sampled``: the same, keeping 1% of the lines through
+  ``config.logs.SamplingFilter`` as the default settings do.
+
+The script prints the mean and p99 time per call in the calling thread,
+how long the listener took to write out the backlog afterwards, and how
+many lines reached the file. Only the standard library is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.logs import JsonFormatter, QueuedStreamHandler, SamplingFilter  # noqa: E402
+
+
+def _sync(stream) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _queued(stream, calls: int) -> logging.Handler:
+    handler = QueuedStreamHandler(stream, queue_size=calls)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _queued_sampled(stream, calls: int) -> logging.Handler:
+    handler = _queued(stream, calls)
+    handler.addFilter(SamplingFilter(rates={"payout.completed": 0.01}))
+    return handler
+
+
+def _run(name: str, build: Callable[..., logging.Handler], calls: int, directory: str) -> None:
+    """Log ``calls`` lines through the handler ``build`` returns and print a summary line."""
+    path = Path(directory) / f"{name}.log"
+    with path.open("w") as stream:
+        handler = build(stream)
+        logger = logging.getLogger(f"bench.{name}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        payout_ids = [str(uuid.uuid4()) for _ in range(calls)]
+
+        timings = []
+        for payout_id in payout_ids:
+            started = time.perf_counter_ns()
+            logger.info(
+                "Payout %s completed successfully, provider reference %s",
+                payout_id,
+                "sim_0123456789abcdef",
+                extra={"event": "payout.completed", "payout_id": payout_id},
+            )
+            timings.append(time.perf_counter_ns() - started)
+
+        started = time.perf_counter()
+        logger.removeHandler(handler)
+        handler.close()
+        drained = time.perf_counter() - started
+        stream.flush()
+
+    with path.open() as written:
+        lines = sum(1 for _ in written)
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{name:<16} mean={statistics.fmean(timings) / 1000:>6.2f}us  "
+        f"p99={quantiles[98] / 1000:>6.2f}us  drain={drained * 1000:>7.1f}ms  lines={lines}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _run("sync", _sync, args.calls, directory)
+        _run("queued", lambda stream: _queued(stream, args.calls), args.calls, directory)
+        _run(
+            "queued+sampled",
+            lambda stream: _queued_sampled(stream, args.calls),
+            args.calls,
+            directory,
+        )
+
+
+if __name__ == "__main__":
+    main()